@@ -0,0 +1,187 @@
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+
+from openai import AsyncOpenAI
+
+from managers.ai_manager import AIManager
+from managers.formatted_history import FormattedHistory
+from managers.retry_policy import CircuitBreaker, RetryBudget
+from utils.fake_responses_server import FakeResponsesServer
+
+
+def make_history(length: int) -> list[tuple[str, str]]:
+    history = [("System", "Chat session started...")]
+    for i in range(length):
+        sender = "You" if i % 2 == 0 else "AI"
+        history.append((sender, f"Message {i}: " + "lorem ipsum dolor sit amet " * 8))
+    if history[-1][0] != "You":
+        history.append(("You", "How should I approach this?"))
+    return history
+
+
+def summarize(label: str, samples: list[float]) -> dict:
+    samples_ms = sorted(sample * 1000 for sample in samples)
+    return {
+        "label": label,
+        "n": len(samples_ms),
+        "mean": statistics.fmean(samples_ms),
+        "p50": samples_ms[len(samples_ms) // 2],
+        "p95": samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.95))],
+    }
+
+
+def print_table(results: list[dict]) -> None:
+    print(f"{'benchmark':<42} {'n':>6} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for result in results:
+        print(
+            f"{result['label']:<42} {result['n']:>6} {result['mean']:>10.3f} "
+            f"{result['p50']:>10.3f} {result['p95']:>10.3f}"
+        )
+
+
+def bench_formatting(manager: AIManager, history: list[tuple[str, str]], iterations: int) -> list[dict]:
+    format_samples, rescan_samples, incremental_samples = [], [], []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        manager._format_history_for_openai_api(history)
+        format_samples.append(time.perf_counter() - start)
+
+        # What a turn costs without the incremental state: count every message.
+        start = time.perf_counter()
+        rebuilt = FormattedHistory(manager.context_window)
+        rebuilt.sync(history)
+        manager.context_window.get_window_start(manager.instructions, rebuilt.token_totals)
+        rescan_samples.append(time.perf_counter() - start)
+
+    # What a turn costs now: format the new message and pick the window.
+    formatted_history = FormattedHistory(manager.context_window)
+    growing = list(history)
+    formatted_history.sync(growing)
+    for i in range(iterations):
+        growing.append(("You", f"Follow-up {i}"))
+        start = time.perf_counter()
+        formatted_history.sync(growing)
+        manager.context_window.get_window_start(manager.instructions, formatted_history.token_totals)
+        incremental_samples.append(time.perf_counter() - start)
+    return [
+        summarize(f"format history ({len(history)} messages)", format_samples),
+        summarize("full rescan + window", rescan_samples),
+        summarize("incremental format + window per turn", incremental_samples),
+    ]
+
+
+async def bench_raw_client(client: AsyncOpenAI, manager: AIManager, history, iterations: int) -> list[float]:
+    payload = {
+        "model": manager.model,
+        "input": manager._format_history_for_openai_api(history),
+    }
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        stream = await client.responses.create(**payload, stream=True)
+        async with stream:
+            async for _event in stream:
+                pass
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def bench_manager(
+    manager: AIManager, history, iterations: int, server: FakeResponsesServer | None = None
+) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        if server:
+            # One 429 per call, so every call takes exactly one retry.
+            server.fail_next(429)
+        start = time.perf_counter()
+        await manager.get_response(history)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def run_benchmarks(args) -> list[dict]:
+    history = make_history(args.history)
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = FakeResponsesServer(retry_after=0).start()
+        base_url = server.base_url
+
+    manager = AIManager(
+        model=args.model,
+        base_url=base_url,
+        api_key=os.getenv("OPENAI_API_KEY", "bench"),
+        backoff_base=0.0,
+        max_backoff=0.0,
+        retry_budget=RetryBudget(retry_ratio=1.0, max_balance=float("inf")),
+        circuit_breaker=CircuitBreaker(failure_threshold=args.iterations + 1),
+    )
+    raw_client = AsyncOpenAI(base_url=base_url, api_key=os.getenv("OPENAI_API_KEY", "bench"), max_retries=0)
+
+    results = bench_formatting(manager, history, args.iterations)
+    try:
+        # Untimed calls so neither path pays for connection setup in the samples.
+        await bench_raw_client(raw_client, manager, history, 1)
+        await bench_manager(manager, history, 1)
+        raw = await bench_raw_client(raw_client, manager, history, args.iterations)
+        managed = await bench_manager(manager, history, args.iterations)
+        results.append(summarize("raw SDK call", raw))
+        results.append(summarize("AIManager.get_response", managed))
+
+        debug_handler = logging.FileHandler(os.devnull)
+        debug_handler.setLevel(logging.DEBUG)
+        root_logger = logging.getLogger()
+        previous_level = root_logger.level
+        root_logger.addHandler(debug_handler)
+        root_logger.setLevel(logging.DEBUG)
+        try:
+            logged = await bench_manager(manager, history, args.iterations)
+        finally:
+            root_logger.removeHandler(debug_handler)
+            root_logger.setLevel(previous_level)
+        results.append(summarize("get_response + DEBUG raw response logging", logged))
+
+        if server:
+            retried = await bench_manager(manager, history, args.iterations, server)
+            results.append(summarize("get_response with one 429 retry", retried))
+    finally:
+        await raw_client.close()
+        await manager.close()
+        if server:
+            server.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure AIManager client-side overhead per call.")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--history", type=int, default=50, help="messages of chat history per call")
+    parser.add_argument("--model", default="o4-mini")
+    parser.add_argument(
+        "--base-url",
+        default=None,
+        help="Responses API base URL; defaults to a bundled local fake server",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    for handler in logging.getLogger().handlers:
+        handler.setLevel(logging.WARNING)
+    results = asyncio.run(run_benchmarks(args))
+    print_table(results)
+
+    by_label = {result["label"]: result for result in results}
+    raw, managed = by_label["raw SDK call"], by_label["AIManager.get_response"]
+    print(
+        f"\nAIManager overhead per call: p50 {managed['p50'] - raw['p50']:.3f} ms, "
+        f"mean {managed['mean'] - raw['mean']:.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
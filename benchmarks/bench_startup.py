@@ -0,0 +1,101 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# What the app imports before the login screen, and what it now defers.
+DEFAULT_MODULES = ["ui.app_manager", "managers.ai_manager", "openai"]
+
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def parse_import_times(stderr: str) -> list[dict]:
+    imports = []
+    for line in stderr.splitlines():
+        if match := IMPORT_TIME_LINE.match(line):
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append(
+                {
+                    "name": name,
+                    "self_ms": int(self_us) / 1000,
+                    "cumulative_ms": int(cumulative_us) / 1000,
+                    "depth": len(indent) // 2,
+                }
+            )
+    return imports
+
+
+def measure_import(module: str, runs: int) -> dict:
+    # A fresh interpreter per run, so nothing is cached in sys.modules.
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "print(elapsed, 'openai' in sys.modules)"
+    )
+    samples = []
+    loads_openai = False
+    for _ in range(runs):
+        elapsed, loaded = run_python(code).stdout.split()
+        samples.append(float(elapsed) * 1000)
+        loads_openai = loaded == "True"
+    return {
+        "module": module,
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "loads_openai": loads_openai,
+    }
+
+
+def print_import_breakdown(module: str, top: int) -> None:
+    imports = parse_import_times(run_python(f"import {module}", "-X", "importtime").stderr)
+    top_level = [item for item in imports if item["depth"] == 0]
+    total = sum(item["cumulative_ms"] for item in top_level)
+    print(f"\n-X importtime for {module}: {len(imports)} modules, {total:.1f} ms")
+    print(f"{'package':<48} {'self ms':>10} {'cumulative ms':>14}")
+    for item in sorted(imports, key=lambda item: item["cumulative_ms"], reverse=True)[:top]:
+        name = "  " * item["depth"] + item["name"]
+        print(f"{name:<48} {item['self_ms']:>10.1f} {item['cumulative_ms']:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how long the app takes to import at startup.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=20, help="slowest imports to list")
+    parser.add_argument(
+        "--breakdown",
+        default="ui.app_manager",
+        help="module to break down with -X importtime",
+    )
+    args = parser.parse_args()
+
+    print(f"{'module':<32} {'median ms':>10} {'min ms':>10} {'loads openai':>13}")
+    for module in args.modules:
+        result = measure_import(module, args.runs)
+        print(
+            f"{result['module']:<32} {result['median_ms']:>10.1f} {result['min_ms']:>10.1f} "
+            f"{str(result['loads_openai']):>13}"
+        )
+    if args.breakdown:
+        print_import_breakdown(args.breakdown, args.top)
+
+
+if __name__ == "__main__":
+    main()
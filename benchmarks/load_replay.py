@@ -0,0 +1,234 @@
+import argparse
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+
+from managers.ai_manager import AIManager
+from managers.turn_metrics import LatencySummary
+from managers.users_manager import UsersManager
+from models.conversation_state import ConversationState
+from utils.fake_responses_server import FakeResponsesServer
+
+
+@dataclass
+class LoadReport(LatencySummary):
+    virtual_users: int
+    sessions: int = 0
+    turns: int = 0
+    latencies: list[float] = field(default_factory=list)
+    errors: dict[str, int] = field(default_factory=dict)
+    retries: int = 0
+    paced: int = 0
+    pacing_wait: float = 0.0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    session_cache_ratios: list[float] = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def error_rate(self) -> float:
+        return self.error_count / self.turns if self.turns else 0.0
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        return self.cached_tokens / self.input_tokens if self.input_tokens else 0.0
+
+
+def load_conversations(users_file: str, min_turns: int = 1) -> list[list[tuple[str, str]]]:
+    users_manager = UsersManager(users_file)
+    return [
+        user.chat_history
+        for user in users_manager.users
+        if sum(1 for sender, _ in user.chat_history if sender == "You") >= min_turns
+    ]
+
+
+def make_conversation(turns: int, index: int) -> list[tuple[str, str]]:
+    history = [("System", "Chat session started...")]
+    for turn in range(turns):
+        history.append(("You", f"Session {index}, turn {turn}: " + "how do I cope with this? " * 6))
+        history.append(("AI", f"Reply {turn}: " + "let's look at that together. " * 10))
+    return history
+
+
+def get_replay_turns(
+    history: list[tuple[str, str]], max_turns: int | None = None
+) -> list[list[tuple[str, str]]]:
+    # Each turn is the history up to a user message; the recorded AI replies
+    # stand in for the live ones, so server-side chaining works as in the app.
+    turns = [history[: i + 1] for i, (sender, _) in enumerate(history) if sender == "You"]
+    return turns[:max_turns] if max_turns else turns
+
+
+async def replay_session(
+    manager: AIManager,
+    history: list[tuple[str, str]],
+    report: LoadReport,
+    max_turns: int | None = None,
+    think_time: float = 0.0,
+) -> None:
+    state = ConversationState()
+    for turn in get_replay_turns(history, max_turns):
+        report.turns += 1
+        start = time.perf_counter()
+        try:
+            await manager.get_response(turn, conversation_state=state)
+        except Exception as e:
+            name = e.__class__.__name__
+            report.errors[name] = report.errors.get(name, 0) + 1
+            logging.debug("Replayed turn failed: %s", e)
+            state.reset_chain()
+        else:
+            report.latencies.append(time.perf_counter() - start)
+        if think_time:
+            await asyncio.sleep(think_time)
+    report.sessions += 1
+    report.input_tokens += state.usage.input_tokens
+    report.cached_tokens += state.usage.cached_tokens
+    report.session_cache_ratios.append(state.usage.cache_hit_ratio)
+
+
+async def run_load(
+    manager: AIManager,
+    conversations: list[list[tuple[str, str]]],
+    virtual_users: int,
+    sessions: int | None = None,
+    max_turns: int | None = None,
+    think_time: float = 0.0,
+) -> LoadReport:
+    if not conversations:
+        raise ValueError("No conversations to replay.")
+    if virtual_users < 1:
+        raise ValueError(
+            f"Invalid virtual_users '{virtual_users}' ({type(virtual_users).__name__}) - must be at least 1"
+        )
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(sessions or len(conversations)):
+        queue.put_nowait(conversations[index % len(conversations)])
+
+    report = LoadReport(virtual_users)
+    retries_before = manager.turn_metrics.retries
+    paced_before = manager.pacer.paced_count
+    pacing_wait_before = manager.pacer.total_wait
+
+    async def virtual_user() -> None:
+        while not queue.empty():
+            history = queue.get_nowait()
+            await replay_session(manager, history, report, max_turns, think_time)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(virtual_user() for _ in range(virtual_users)))
+    report.duration = time.perf_counter() - start
+    report.retries = manager.turn_metrics.retries - retries_before
+    report.paced = manager.pacer.paced_count - paced_before
+    report.pacing_wait = manager.pacer.total_wait - pacing_wait_before
+    return report
+
+
+def print_report(report: LoadReport) -> None:
+    print(f"virtual users      {report.virtual_users}")
+    print(f"sessions replayed  {report.sessions}")
+    print(f"turns              {report.turns} in {report.duration:.2f} s")
+    print(f"throughput         {report.throughput:.2f} turns/s")
+    print(
+        f"latency ms         p50 {report.percentile(50) * 1000:.1f}  "
+        f"p95 {report.percentile(95) * 1000:.1f}  p99 {report.percentile(99) * 1000:.1f}"
+    )
+    print(f"retries            {report.retries}")
+    print(f"paced requests     {report.paced} ({report.pacing_wait:.2f} s waiting for quota)")
+    if report.session_cache_ratios:
+        ratios = sorted(report.session_cache_ratios)
+        print(
+            f"prompt cache       {report.cache_hit_ratio:.1%} of input tokens cached "
+            f"(per session min {ratios[0]:.1%}, median {ratios[len(ratios) // 2]:.1%}, max {ratios[-1]:.1%})"
+        )
+    errors = ", ".join(f"{name} {count}" for name, count in sorted(report.errors.items()))
+    print(f"errors             {report.error_count} ({report.error_rate:.1%}){': ' + errors if errors else ''}")
+
+
+async def main_async(args) -> LoadReport:
+    conversations = load_conversations(args.users_file) if args.users_file else []
+    if not conversations:
+        logging.warning("No recorded conversations found, replaying synthetic sessions.")
+        conversations = [make_conversation(args.synthetic_turns, i) for i in range(args.users)]
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = FakeResponsesServer(
+            latency=args.latency,
+            chunk_delay=args.chunk_delay,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            retry_after=0,
+            seed=1,
+            requests_per_minute=args.rpm,
+            tokens_per_minute=args.tpm,
+        ).start()
+        base_url = server.base_url
+
+    manager = AIManager(
+        model=args.model,
+        base_url=base_url,
+        api_key=os.getenv("OPENAI_API_KEY", "load-test"),
+        max_connections=args.max_connections,
+        max_keepalive_connections=args.max_connections,
+    )
+    try:
+        await manager.warm_up()
+        # Untimed turn: the SDK builds its streaming event models on first use.
+        await manager.get_response([("You", "warm up")])
+        return await run_load(
+            manager,
+            conversations,
+            args.users,
+            sessions=args.sessions,
+            max_turns=args.max_turns,
+            think_time=args.think_time,
+        )
+    finally:
+        await manager.close()
+        if server:
+            server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay recorded chat sessions through AIManager with concurrent virtual users."
+    )
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--sessions", type=int, default=None, help="sessions to replay (default: one per conversation)")
+    parser.add_argument("--max-turns", type=int, default=None, help="user turns replayed per session")
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds between turns of a session")
+    parser.add_argument("--users-file", default="data/users.json", help="user store to take chat_history from")
+    parser.add_argument("--synthetic-turns", type=int, default=6, help="turns per session when no history is recorded")
+    parser.add_argument("--model", default="o4-mini")
+    parser.add_argument("--max-connections", type=int, default=10)
+    parser.add_argument(
+        "--base-url",
+        default=None,
+        help="Responses API base URL; defaults to a bundled local fake server",
+    )
+    parser.add_argument("--latency", type=float, default=0.05, help="fake server: seconds before the first byte")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="fake server: seconds between chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake server: share of 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fake server: share of 429 responses")
+    parser.add_argument("--rpm", type=int, default=None, help="fake server: requests per minute quota")
+    parser.add_argument("--tpm", type=int, default=None, help="fake server: tokens per minute quota")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    for handler in logging.getLogger().handlers:
+        handler.setLevel(logging.WARNING)
+    print_report(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
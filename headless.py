@@ -0,0 +1,375 @@
+import argparse
+import asyncio
+import getpass
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from typing import TextIO
+
+from dotenv import load_dotenv
+
+from managers.ai_manager import AIManager
+from managers.exceptions import InvalidPasswordError, UserNotFoundError
+from managers.model_router import ModelRouter
+from managers.response_cache import create_response_cache
+from managers.response_handle import PartialReply
+from managers.turn_metrics import LatencySummary
+from managers.users_manager import UsersManager
+from models.user import User
+
+OUTPUT_FORMATS = ("text", "jsonl")
+
+
+@dataclass
+class Conversation:
+    email: str
+    # A list for scripted sessions, or an async iterable read as it arrives.
+    messages: Iterable[str] | AsyncIterable[str] = field(default_factory=list)
+    password: str | None = None
+    passcode: str | None = None
+
+
+@dataclass
+class HeadlessReport(LatencySummary):
+    conversations: int = 0
+    turns: int = 0
+    latencies: list[float] = field(default_factory=list)
+    errors: dict[str, int] = field(default_factory=dict)
+    auth_failures: int = 0
+    duration: float = 0.0
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values()) + self.auth_failures
+
+
+def parse_jsonl(lines: Iterable[str], default_email: str | None = None) -> list[Conversation]:
+    # One {"email", "message"[, "password", "passcode"]} object per line. The
+    # messages of each user form one conversation, kept in file order.
+    conversations: dict[str, Conversation] = {}
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {number}: {e}") from None
+        if not isinstance(record, dict):
+            raise ValueError(
+                f"Invalid record on line {number} ({type(record).__name__}) - must be a JSON object"
+            )
+        email = record.get("email", default_email)
+        message = record.get("message")
+        if not isinstance(email, str) or not email:
+            raise ValueError(
+                f"Invalid email '{email}' on line {number} ({type(email).__name__}) - must be non-empty string"
+            )
+        if not isinstance(message, str) or not message.strip():
+            raise ValueError(
+                f"Invalid message '{message}' on line {number} ({type(message).__name__}) - must be non-empty string"
+            )
+        conversation = conversations.setdefault(email, Conversation(email))
+        conversation.password = record.get("password", conversation.password)
+        conversation.passcode = record.get("passcode", conversation.passcode)
+        conversation.messages.append(message)
+    return list(conversations.values())
+
+
+async def read_messages(stream: TextIO) -> AsyncIterator[str]:
+    # A daemon thread reads the stream, so replies are sent as each line
+    # arrives and a blocked read does not hold up the exit.
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def reader() -> None:
+        try:
+            for line in stream:
+                loop.call_soon_threadsafe(queue.put_nowait, line)
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+        except RuntimeError:
+            # The event loop closed first.
+            pass
+
+    threading.Thread(target=reader, name="headless-stdin", daemon=True).start()
+    while (line := await queue.get()) is not None:
+        if line.strip():
+            yield line.rstrip("\r\n")
+
+
+async def _iterate(messages: Iterable[str] | AsyncIterable[str]) -> AsyncIterator[str]:
+    if isinstance(messages, AsyncIterable):
+        async for message in messages:
+            yield message
+    else:
+        for message in messages:
+            yield message
+
+
+# Runs conversations without the TUI: each one authenticates its user, opens
+# a chat session on the user's history the way TherapyMode does and sends the
+# messages one turn at a time. Conversations run concurrently; AIManager's
+# scheduler still caps the requests in flight.
+class HeadlessRunner:
+    def __init__(
+        self,
+        users_manager: UsersManager,
+        ai_manager: AIManager,
+        output: TextIO | None = None,
+        output_format: str = "jsonl",
+        stream: bool = True,
+        concurrency: int = 20,
+        password: str | None = None,
+        passcode: str | None = None,
+        error_output: TextIO | None = None,
+    ) -> None:
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Invalid output_format '{output_format}' ({type(output_format).__name__}) - must be one of {OUTPUT_FORMATS}"
+            )
+        if not isinstance(concurrency, int) or concurrency < 1:
+            raise ValueError(
+                f"Invalid concurrency '{concurrency}' ({type(concurrency).__name__}) - must be a positive integer."
+            )
+        self.users_manager = users_manager
+        self.ai_manager = ai_manager
+        self.output = output or sys.stdout
+        self.error_output = error_output or sys.stderr
+        self.output_format = output_format
+        self.stream = stream
+        self.concurrency = concurrency
+        self.password = password
+        self.passcode = passcode
+        self.sessions_started = 0
+
+    def check_conversations(self, conversations: list[Conversation]) -> None:
+        emails = [conversation.email for conversation in conversations]
+        if len(set(emails)) != len(emails):
+            raise ValueError("Each user must have a single conversation.")
+        # Plain text has no field saying whose reply a line belongs to.
+        if self.output_format == "text" and len(conversations) > 1:
+            raise ValueError(
+                f"Invalid output_format 'text' for {len(conversations)} conversations - must be jsonl for more than one"
+            )
+
+    async def run(self, conversations: list[Conversation]) -> HeadlessReport:
+        self.check_conversations(conversations)
+        report = HeadlessReport()
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def run_in_slot(conversation: Conversation) -> None:
+            async with slots:
+                await self.run_conversation(conversation, report)
+
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(run_in_slot(conversation) for conversation in conversations))
+        finally:
+            report.duration = time.perf_counter() - start
+            # Rolling summaries started on the last turns belong in the saved state.
+            await self.ai_manager.wait_for_summaries()
+            self.save_history()
+        return report
+
+    async def run_conversation(self, conversation: Conversation, report: HeadlessReport) -> None:
+        report.conversations += 1
+        try:
+            user = await self.authenticate(conversation)
+        except (UserNotFoundError, InvalidPasswordError, ValueError) as e:
+            report.auth_failures += 1
+            self._emit(conversation.email, 0, "error", str(e))
+            return
+
+        user.start_chat_session()
+        self.sessions_started += 1
+        turn = 0
+        async for message in _iterate(conversation.messages):
+            turn += 1
+            await self.send(user, message, turn, report)
+
+    async def authenticate(self, conversation: Conversation) -> User:
+        # bcrypt takes a noticeable fraction of a second per check, so it runs
+        # in a worker thread while other conversations keep streaming.
+        return await asyncio.to_thread(
+            self.users_manager.authenticate_user,
+            conversation.email,
+            conversation.password or self.password,
+            conversation.passcode or self.passcode,
+        )
+
+    async def send(self, user: User, text: str, turn: int, report: HeadlessReport) -> None:
+        user.chat_history.append(("You", text))
+        report.turns += 1
+        shown = ""
+
+        def show_partial(partial_text: str) -> None:
+            nonlocal shown
+            if not partial_text.startswith(shown):
+                # A retried attempt streams its reply from the start.
+                self._emit(user.email, turn, "reset", "")
+                shown = ""
+            if len(partial_text) > len(shown):
+                self._emit(user.email, turn, "delta", partial_text[len(shown):])
+                shown = partial_text
+
+        start = time.perf_counter()
+        try:
+            # Nothing else appends to this history until the turn is over,
+            # so the reply can read it in place.
+            reply = await self.ai_manager.get_response(
+                user.chat_history,
+                conversation_state=user.conversation_state,
+                partial=PartialReply(show_partial if self.stream else None),
+            )
+        except Exception as e:
+            logging.error(
+                "Error fetching response for %s: %s", user.email, e, exc_info=(type(e), e, e.__traceback__)
+            )
+            user.chat_history.append(("System", f"error fetching response: {e}"))
+            name = e.__class__.__name__
+            report.errors[name] = report.errors.get(name, 0) + 1
+            self._emit(user.email, turn, "error", str(e))
+            return
+
+        report.latencies.append(time.perf_counter() - start)
+        user.chat_history.append(("AI", reply))
+        # Cached replies and --no-stream runs have shown nothing yet.
+        show_partial(reply)
+        self._emit(user.email, turn, "reply", reply)
+
+    def save_history(self) -> None:
+        if not self.sessions_started:
+            return
+        try:
+            self.users_manager.save_users()
+            logging.info(f"Chat history saved for {self.sessions_started} headless sessions.")
+        except Exception as e:
+            logging.exception(f"Failed to save chat history of headless sessions: {e}")
+
+    def _emit(self, email: str, turn: int, event: str, text: str) -> None:
+        if self.output_format == "jsonl":
+            if event in ("delta", "reset") and not self.stream:
+                return
+            self.output.write(
+                json.dumps({"email": email, "turn": turn, "event": event, "text": text}, ensure_ascii=False) + "\n"
+            )
+            if event != "delta":
+                self.output.flush()
+            return
+
+        if event == "error":
+            self.error_output.write(f"Error ({email}): {text}\n")
+            self.error_output.flush()
+            return
+        self.output.write(text if event == "delta" else "\n")
+        self.output.flush()
+
+
+def print_report(report: HeadlessReport, file: TextIO = sys.stderr) -> None:
+    print(f"conversations      {report.conversations}", file=file)
+    print(f"turns              {report.turns} in {report.duration:.2f} s", file=file)
+    print(f"throughput         {report.throughput:.2f} turns/s", file=file)
+    print(
+        f"latency ms         p50 {report.percentile(50) * 1000:.1f}  p95 {report.percentile(95) * 1000:.1f}",
+        file=file,
+    )
+    errors = ", ".join(f"{name} {count}" for name, count in sorted(report.errors.items()))
+    print(
+        f"errors             {report.error_count} (failed logins {report.auth_failures}){': ' + errors if errors else ''}",
+        file=file,
+    )
+
+
+async def main_async(args) -> HeadlessReport:
+    password = os.getenv("HEADLESS_PASSWORD")
+    passcode = os.getenv("HEADLESS_PASSCODE")
+    if args.jsonl:
+        if args.jsonl == "-":
+            conversations = parse_jsonl(sys.stdin, args.email)
+        else:
+            with open(args.jsonl, encoding="utf-8") as file:
+                conversations = parse_jsonl(file, args.email)
+    else:
+        if not args.email:
+            raise ValueError("--email is required when reading plain messages from stdin.")
+        if not (password and passcode) and not sys.stdin.isatty():
+            raise ValueError(
+                "HEADLESS_PASSWORD and HEADLESS_PASSCODE must be set when messages are piped to stdin."
+            )
+        password = password or getpass.getpass("Password: ", stream=sys.stderr)
+        passcode = passcode or getpass.getpass("Passcode: ", stream=sys.stderr)
+        conversations = [Conversation(args.email, read_messages(sys.stdin))]
+
+    ai_manager = AIManager(
+        cache=create_response_cache(),
+        router=ModelRouter(),
+        base_url=args.base_url,
+        max_connections=args.max_connections,
+        max_keepalive_connections=args.max_connections,
+    )
+    runner = HeadlessRunner(
+        UsersManager(args.users_file),
+        ai_manager,
+        output_format=args.format or ("jsonl" if args.jsonl else "text"),
+        stream=not args.no_stream,
+        concurrency=args.concurrency,
+        password=password,
+        passcode=passcode,
+    )
+    try:
+        await asyncio.to_thread(ai_manager.prepare)
+        await ai_manager.warm_up()
+        return await runner.run(conversations)
+    finally:
+        await ai_manager.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Chat without the terminal UI. Reads one message per line from stdin, or JSONL records "
+            '{"email", "message"[, "password", "passcode"]} with --jsonl, and streams the replies to stdout. '
+            "Passwords default to HEADLESS_PASSWORD and HEADLESS_PASSCODE."
+        )
+    )
+    parser.add_argument("--email", default=None, help="user for stdin messages (default e-mail for JSONL records)")
+    parser.add_argument("--jsonl", default=None, help="JSONL file with scripted conversations, '-' for stdin")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=None, help="output format (default: jsonl for --jsonl, else text)")
+    parser.add_argument("--no-stream", action="store_true", help="write whole replies instead of streamed deltas")
+    parser.add_argument("--concurrency", type=int, default=20, help="conversations run at once")
+    parser.add_argument("--users-file", default="data/users.json")
+    parser.add_argument("--base-url", default=None, help="Responses API base URL")
+    parser.add_argument("--max-connections", type=int, default=10)
+    parser.add_argument("--report", action="store_true", help="print throughput and latency to stderr")
+    parser.add_argument("--log-file", default="headless.log")
+    args = parser.parse_args(argv)
+
+    load_dotenv("secrets.env")
+    logging.basicConfig(
+        filename=args.log_file,
+        filemode="w",
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        level=logging.INFO,
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    logging.getLogger("openai").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    try:
+        report = asyncio.run(main_async(args))
+    except KeyboardInterrupt:
+        return 130
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if args.report:
+        print_report(report)
+    return 1 if report.error_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,36 @@
+import asyncio
+import hashlib
 import logging
+import threading
 import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING
 
-from openai import OpenAI
-
-from openai._exceptions import (
-    APIError,
-    OpenAIError,
-    ConflictError,
-    NotFoundError,
-    APIStatusError,
-    RateLimitError,
-    APITimeoutError,
-    BadRequestError,
-    APIConnectionError,
-    AuthenticationError,
-    InternalServerError,
-    PermissionDeniedError,
-    UnprocessableEntityError,
-    APIResponseValidationError,
+from managers.context_window import ContextWindow
+from managers.exceptions import AIIncompleteResponseError, AIStreamError, AIUnavailableError
+from managers.formatted_history import FormattedHistory, HistorySnapshot, format_message
+from managers.model_router import ModelRouter, RouteDecision
+from managers.rate_limit_pacer import RateLimitPacer
+from managers.request_scheduler import RequestScheduler
+from managers.response_cache import ResponseCache
+from managers.response_handle import PartialReply, ResponseHandle
+from managers.response_models import preload_response_models
+from managers.retry_policy import (
+    CircuitBreaker,
+    RetryBudget,
+    decorrelated_jitter,
+    parse_retry_after,
 )
+from managers.turn_metrics import TurnMetrics, TurnRecord
+from models.conversation_state import ConversationState
+
+# openai (with pydantic and its HTTP client) takes a large share of startup, so it is
+# imported when the first client is built rather than with this module.
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, APIStatusError, OpenAIError
+
+# Appended to a reply the provider marked incomplete.
+INCOMPLETE_REPLY_NOTE = "[This reply was cut short ({reason}).]"
 
 
 class AIManager:
@@ -28,70 +40,576 @@ class AIManager:
         model: str = "o4-mini",
         instructions: str = "You are a helpful, step-by-step reasoning assistant.",
         max_retries: int = 3,
-        backoff_factor: float = 2.0,
+        backoff_base: float = 0.5,
+        max_backoff: float = 20.0,
+        retry_budget: RetryBudget | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        cache: ResponseCache | None = None,
+        context_window: ContextWindow | None = None,
+        summary_instructions: str = (
+            "Summarize the conversation for the assistant's future reference. "
+            "Merge it with the previous summary if one is given. Keep facts, "
+            "feelings, goals and open topics; be concise and write in third person."
+        ),
+        summary_batch_messages: int = 8,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        client: "AsyncOpenAI | None" = None,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 5,
+        keepalive_expiry: float = 120.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 120.0,
+        models: list[str] | None = None,
+        latency_slo: float | None = None,
+        router: ModelRouter | None = None,
+        scheduler: RequestScheduler | None = None,
+        pacer: RateLimitPacer | None = None,
     ):
-        self.client = OpenAI()
-        self.model = model
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.base_url = base_url
+        self.api_key = api_key
+        self._client = client
+        self._client_lock = threading.Lock()
+        self.prepared = False
+        self.warmed_up = False
+        self._first_response_logged = False
+        # Ordered by preference: the first model is the primary, the next one
+        # serves hedged requests when the primary misses the latency SLO.
+        self.models = list(models) if models else [model]
+        self.model = self.models[0]
+        self.latency_slo = latency_slo
+        self.router = router
+        # One slot per in-flight request, sized to the connection pool.
+        self.scheduler = scheduler or RequestScheduler(max_in_flight=max_connections)
+        self.turn_metrics = TurnMetrics()
         self.instructions = instructions
         self.max_retries = max_retries
-        self.backoff_factor = backoff_factor
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.retry_budget = retry_budget or RetryBudget()
+        self.pacer = pacer or RateLimitPacer(max_wait=max_backoff)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.cache = cache
+        self.context_window = context_window or ContextWindow()
+        self.summary_instructions = summary_instructions
+        self.summary_batch_messages = summary_batch_messages
+        self._summary_tasks: dict[int, asyncio.Task] = {}
+
+    @property
+    def client(self) -> "AsyncOpenAI":
+        # Built on first use; prepare() may be doing so in a worker thread.
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client(self.base_url, self.api_key)
+        return self._client
+
+    def _create_client(self, base_url: str | None, api_key: str | None) -> "AsyncOpenAI":
+        from openai import DEFAULT_CONNECTION_LIMITS, AsyncOpenAI, DefaultAsyncHttpxClient, Timeout
+
+        # The pool is built through the SDK's own default client, so it uses
+        # whichever HTTP library the installed SDK depends on.
+        Limits = type(DEFAULT_CONNECTION_LIMITS)
+        http_client = DefaultAsyncHttpxClient(
+            limits=Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            timeout=Timeout(
+                self.read_timeout,
+                connect=self.connect_timeout,
+            ),
+        )
+        # Retries are handled by _create_response, not by the SDK.
+        return AsyncOpenAI(
+            base_url=base_url, api_key=api_key, http_client=http_client, max_retries=0
+        )
+
+    def prepare(self) -> None:
+        # Blocking work done ahead of the first request, safe to run in a
+        # worker thread: import the SDK and build the client. What the SDK
+        # sets up on first use is left to the warm_up() request.
+        start = time.perf_counter()
+        self.client
+        self.prepared = True
+        logging.info("AI client prepared in %.3f seconds.", time.perf_counter() - start)
+
+    async def warm_up(self) -> bool:
+        # Opens (DNS, TCP, TLS) a pooled keep-alive connection ahead of the
+        # first real request, while a worker thread builds the SDK's reply
+        # stream models.
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(
+                self.client.models.list(), asyncio.to_thread(preload_response_models)
+            )
+        except Exception as e:
+            logging.warning("AI connection warm-up failed: %s", e)
+            return False
+        self.warmed_up = True
+        logging.info("AI connection warmed up in %.3f seconds.", time.perf_counter() - start)
+        return True
+
+    async def wait_for_summaries(self) -> None:
+        # Lets a caller that is about to save the conversation state include
+        # summaries still being written in the background.
+        if self._summary_tasks:
+            await asyncio.gather(*self._summary_tasks.values(), return_exceptions=True)
+
+    async def close(self) -> None:
+        if self.cache:
+            await self.cache.close()
+        if self._client is not None:
+            await self._client.close()
 
     def _format_history_for_openai_api(self, message_history: list[tuple[str, str]]) -> list[dict[str, str]]:
-        formatted_input = []
-        for sender, content in message_history:
-            role = "assistant" if sender == "AI" else "user" if sender == "You" else "system" if sender == "System" else None
-            if role:
-                formatted_input.append({"role": role, "content": content})
-        return formatted_input
+        return [
+            message
+            for sender, content in message_history
+            if (message := format_message(sender, content))
+        ]
 
-    def get_response(self, message_history: list[tuple[str, str]], override_instructions: str | None = None) -> str:
+    def _get_formatted_history(
+        self, conversation_state: ConversationState | None
+    ) -> FormattedHistory:
+        if conversation_state is None:
+            return FormattedHistory(self.context_window)
+        if not isinstance(conversation_state.formatted_history, FormattedHistory):
+            conversation_state.formatted_history = FormattedHistory(self.context_window)
+        return conversation_state.formatted_history
+
+    async def get_response(
+        self,
+        message_history: list[tuple[str, str]],
+        override_instructions: str | None = None,
+        conversation_state: ConversationState | None = None,
+        mode: str = ModelRouter.CHAT,
+        priority: int = RequestScheduler.INTERACTIVE,
+        partial: PartialReply | None = None,
+    ) -> str:
 
         if not message_history:
             logging.error("Empty question passed to get_response()")
             raise ValueError("Question must be a non-empty string.")
 
         current_instructions = override_instructions or self.instructions
+        route = self.router.route(message_history, mode) if self.router else RouteDecision(self.model)
+
+        if self._first_response_logged:
+            return await self._get_response(
+                message_history, current_instructions, conversation_state, route, priority, partial
+            )
+
+        start = time.perf_counter()
+        response_text = await self._get_response(
+            message_history, current_instructions, conversation_state, route, priority, partial
+        )
+        self._first_response_logged = True
+        logging.info(
+            "First AI response latency: %.3f seconds (connection warmed up: %s).",
+            time.perf_counter() - start,
+            self.warmed_up,
+        )
+        return response_text
+
+    def start_response(
+        self,
+        message_history: list[tuple[str, str]],
+        on_partial: Callable[[str], None] | None = None,
+        **kwargs,
+    ) -> ResponseHandle:
+        # Runs get_response in the background on a snapshot of the history, so
+        # the caller can cancel it and watch the reply stream in.
+        partial = PartialReply(on_partial)
+        task = asyncio.get_running_loop().create_task(
+            self.get_response(HistorySnapshot(message_history), partial=partial, **kwargs)
+        )
+        return ResponseHandle(task, partial)
+
+    async def _get_response(
+        self,
+        message_history: list[tuple[str, str]],
+        current_instructions: str,
+        conversation_state: ConversationState | None,
+        route: RouteDecision,
+        priority: int,
+        partial: PartialReply | None,
+    ) -> str:
+        if conversation_state and (
+            delta_input_array := self._get_chain_delta(
+                message_history, current_instructions, conversation_state
+            )
+        ):
+            from openai._exceptions import BadRequestError, NotFoundError
+
+            try:
+                return await self._get_chained_response(
+                    message_history,
+                    current_instructions,
+                    conversation_state,
+                    route,
+                    delta_input_array,
+                    priority,
+                    partial,
+                )
+            except (NotFoundError, BadRequestError) as e:
+                if not self._is_expired_chain_error(e):
+                    raise
+                logging.warning(
+                    "Server-side conversation state expired, resending full history: %s", e
+                )
+                conversation_state.reset_chain()
+
+        return await self._get_full_response(
+            message_history, current_instructions, conversation_state, route, priority, partial
+        )
 
-        formatted_input_array = self._format_history_for_openai_api(message_history)
+    async def _get_full_response(
+        self,
+        message_history: list[tuple[str, str]],
+        current_instructions: str,
+        conversation_state: ConversationState | None,
+        route: RouteDecision,
+        priority: int,
+        partial: PartialReply | None,
+    ) -> str:
+        formatted_history = self._get_formatted_history(conversation_state)
+        full_input_array = formatted_history.sync(message_history)
+        summary_message = None
+        if conversation_state:
+            if conversation_state.summarized_count > len(full_input_array):
+                logging.warning("Conversation state is ahead of the history, resetting summary.")
+                conversation_state.reset()
+            if conversation_state.summary:
+                summary_message = {
+                    "role": "system",
+                    "content": f"Summary of the earlier conversation:\n{conversation_state.summary}",
+                }
 
+        window_start = self.context_window.get_window_start(
+            current_instructions
+            + (f"\n{summary_message['content']}" if summary_message else ""),
+            formatted_history.token_totals,
+            formatted_history.window_start,
+        )
+        formatted_history.window_start = window_start
+        formatted_input_array = (
+            [summary_message, *full_input_array[window_start:]]
+            if summary_message
+            else full_input_array[window_start:]
+        )
+        input_tokens = self.context_window.last_input_tokens
+        if conversation_state:
+            self._schedule_summary(
+                conversation_state,
+                full_input_array,
+                self.context_window.last_dropped_messages,
+            )
 
-        if not formatted_input_array or formatted_input_array[0].get("role") != "system":
-             formatted_input_array.insert(0, {"role": "system", "content": current_instructions})
-        elif formatted_input_array[0].get("role") == "system":
-             formatted_input_array[0]["content"] = current_instructions
+        cache_key = None
+        if self.cache:
+            cache_key = ResponseCache.make_key(
+                route.model,
+                current_instructions,
+                formatted_input_array,
+                route.to_payload(),
+            )
+            if (cached_text := self.cache.get(cache_key)) is not None:
+                logging.info(
+                    "Response cache hit [%s] (%s)", route.model, self.cache.metrics()
+                )
+                if conversation_state:
+                    conversation_state.reset_chain()
+                return cached_text
 
         payload = {
-            "model": self.model,
+            **route.to_payload(),
+            "instructions": current_instructions,
             "input": formatted_input_array,
         }
 
+        resp = await self._create_response(payload, priority=priority, partial=partial)
+        if conversation_state:
+            conversation_state.usage.record(*self._get_usage(resp))
+        response_text = self._get_reply_text(resp)
+        if conversation_state:
+            self._advance_chain(
+                conversation_state, resp, message_history, current_instructions, input_tokens
+            )
+        if cache_key and getattr(resp, "output_text", None) and not self._is_incomplete(resp):
+            self.cache.put(cache_key, response_text)
+        return response_text
+
+    async def _get_chained_response(
+        self,
+        message_history: list[tuple[str, str]],
+        current_instructions: str,
+        conversation_state: ConversationState,
+        route: RouteDecision,
+        delta_input_array: list[dict[str, str]],
+        priority: int,
+        partial: PartialReply | None,
+    ) -> str:
+        # Instructions are not carried over from the previous response.
+        payload = {
+            **route.to_payload(),
+            "instructions": current_instructions,
+            "input": delta_input_array,
+            "previous_response_id": conversation_state.previous_response_id,
+        }
+        resp = await self._create_response(payload, priority=priority, partial=partial)
+        conversation_state.usage.record(*self._get_usage(resp))
+        response_text = self._get_reply_text(resp)
+        input_tokens = conversation_state.chain_tokens + sum(
+            self.context_window.count_message(message) for message in delta_input_array
+        )
+        self._advance_chain(
+            conversation_state, resp, message_history, current_instructions, input_tokens
+        )
+        return response_text
+
+    def _get_chain_delta(
+        self,
+        message_history: list[tuple[str, str]],
+        current_instructions: str,
+        conversation_state: ConversationState,
+    ) -> list[dict[str, str]] | None:
+        # The server already holds everything up to and including the last AI
+        # reply, so only the messages added since then need to be sent.
+        count = conversation_state.response_count
+        if (
+            not conversation_state.previous_response_id
+            or conversation_state.chain_key != self._get_chain_key(current_instructions)
+            or not 0 < count < len(message_history)
+            or message_history[count - 1][0] != "AI"
+        ):
+            return None
+
+        delta_input_array = self._format_history_for_openai_api(message_history[count:])
+        delta_tokens = sum(
+            self.context_window.count_message(message) for message in delta_input_array
+        )
+        if conversation_state.chain_tokens + delta_tokens > self.context_window.max_input_tokens:
+            logging.info(
+                "Server-side conversation would exceed the input budget, resending trimmed history."
+            )
+            return None
+        return delta_input_array
+
+    def _advance_chain(
+        self,
+        conversation_state: ConversationState,
+        resp,
+        message_history: list[tuple[str, str]],
+        current_instructions: str,
+        input_tokens: int,
+    ) -> None:
+        response_id = getattr(resp, "id", None)
+        if not isinstance(response_id, str):
+            conversation_state.reset_chain()
+            return
+        conversation_state.previous_response_id = response_id
+        # The caller appends the AI reply, which the server already has.
+        conversation_state.response_count = len(message_history) + 1
+        conversation_state.chain_tokens = input_tokens + self.context_window.count_text(
+            self._get_response_text(resp)
+        )
+        conversation_state.chain_key = self._get_chain_key(current_instructions)
+
+    def _get_chain_key(self, current_instructions: str) -> str:
+        # Only the instructions pin a chain, the server accepts a different
+        # model per turn, so routing does not force a full resend.
+        raw = current_instructions.encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()[:16]
+
+    @staticmethod
+    def _is_expired_chain_error(error: "APIStatusError") -> bool:
+        return getattr(error, "param", None) == "previous_response_id" or (
+            "previous response" in str(error).lower()
+        )
+
+    @staticmethod
+    def _get_usage(resp) -> tuple[int, int]:
+        usage = getattr(resp, "usage", None)
+        details = getattr(usage, "input_tokens_details", None)
+        return (
+            getattr(usage, "input_tokens", 0) or 0,
+            getattr(details, "cached_tokens", 0) or 0,
+        )
+
+    @staticmethod
+    def _get_response_text(resp) -> str:
+        if not (hasattr(resp, 'output_text') and resp.output_text):
+            return "No text response received."
+        return resp.output_text.strip()
+
+    @staticmethod
+    def _is_incomplete(resp) -> bool:
+        return getattr(resp, "status", None) == "incomplete"
+
+    @staticmethod
+    def _get_reply_text(resp) -> str:
+        # A reply cut short (output token cap, content filter) is never passed
+        # off as complete: it keeps a note saying so, or fails without text.
+        if not AIManager._is_incomplete(resp):
+            return AIManager._get_response_text(resp)
+        reason = getattr(getattr(resp, "incomplete_details", None), "reason", None) or "unknown reason"
+        if not getattr(resp, "output_text", None):
+            raise AIIncompleteResponseError(reason)
+        logging.warning("AI reply was cut short: %s", reason)
+        return f"{resp.output_text.strip()}\n\n{INCOMPLETE_REPLY_NOTE.format(reason=reason)}"
+
+    def _schedule_summary(
+        self,
+        conversation_state: ConversationState,
+        full_input_array: list[dict[str, str]],
+        dropped_count: int,
+    ) -> None:
+        # Summarize in batches, so the summary is not redone on every turn as
+        # the window slides by a message or two.
+        if dropped_count - conversation_state.summarized_count < self.summary_batch_messages:
+            return
+        state_key = id(conversation_state)
+        if (task := self._summary_tasks.get(state_key)) and not task.done():
+            return
+
+        # Take at most one window's worth of messages per summarization call;
+        # the next overflow continues from where this one stopped.
+        budget = self.context_window.max_input_tokens - self.context_window.count_text(
+            conversation_state.summary
+        )
+        start = conversation_state.summarized_count
+        end = start
+        while end < dropped_count:
+            budget -= self.context_window.count_message(full_input_array[end])
+            if budget < 0 and end > start:
+                break
+            end += 1
+
+        task = asyncio.create_task(
+            self._update_summary(conversation_state, full_input_array[start:end], end)
+        )
+        self._summary_tasks[state_key] = task
+        task.add_done_callback(lambda _task: self._summary_tasks.pop(state_key, None))
+
+    async def _update_summary(
+        self,
+        conversation_state: ConversationState,
+        messages: list[dict[str, str]],
+        summarized_count: int,
+    ) -> None:
+        previous_summary = conversation_state.summary
+        input_array = []
+        if previous_summary:
+            input_array.append(
+                {"role": "system", "content": f"Previous summary:\n{previous_summary}"}
+            )
+        input_array.extend(
+            {"role": "user", "content": f"{message['role']}: {message['content']}"}
+            for message in messages
+        )
+
+        try:
+            logging.info(
+                "Summarizing %d older messages in the background.", len(messages)
+            )
+            route = (
+                self.router.route(
+                    [(message["role"], message["content"]) for message in messages],
+                    ModelRouter.SUMMARY,
+                )
+                if self.router
+                else RouteDecision(self.model)
+            )
+            resp = await self._create_response(
+                {
+                    **route.to_payload(),
+                    "instructions": self.summary_instructions,
+                    "input": input_array,
+                },
+                hedge=False,
+                priority=RequestScheduler.SUMMARY,
+            )
+        except Exception:
+            logging.exception("Background summarization failed, keeping previous summary.")
+            return
+
+        if self._is_incomplete(resp):
+            logging.warning("Background summarization was cut short, keeping previous summary.")
+            return
+        summary = resp.output_text.strip() if getattr(resp, "output_text", None) else ""
+        if not summary:
+            logging.warning("Background summarization returned no text.")
+            return
+        if conversation_state.summary != previous_summary:
+            logging.warning("Conversation summary changed during summarization, discarding.")
+            return
+        conversation_state.summary = summary
+        conversation_state.summarized_count = summarized_count
+        logging.info("Conversation summary now covers %d messages.", summarized_count)
+
+    async def _create_response(
+        self,
+        payload: dict,
+        hedge: bool = True,
+        priority: int = RequestScheduler.INTERACTIVE,
+        partial: PartialReply | None = None,
+    ):
+        from openai._exceptions import (
+            OpenAIError,
+            ConflictError,
+            NotFoundError,
+            APIStatusError,
+            RateLimitError,
+            APITimeoutError,
+            BadRequestError,
+            APIConnectionError,
+            AuthenticationError,
+            InternalServerError,
+            PermissionDeniedError,
+            UnprocessableEntityError,
+            APIResponseValidationError,
+        )
+
+        self.circuit_breaker.before_request()
+        self.retry_budget.record_request()
         attempt = 0
+        wait = 0.0
         while True:
             try:
                 logging.info(
                     "Calling Responses API [%s] (attempt %d): input messages %d",
-                    self.model,
+                    payload["model"],
                     attempt + 1,
-                    len(formatted_input_array),
+                    len(payload["input"]),
                 )
-                resp = self.client.responses.create(**payload)
+                # Backoff sleeps happen outside the slot so they do not hold
+                # up other requests.
+                if partial:
+                    partial.reset()
+                async with self.scheduler.slot(priority):
+                    resp = await self._request(payload, hedge, partial)
                 logging.debug("API raw response: %r", resp)
-                return resp.output_text.strip() if hasattr(resp, 'output_text') and resp.output_text else "No text response received."
+                self.circuit_breaker.record_success()
+                return resp
 
-            # Transient / retryable errors
-            except (RateLimitError, APITimeoutError, APIConnectionError) as e:
+            # Transient / retryable errors; a streamed reply reports a server-side
+            # failure as an event instead of a 5xx status.
+            except (
+                RateLimitError,
+                APITimeoutError,
+                APIConnectionError,
+                InternalServerError,
+                AIStreamError,
+            ) as e:
                 attempt += 1
-                if attempt > self.max_retries:
-                    logging.exception("Exceeded retries for transient error: %s", e)
-                    raise
-                wait = self.backoff_factor**attempt
-                logging.warning(
-                    "%s on attempt %d – retrying in %.1f seconds",
-                    e.__class__.__name__,
-                    attempt,
-                    wait,
-                )
-                time.sleep(wait)
+                wait = await self._wait_before_retry(e, attempt, wait)
 
             # Client or configuration errors – do not retry
             except (
@@ -103,24 +621,213 @@ class AIManager:
                 UnprocessableEntityError,
                 APIResponseValidationError,
             ) as e:
+                # The provider answered, so this does not count against the breaker.
+                self.circuit_breaker.record_success()
                 logging.error(
                     "Non-retryable OpenAI error [%s]: %s", e.__class__.__name__, e
                 )
                 raise
 
-            # Server‑side errors (5xx) or unknown status codes
-            except (APIStatusError, InternalServerError) as e:
-                logging.exception(
-                    "Server error [%s], giving up: %s", e.__class__.__name__, e
-                )
+            # Other server‑side errors (5xx) are retried, unknown status codes are not
+            except APIStatusError as e:
+                if e.status_code < 500:
+                    logging.exception(
+                        "Unexpected status [%s], giving up: %s", e.__class__.__name__, e
+                    )
+                    raise
+                attempt += 1
+                wait = await self._wait_before_retry(e, attempt, wait)
+
+            # The pacer would have to wait longer than allowed, nothing was sent.
+            # The exception has already logged why.
+            except AIUnavailableError:
+                self.circuit_breaker.release_trial()
                 raise
 
             # Any other OpenAIError
             except OpenAIError as e:
-                logging.exception("OpenAIError in get_response: %s", e)
+                logging.exception("OpenAIError in _create_response: %s", e)
                 raise
 
             # Catch‑all
             except Exception as e:
-                logging.exception("Unexpected error in AIManager.get_response: %s", e)
+                logging.exception("Unexpected error in AIManager._create_response: %s", e)
                 raise
+
+    async def _request(self, payload: dict, hedge: bool, partial: PartialReply | None = None):
+        start = time.perf_counter()
+        fallback_model = self._get_fallback_model(payload["model"]) if hedge else None
+        if fallback_model is None or self.latency_slo is None:
+            resp = await self._stream_response(payload, asyncio.Event(), partial)
+            input_tokens, cached_tokens = self._get_usage(resp)
+            self.turn_metrics.record(
+                TurnRecord(
+                    payload["model"],
+                    time.perf_counter() - start,
+                    input_tokens=input_tokens,
+                    cached_tokens=cached_tokens,
+                )
+            )
+            return resp
+
+        first_tokens = {payload["model"]: asyncio.Event(), fallback_model: asyncio.Event()}
+        requests = {
+            payload["model"]: asyncio.create_task(
+                self._stream_response(payload, first_tokens[payload["model"]], partial)
+            )
+        }
+        waiters = {
+            payload["model"]: asyncio.create_task(first_tokens[payload["model"]].wait())
+        }
+        try:
+            done, _ = await asyncio.wait(
+                {requests[payload["model"]], waiters[payload["model"]]},
+                timeout=self.latency_slo,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            hedged = not done
+            if hedged:
+                logging.info(
+                    "No first token from %s within %.2f seconds, hedging with %s.",
+                    payload["model"],
+                    self.latency_slo,
+                    fallback_model,
+                )
+                hedge_payload = dict(payload, model=fallback_model)
+                requests[fallback_model] = asyncio.create_task(
+                    self._stream_response(hedge_payload, first_tokens[fallback_model], partial)
+                )
+                waiters[fallback_model] = asyncio.create_task(
+                    first_tokens[fallback_model].wait()
+                )
+
+            winner = await self._first_to_answer(requests, waiters)
+            # Stop the loser as soon as the winner is known, so it is not
+            # streamed (and billed) while the winner finishes.
+            for task in (*requests.values(), *waiters.values()):
+                if task is not requests[winner]:
+                    task.cancel()
+            resp = await requests[winner]
+            input_tokens, cached_tokens = self._get_usage(resp)
+            self.turn_metrics.record(
+                TurnRecord(
+                    winner,
+                    time.perf_counter() - start,
+                    hedged=hedged,
+                    input_tokens=input_tokens,
+                    cached_tokens=cached_tokens,
+                )
+            )
+            return resp
+        finally:
+            for task in (*requests.values(), *waiters.values()):
+                task.cancel()
+
+    @staticmethod
+    async def _first_to_answer(
+        requests: dict[str, asyncio.Task], waiters: dict[str, asyncio.Task]
+    ) -> str:
+        # A request wins once it streams its first token or completes; failed
+        # requests drop out while another one is still running.
+        failed: list[BaseException] = []
+        pending = {*requests.values(), *waiters.values()}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for model, request in requests.items():
+                if waiters[model] in done or (request in done and not request.exception()):
+                    return model
+                if request in done:
+                    failed.append(request.exception())
+                    pending.discard(waiters[model])
+        raise failed[0]
+
+    async def _stream_response(
+        self,
+        payload: dict,
+        first_token: asyncio.Event,
+        partial: PartialReply | None = None,
+    ):
+        from openai._exceptions import APIStatusError
+
+        tokens = self._estimate_request_tokens(payload)
+        await self.pacer.acquire(tokens)
+        try:
+            stream = await self.client.responses.create(**payload, stream=True)
+        except APIStatusError as e:
+            self.pacer.release(tokens, e.response.headers)
+            raise
+        except BaseException:
+            self.pacer.release(tokens)
+            raise
+        self.pacer.release(tokens, getattr(getattr(stream, "response", None), "headers", None))
+
+        response = None
+        async with stream:
+            # Read the stream to its end (not just to the completed event) so
+            # the pooled keep-alive connection can be reused.
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    first_token.set()
+                    if partial:
+                        partial.append(first_token, event.delta)
+                elif event.type in ("response.completed", "response.incomplete"):
+                    response = event.response
+                elif event.type == "response.failed":
+                    raise AIStreamError(
+                        f"response failed ({getattr(event.response, 'error', None)})"
+                    )
+                elif event.type == "error":
+                    raise AIStreamError(f"stream error ({getattr(event, 'message', event)})")
+        if response is None:
+            raise AIStreamError("stream ended before the response completed")
+        return response
+
+    def _estimate_request_tokens(self, payload: dict) -> int:
+        # The provider counts input plus the output cap against the token quota.
+        return (
+            sum(self.context_window.count_message(message) for message in payload["input"])
+            + (self.context_window.count_text(payload["instructions"]) if payload.get("instructions") else 0)
+            + (payload.get("max_output_tokens") or 0)
+        )
+
+    def _get_fallback_model(self, model: str) -> str | None:
+        try:
+            index = self.models.index(model)
+        except ValueError:
+            return None
+        return self.models[index + 1] if index + 1 < len(self.models) else None
+
+    async def _wait_before_retry(self, error: "OpenAIError", attempt: int, previous_wait: float) -> float:
+        self.circuit_breaker.record_failure()
+        if self.circuit_breaker.is_open:
+            raise AIUnavailableError(self.circuit_breaker.retry_in()) from error
+        if attempt > self.max_retries:
+            logging.error("Exceeded retries for transient error: %s", error)
+            raise error
+        if not self.retry_budget.try_spend():
+            logging.error("Retry budget exhausted, not retrying: %s", error)
+            raise error
+
+        wait = decorrelated_jitter(self.backoff_base, self.max_backoff, previous_wait)
+        response = getattr(error, "response", None)
+        retry_after = parse_retry_after(getattr(response, "headers", None))
+        if retry_after is not None:
+            if retry_after > self.max_backoff:
+                logging.error(
+                    "Server asked to retry in %.1f seconds, more than the %.1f second limit: %s",
+                    retry_after,
+                    self.max_backoff,
+                    error,
+                )
+                raise AIUnavailableError(retry_after) from error
+            wait = max(wait, retry_after)
+
+        logging.warning(
+            "%s on attempt %d – retrying in %.1f seconds",
+            error.__class__.__name__,
+            attempt,
+            wait,
+        )
+        self.turn_metrics.record_retry()
+        await asyncio.sleep(wait)
+        return wait
@@ -0,0 +1,84 @@
+import bisect
+import logging
+from collections.abc import Callable
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough heuristic (~4 characters per token for English text), good enough
+    # for budgeting without pulling in a tokenizer dependency.
+    return (len(text) + 3) // 4
+
+
+class ContextWindow:
+    MESSAGE_OVERHEAD_TOKENS = 4
+
+    def __init__(
+        self,
+        max_input_tokens: int = 32000,
+        min_recent_messages: int = 4,
+        token_counter: Callable[[str], int] = estimate_tokens,
+        trim_slack: float = 0.25,
+    ) -> None:
+        if max_input_tokens < 1:
+            raise ValueError(
+                f"Invalid max_input_tokens '{max_input_tokens}' - must be >= 1"
+            )
+        if min_recent_messages < 1:
+            raise ValueError(
+                f"Invalid min_recent_messages '{min_recent_messages}' - must be >= 1"
+            )
+        if not 0 <= trim_slack < 1:
+            raise ValueError(
+                f"Invalid trim_slack '{trim_slack}' - must be >= 0 and < 1"
+            )
+        self.max_input_tokens = max_input_tokens
+        self.min_recent_messages = min_recent_messages
+        self.trim_slack = trim_slack
+        self.token_counter = token_counter
+
+        self.last_input_tokens = 0
+        self.last_dropped_messages = 0
+
+    def count_text(self, text: str) -> int:
+        return self.token_counter(text) + self.MESSAGE_OVERHEAD_TOKENS
+
+    def count_message(self, message: dict[str, str]) -> int:
+        # Counted once per message: FormattedHistory keeps running totals.
+        return self.count_text(message["content"])
+
+    def _log_dropped(self, dropped: int, total: int) -> None:
+        if dropped:
+            logging.info(
+                "Context window dropped %d of %d messages (~%d input tokens, budget %d).",
+                dropped,
+                total,
+                self.last_input_tokens,
+                self.max_input_tokens,
+            )
+
+    def get_window_start(
+        self, instructions: str, token_totals: list[int], previous_start: int = 0
+    ) -> int:
+        # token_totals[i] holds the tokens of the first i messages, so the
+        # oldest message that still fits is found by bisection.
+        instructions_tokens = self.count_text(instructions)
+        budget = self.max_input_tokens - instructions_tokens
+        count = len(token_totals) - 1
+        max_start = max(0, count - self.min_recent_messages)
+        start = bisect.bisect_left(token_totals, token_totals[-1] - budget)
+        if start <= previous_start <= max_start:
+            # Keep the window where it was, so the request prefix stays
+            # byte-identical and the provider's prompt cache keeps hitting.
+            start = previous_start
+        elif start > 0:
+            # Trim below the budget, leaving room for the next few turns
+            # before the window has to move again.
+            start = bisect.bisect_left(
+                token_totals, token_totals[-1] - int(budget * (1 - self.trim_slack))
+            )
+        start = max(0, min(start, max_start))
+
+        self.last_input_tokens = token_totals[-1] - token_totals[start] + instructions_tokens
+        self.last_dropped_messages = start
+        self._log_dropped(start, count)
+        return start
@@ -17,3 +17,24 @@ class UserAlreadyExistsError(Exception):
         message = f"User e-mail already exists: {email}."
         logging.warning(message)
         super().__init__(message)
+
+class AIUnavailableError(Exception):
+    def __init__(self, retry_in: float):
+        self.retry_in = retry_in
+        message = f"AI temporarily unavailable, please try again in {max(1, round(retry_in))} seconds."
+        logging.warning(message)
+        super().__init__(message)
+
+class AIIncompleteResponseError(Exception):
+    def __init__(self, reason: str):
+        self.reason = reason
+        message = f"AI reply was cut short ({reason}) before it produced any text, please try again."
+        logging.warning(message)
+        super().__init__(message)
+
+class AIStreamError(Exception):
+    def __init__(self, detail: str):
+        self.detail = detail
+        message = f"AI reply stream failed: {detail}"
+        logging.warning(message)
+        super().__init__(message)
@@ -0,0 +1,89 @@
+from collections.abc import Iterator, Sequence
+from itertools import islice
+
+from managers.context_window import ContextWindow
+
+SENDER_ROLES = {"AI": "assistant", "You": "user", "System": "system"}
+
+
+def format_message(sender: str, content: str) -> dict[str, str] | None:
+    role = SENDER_ROLES.get(sender)
+    return {"role": role, "content": content} if role else None
+
+
+# The first `length` messages of a chat history that keeps growing. A reply
+# in the background reads the history through this instead of a copy, so
+# starting one costs the same however long the chat is, and messages the UI
+# appends meanwhile stay out of view.
+class HistorySnapshot(Sequence):
+    def __init__(self, message_history: list[tuple[str, str]], length: int | None = None) -> None:
+        self.message_history = message_history
+        self.length = len(message_history) if length is None else length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        return islice(self.message_history, self.length)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            if step == 1:
+                return self.message_history[start:stop]
+            return [self.message_history[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("history snapshot index out of range")
+        return self.message_history[index]
+
+
+# Responses API input for one conversation, kept in step with its chat history.
+# Histories only grow, so each turn formats and counts just the new messages;
+# running token totals let the context window be chosen without a rescan.
+class FormattedHistory:
+    def __init__(self, context_window: ContextWindow) -> None:
+        self.context_window = context_window
+        self.messages: list[dict[str, str]] = []
+        self.token_totals = [0]
+        self.source_count = 0
+        self.window_start = 0
+        self._first_item = None
+        self._last_item = None
+        self.rebuild_count = 0
+
+    def _is_continued_by(self, message_history: list[tuple[str, str]]) -> bool:
+        # Spot-check the ends instead of comparing the whole history.
+        if self.source_count == 0:
+            return True
+        return (
+            len(message_history) >= self.source_count
+            and message_history[0] == self._first_item
+            and message_history[self.source_count - 1] == self._last_item
+        )
+
+    def clear(self) -> None:
+        self.messages = []
+        self.token_totals = [0]
+        self.source_count = 0
+        self.window_start = 0
+        self._first_item = None
+        self._last_item = None
+
+    def sync(self, message_history: list[tuple[str, str]]) -> list[dict[str, str]]:
+        if not self._is_continued_by(message_history):
+            self.rebuild_count += 1
+            self.clear()
+
+        for sender, content in message_history[self.source_count :]:
+            if message := format_message(sender, content):
+                self.messages.append(message)
+                self.token_totals.append(
+                    self.token_totals[-1] + self.context_window.count_message(message)
+                )
+        if message_history:
+            self._first_item = message_history[0]
+            self._last_item = message_history[-1]
+        self.source_count = len(message_history)
+        return self.messages
@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+import logging
+import re
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    model: str
+    reasoning_effort: str | None = None
+    max_output_tokens: int | None = None
+
+    def to_payload(self) -> dict:
+        payload = {"model": self.model}
+        if self.reasoning_effort:
+            payload["reasoning"] = {"effort": self.reasoning_effort}
+        if self.max_output_tokens:
+            payload["max_output_tokens"] = self.max_output_tokens
+        return payload
+
+
+class ModelRouter:
+    CHAT = "chat"
+    SUMMARY = "summary"
+
+    LIGHT = "light"
+    STANDARD = "standard"
+    DEEP = "deep"
+
+    DEFAULT_PRESETS = {
+        CHAT: {
+            # Reasoning tokens count against max_output_tokens as well.
+            LIGHT: RouteDecision("o4-mini", "low", 1500),
+            STANDARD: RouteDecision("o4-mini", "medium", 2000),
+            DEEP: RouteDecision("o4-mini", "high", 6000),
+        },
+        SUMMARY: {
+            LIGHT: RouteDecision("o4-mini", "low", 800),
+            STANDARD: RouteDecision("o4-mini", "low", 800),
+            DEEP: RouteDecision("o4-mini", "medium", 1500),
+        },
+    }
+
+    # A message made only of closing phrases; anything more than that may need
+    # a careful answer, however short it is.
+    CLOSING_MESSAGE = re.compile(
+        r"(?:(?:thanks?|thank you|thx|cheers|bye|goodbye|good ?night|see you|talk (?:to you )?later|that'?s all)"
+        r"(?: (?:so much|a lot|very much|again|for now|for today|then|next (?:time|week)|soon))*[\s,.!]*)+",
+        re.IGNORECASE,
+    )
+
+    def __init__(
+        self,
+        presets: dict[str, dict[str, RouteDecision]] | None = None,
+        short_message_chars: int = 60,
+        long_message_chars: int = 600,
+        opening_turns: int = 2,
+    ) -> None:
+        self.presets = {
+            mode: dict(tiers) for mode, tiers in self.DEFAULT_PRESETS.items()
+        }
+        for mode, tiers in (presets or {}).items():
+            self.presets.setdefault(mode, {}).update(tiers)
+        self.short_message_chars = short_message_chars
+        self.long_message_chars = long_message_chars
+        self.opening_turns = opening_turns
+
+    def is_closing(self, message: str) -> bool:
+        message = message.strip()
+        return len(message) < self.short_message_chars and bool(self.CLOSING_MESSAGE.fullmatch(message))
+
+    def get_phase(self, message_history: list[tuple[str, str]]) -> str:
+        # Walks back from the newest message only until it is past the opening
+        # turns, so the cost does not grow with the history.
+        last_message = None
+        user_turns = 0
+        for sender, body in reversed(message_history):
+            if sender != "You":
+                continue
+            if last_message is None:
+                last_message = body
+            user_turns += 1
+            if user_turns > self.opening_turns:
+                break
+        # In the first turns a "thanks" is a greeting rather than a goodbye.
+        if user_turns <= self.opening_turns:
+            return "opening"
+        if self.is_closing(last_message):
+            return "closing"
+        return "ongoing"
+
+    def get_tier(self, message_history: list[tuple[str, str]], mode: str) -> str:
+        if mode == self.SUMMARY:
+            total_chars = sum(len(body) for _, body in message_history)
+            return self.DEEP if total_chars > self.long_message_chars * 20 else self.STANDARD
+
+        last_message = next(
+            (body for sender, body in reversed(message_history) if sender == "You"), ""
+        )
+        if len(last_message) >= self.long_message_chars:
+            return self.DEEP
+        # Only a goodbye after the opening turns is answered on the light tier,
+        # short messages are not.
+        if self.get_phase(message_history) == "closing":
+            return self.LIGHT
+        return self.STANDARD
+
+    def route(
+        self, message_history: list[tuple[str, str]], mode: str = CHAT
+    ) -> RouteDecision:
+        tiers = self.presets.get(mode) or self.presets[self.CHAT]
+        tier = self.get_tier(message_history, mode)
+        decision = tiers.get(tier) or tiers[self.STANDARD]
+        logging.info(
+            "Router chose %s (effort=%s, max_output_tokens=%s) for %s %s turn.",
+            decision.model,
+            decision.reasoning_effort,
+            decision.max_output_tokens,
+            tier,
+            mode,
+        )
+        return decision
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import re
+import time
+from collections.abc import Callable, Mapping
+
+from managers.exceptions import AIUnavailableError
+
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_reset_duration(value: str | None) -> float | None:
+    # x-ratelimit-reset-* values look like "1s", "6m0s", "20ms" or "1h2m3.5s".
+    if not value:
+        return None
+    value = value.strip()
+    parts = DURATION_PART.findall(value)
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            logging.warning(f"Could not parse rate limit reset duration: {value}")
+            return None
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+
+def parse_rate_limit_headers(
+    headers: Mapping[str, str] | None, kind: str
+) -> tuple[float, float, float] | None:
+    if not headers:
+        return None
+    try:
+        limit = float(headers[f"x-ratelimit-limit-{kind}"])
+        remaining = float(headers[f"x-ratelimit-remaining-{kind}"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    reset = parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+    return limit, remaining, reset if reset is not None else 0.0
+
+
+class QuotaBucket:
+    def __init__(
+        self,
+        limit: float,
+        remaining: float,
+        reset_seconds: float,
+        now: float,
+        headroom: float = 0.0,
+    ) -> None:
+        self.limit = limit
+        self.remaining = remaining
+        self.headroom = headroom
+        self.updated_at = now
+        # Quotas are per minute and refill continuously; the reset header says
+        # how long until the bucket is full again.
+        if remaining < limit and reset_seconds > 0:
+            self.refill_rate = (limit - remaining) / reset_seconds
+        else:
+            self.refill_rate = limit / 60.0
+
+    def available(self, now: float) -> float:
+        return min(self.limit, self.remaining + (now - self.updated_at) * self.refill_rate)
+
+    def get_wait(self, amount: float, now: float) -> float:
+        # Part of the quota is held back: our view of it lags the provider's.
+        reserve = self.limit * self.headroom
+        shortfall = min(amount, self.limit - reserve) + reserve - self.available(now)
+        if shortfall <= 0:
+            return 0.0
+        return shortfall / self.refill_rate if self.refill_rate > 0 else float("inf")
+
+    def reserve(self, amount: float, now: float) -> None:
+        # The balance may go negative: later callers then wait for the debt.
+        self.remaining = self.available(now) - min(amount, self.limit)
+        self.updated_at = now
+
+
+# Client-side model of the account's request and token quota, fed by the
+# x-ratelimit-* headers of every response. One pacer is shared by all sessions
+# of the process, so requests are spaced out before the provider has to 429.
+class RateLimitPacer:
+    def __init__(
+        self,
+        max_wait: float = 20.0,
+        headroom: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_wait = max_wait
+        self.headroom = headroom
+        self.clock = clock
+        self.buckets: dict[str, QuotaBucket] = {}
+        self.pending_requests = 0
+        self.pending_tokens = 0
+        self.paced_count = 0
+        self.total_wait = 0.0
+
+    def get_wait(self, tokens: int, now: float | None = None) -> float:
+        now = self.clock() if now is None else now
+        return max(
+            (
+                bucket.get_wait(1 if kind == "requests" else tokens, now)
+                for kind, bucket in self.buckets.items()
+            ),
+            default=0.0,
+        )
+
+    async def acquire(self, tokens: int) -> None:
+        now = self.clock()
+        wait = self.get_wait(tokens, now)
+        if wait > self.max_wait:
+            raise AIUnavailableError(wait)
+
+        for kind, bucket in self.buckets.items():
+            bucket.reserve(1 if kind == "requests" else tokens, now)
+        self.pending_requests += 1
+        self.pending_tokens += tokens
+        if wait > 0:
+            self.paced_count += 1
+            self.total_wait += wait
+            logging.info(
+                "Pacing AI request for %.2f seconds to stay within the rate limit.", wait
+            )
+            try:
+                await asyncio.sleep(wait)
+            except BaseException:
+                # Cancelled while paced: the request is never sent or released.
+                self.pending_requests -= 1
+                self.pending_tokens -= tokens
+                raise
+
+    def release(self, tokens: int, headers: Mapping[str, str] | None = None) -> None:
+        self.pending_requests -= 1
+        self.pending_tokens -= tokens
+        self.update(headers)
+
+    def update(self, headers: Mapping[str, str] | None) -> None:
+        now = self.clock()
+        for kind, pending in (
+            ("requests", self.pending_requests),
+            ("tokens", self.pending_tokens),
+        ):
+            if quota := parse_rate_limit_headers(headers, kind):
+                limit, remaining, reset_seconds = quota
+                # Requests still in flight may not be counted by the server yet.
+                self.buckets[kind] = QuotaBucket(
+                    limit, remaining - pending, reset_seconds, now, self.headroom
+                )
@@ -0,0 +1,143 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+
+@dataclass
+class PriorityStats:
+    in_flight: int = 0
+    queued: int = 0
+    started: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.started if self.started else 0.0
+
+
+# Admits AI requests by priority under a global in-flight limit and per-class
+# limits. Waiting requests start strictly by priority, so queued background
+# work is overtaken by interactive turns; requests already in flight are never
+# interrupted.
+class RequestScheduler:
+    INTERACTIVE = 0
+    SUMMARY = 1
+    BACKGROUND = 2
+
+    PRIORITY_NAMES = {INTERACTIVE: "interactive", SUMMARY: "summary", BACKGROUND: "background"}
+
+    DEFAULT_CLASS_LIMITS = {SUMMARY: 2, BACKGROUND: 1}
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        class_limits: dict[int, int] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not isinstance(max_in_flight, int) or max_in_flight < 1:
+            raise ValueError(
+                f"Invalid max_in_flight '{max_in_flight}' ({type(max_in_flight).__name__}) - must be a positive integer"
+            )
+        self.max_in_flight = max_in_flight
+        self.class_limits = {**self.DEFAULT_CLASS_LIMITS, **(class_limits or {})}
+        self.clock = clock
+        self.in_flight = 0
+        self.priority_stats = {priority: PriorityStats() for priority in self.PRIORITY_NAMES}
+        self._waiters: list[tuple[int, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    def _can_start(self, priority: int) -> bool:
+        limit = self.class_limits.get(priority)
+        return self.in_flight < self.max_in_flight and (
+            limit is None or self.priority_stats[priority].in_flight < limit
+        )
+
+    def _start(self, priority: int, queued_at: float) -> None:
+        wait = self.clock() - queued_at
+        stats = self.priority_stats[priority]
+        stats.in_flight += 1
+        stats.started += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        self.in_flight += 1
+
+    def _dispatch(self) -> None:
+        # Start waiters in priority order; a class at its own limit is skipped
+        # so it does not block lower classes with free capacity.
+        blocked = []
+        while self._waiters and self.in_flight < self.max_in_flight:
+            waiter = heapq.heappop(self._waiters)
+            priority, _, queued_at, future = waiter
+            if future.done():
+                continue
+            if not self._can_start(priority):
+                blocked.append(waiter)
+                continue
+            self.priority_stats[priority].queued -= 1
+            self._start(priority, queued_at)
+            future.set_result(None)
+        for waiter in blocked:
+            heapq.heappush(self._waiters, waiter)
+
+    async def acquire(self, priority: int = INTERACTIVE) -> None:
+        if priority not in self.priority_stats:
+            raise ValueError(
+                f"Invalid priority '{priority}' ({type(priority).__name__}) - must be one of {sorted(self.PRIORITY_NAMES)}"
+            )
+        queued_at = self.clock()
+        # Every queued request is blocked by a limit (see _dispatch), so a free
+        # slot for this class means no one waiting ahead of it could use it.
+        if self._can_start(priority):
+            self._start(priority, queued_at)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), queued_at, future))
+        self.priority_stats[priority].queued += 1
+        logging.debug(
+            "Queued %s AI request (%d in flight, %d waiting).",
+            self.PRIORITY_NAMES[priority],
+            self.in_flight,
+            len(self._waiters),
+        )
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the caller was cancelled, hand the slot on.
+                self.release(priority)
+            else:
+                self.priority_stats[priority].queued -= 1
+                self._dispatch()
+            raise
+
+    def release(self, priority: int = INTERACTIVE) -> None:
+        self.in_flight -= 1
+        self.priority_stats[priority].in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = INTERACTIVE):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            self.PRIORITY_NAMES[priority]: {
+                "in_flight": stats.in_flight,
+                "queued": stats.queued,
+                "started": stats.started,
+                "mean_wait": stats.mean_wait,
+                "max_wait": stats.max_wait,
+            }
+            for priority, stats in self.priority_stats.items()
+        }
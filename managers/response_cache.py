@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from utils.JSONFileHandler import JSONFileHandler
+
+
+# In-memory LRU with TTL, optionally backed by a JSON file on disk.
+class ResponseCache:
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 24 * 60 * 60,
+        file_path: str | None = None,
+        max_disk_entries: int = 4096,
+        clock: Callable[[], float] = time.time,
+        save_delay: float = 5.0,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError(f"Invalid max_entries '{max_entries}' - must be >= 1")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self.clock = clock
+
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._disk_entries: dict[str, tuple[float, str]] = {}
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        # Writes to disk are batched: a put marks the file dirty and one save
+        # runs in a worker thread save_delay seconds later.
+        self.save_delay = save_delay
+        self.dirty = False
+        self.save_count = 0
+        self._save_timer: asyncio.TimerHandle | None = None
+        self._save_future: asyncio.Future | None = None
+
+        self.file_path = file_path
+        self.file_handler = JSONFileHandler(file_path) if file_path else None
+        self.load()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        instructions: str,
+        formatted_input: list[dict[str, str]],
+        options: dict | None = None,
+    ) -> str:
+        raw = json.dumps(
+            {
+                "model": model,
+                "instructions": instructions,
+                "input": formatted_input,
+                "options": options or {},
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        now = self.clock()
+
+        if entry := self._entries.get(key):
+            expires_at, text = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return text
+            del self._entries[key]
+            self.expirations += 1
+
+        if entry := self._disk_entries.get(key):
+            expires_at, text = entry
+            if expires_at > now:
+                self._remember(key, expires_at, text)
+                self.hits += 1
+                self.disk_hits += 1
+                return text
+            del self._disk_entries[key]
+            self.expirations += 1
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, text: str) -> None:
+        expires_at = self.clock() + self.ttl_seconds
+        self._remember(key, expires_at, text)
+        if self.file_handler:
+            self._disk_entries[key] = (expires_at, text)
+            self._schedule_save()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._disk_entries.clear()
+        if self.file_handler:
+            self._schedule_save()
+
+    def metrics(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._entries),
+            "disk_entries": len(self._disk_entries),
+        }
+
+    def _remember(self, key: str, expires_at: float, text: str) -> None:
+        self._entries[key] = (expires_at, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def load(self) -> None:
+        if not self.file_handler:
+            return
+        try:
+            raw_entries = self.file_handler.read_json()
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, IOError, OSError):
+            logging.exception(
+                f"Failed to read response cache {self.file_path}. Starting empty."
+            )
+            return
+
+        if not isinstance(raw_entries, dict):
+            logging.warning(
+                f"Response cache {self.file_path} did not contain a JSON object, ignoring."
+            )
+            return
+
+        now = self.clock()
+        for key, entry in raw_entries.items():
+            try:
+                expires_at, text = float(entry["expires_at"]), str(entry["text"])
+            except (KeyError, TypeError, ValueError):
+                logging.warning(f"Skipping malformed response cache entry: {key}")
+                continue
+            if expires_at > now:
+                self._disk_entries[key] = (expires_at, text)
+
+    def _schedule_save(self) -> None:
+        self.dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to defer to (scripts, tests): write right away.
+            self.save()
+            return
+        if self._save_timer is None:
+            self._save_timer = loop.call_later(self.save_delay, self._start_save, loop)
+
+    def _start_save(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._save_timer = None
+        if self._save_future is not None and not self._save_future.done():
+            # The previous write is still running, try again later.
+            self._save_timer = loop.call_later(self.save_delay, self._start_save, loop)
+            return
+        self._save_future = loop.run_in_executor(None, self._write, self._snapshot())
+
+    def _snapshot(self) -> dict:
+        self.dirty = False
+        now = self.clock()
+        live_entries = sorted(
+            (
+                (key, entry)
+                for key, entry in self._disk_entries.items()
+                if entry[0] > now
+            ),
+            key=lambda item: item[1][0],
+        )[-self.max_disk_entries :]
+        self._disk_entries = dict(live_entries)
+        return {
+            key: {"expires_at": expires_at, "text": text}
+            for key, (expires_at, text) in self._disk_entries.items()
+        }
+
+    def _write(self, snapshot: dict) -> None:
+        try:
+            self.file_handler.write_json(snapshot, indent=None)
+            self.save_count += 1
+        except (IOError, OSError, TypeError):
+            logging.exception(f"Failed to save response cache to {self.file_path}.")
+
+    def save(self) -> None:
+        if not self.file_handler:
+            return
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
+        self._write(self._snapshot())
+
+    async def close(self) -> None:
+        # Writes what is still pending; call before the event loop stops.
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
+        if self._save_future is not None:
+            await self._save_future
+        if self.file_handler and self.dirty:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, self._snapshot())
+
+
+def create_response_cache() -> ResponseCache | None:
+    # Opt-in through the environment, see secrets.env.example.
+    if os.getenv("AI_RESPONSE_CACHE", "").lower() not in ("1", "true", "yes"):
+        return None
+    return ResponseCache(file_path="data/response_cache.json")
@@ -0,0 +1,62 @@
+import asyncio
+from collections.abc import Callable
+
+
+# Text streamed so far for one AI turn. It is kept apart from the chat
+# history, which only ever receives the completed reply.
+class PartialReply:
+    def __init__(self, on_update: Callable[[str], None] | None = None) -> None:
+        self.text = ""
+        self.on_update = on_update
+        self._owner = None
+
+    def append(self, owner: object, delta: str) -> None:
+        # With hedging two streams run at once; the first one to produce
+        # text owns the reply and the other one is ignored.
+        if self._owner is None:
+            self._owner = owner
+        if owner is not self._owner or not delta:
+            return
+        self.text += delta
+        if self.on_update:
+            self.on_update(self.text)
+
+    def reset(self) -> None:
+        # A retried attempt starts its reply from scratch.
+        self._owner = None
+        if self.text:
+            self.text = ""
+            if self.on_update:
+                self.on_update(self.text)
+
+
+class ResponseHandle:
+    def __init__(self, task: asyncio.Task, partial: PartialReply) -> None:
+        self.task = task
+        self.partial = partial
+
+    @property
+    def partial_text(self) -> str:
+        return self.partial.text
+
+    def cancel(self) -> bool:
+        # Cancelling the task closes the HTTP stream, which aborts the request.
+        return self.task.cancel()
+
+    def cancelled(self) -> bool:
+        return self.task.cancelled()
+
+    def done(self) -> bool:
+        return self.task.done()
+
+    def result(self) -> str:
+        return self.task.result()
+
+    def exception(self) -> BaseException | None:
+        return self.task.exception()
+
+    def add_done_callback(self, callback: Callable[["ResponseHandle"], None]) -> None:
+        self.task.add_done_callback(lambda _task: callback(self))
+
+    def __await__(self):
+        return self.task.__await__()
@@ -0,0 +1,22 @@
+import typing
+
+
+# The SDK parses each streamed event into a pydantic model whose validator is
+# only built when that model is first used, which adds most of a second to the
+# first reply. Building them ahead of time uses public pydantic API only.
+def preload_response_models() -> int:
+    from openai.types.responses import ResponseStreamEvent
+    from pydantic import BaseModel
+
+    built = 0
+    pending = [ResponseStreamEvent]
+    while pending:
+        annotation = pending.pop()
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            if not annotation.__pydantic_complete__:
+                annotation.model_rebuild()
+                built += 1
+        else:
+            # Unions and Annotated[...] wrap the event models.
+            pending.extend(typing.get_args(annotation))
+    return built
@@ -0,0 +1,148 @@
+import email.utils
+import logging
+import random
+import time
+from collections.abc import Callable, Mapping
+
+from managers.exceptions import AIUnavailableError
+
+
+def decorrelated_jitter(base: float, cap: float, previous: float) -> float:
+    # "Decorrelated jitter": each wait is random between the base delay and
+    # three times the previous wait, so concurrent clients spread out.
+    return min(cap, random.uniform(base, max(base, previous) * 3))
+
+
+def parse_retry_after(headers: Mapping[str, str] | None) -> float | None:
+    if not headers:
+        return None
+
+    if retry_after_ms := headers.get("retry-after-ms"):
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        logging.warning(f"Could not parse Retry-After header: {retry_after}")
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+# Token bucket limiting retries to a fraction of requests, so retries cannot
+# multiply load while the provider is struggling.
+class RetryBudget:
+    def __init__(
+        self,
+        retry_ratio: float = 0.2,
+        min_retries_per_second: float = 0.1,
+        max_balance: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.retry_ratio = retry_ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_balance = max_balance
+        self.clock = clock
+        self.balance = max_balance
+        self._updated_at = clock()
+        self.exhausted_count = 0
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.balance = min(
+            self.max_balance,
+            self.balance + (now - self._updated_at) * self.min_retries_per_second,
+        )
+        self._updated_at = now
+
+    def record_request(self) -> None:
+        self._refill()
+        self.balance = min(self.max_balance, self.balance + self.retry_ratio)
+
+    def try_spend(self) -> bool:
+        self._refill()
+        if self.balance >= 1:
+            self.balance -= 1
+            return True
+        self.exhausted_count += 1
+        return False
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_started_at = None
+
+    def retry_in(self) -> float:
+        return max(0.0, self._opened_at + self.reset_timeout - self.clock())
+
+    def before_request(self) -> None:
+        if self.state == self.OPEN:
+            if self.retry_in() > 0:
+                raise AIUnavailableError(self.retry_in())
+            self.state = self.HALF_OPEN
+            self._trial_started_at = None
+
+        if self.state == self.HALF_OPEN:
+            # Let a single trial request through to probe the provider. A trial
+            # that never reported back (e.g. cancelled) expires after the timeout.
+            now = self.clock()
+            if (
+                self._trial_started_at is not None
+                and now - self._trial_started_at < self.reset_timeout
+            ):
+                raise AIUnavailableError(self._trial_started_at + self.reset_timeout - now)
+            self._trial_started_at = now
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logging.info("AI circuit breaker closed, provider recovered.")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._trial_started_at = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED
+            and self.consecutive_failures >= self.failure_threshold
+        ):
+            logging.warning(
+                "AI circuit breaker opened after %d consecutive failures.",
+                self.consecutive_failures,
+            )
+            self.state = self.OPEN
+            self._opened_at = self.clock()
+            self._trial_started_at = None
+
+    def release_trial(self) -> None:
+        # The trial request was never sent, so the next request probes instead.
+        if self.state == self.HALF_OPEN:
+            self._trial_started_at = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == self.OPEN
@@ -0,0 +1,67 @@
+from collections import deque
+from dataclasses import dataclass
+import logging
+import math
+
+
+@dataclass
+class TurnRecord:
+    model: str
+    latency: float
+    hedged: bool = False
+    input_tokens: int = 0
+    cached_tokens: int = 0
+
+
+# Throughput and latency percentiles for reports that collect the latency
+# of each answered turn over a timed run.
+class LatencySummary:
+    latencies: list[float]
+    duration: float
+
+    @property
+    def throughput(self) -> float:
+        return len(self.latencies) / self.duration if self.duration else 0.0
+
+    def percentile(self, percent: float) -> float:
+        # Nearest-rank percentile over answered turns.
+        if not self.latencies:
+            return 0.0
+        samples = sorted(self.latencies)
+        rank = max(1, math.ceil(percent / 100 * len(samples)))
+        return samples[rank - 1]
+
+
+class TurnMetrics:
+    def __init__(self, max_records: int = 1000) -> None:
+        self.records: deque[TurnRecord] = deque(maxlen=max_records)
+        self.retries = 0
+
+    @property
+    def last(self) -> TurnRecord | None:
+        return self.records[-1] if self.records else None
+
+    def record(self, record: TurnRecord) -> None:
+        self.records.append(record)
+        logging.info(
+            "AI turn answered by %s in %.3f seconds%s, %d of %d input tokens cached.",
+            record.model,
+            record.latency,
+            " (hedged)" if record.hedged else "",
+            record.cached_tokens,
+            record.input_tokens,
+        )
+
+    def record_retry(self) -> None:
+        self.retries += 1
+
+    def cache_hit_ratio(self) -> float:
+        input_tokens = sum(record.input_tokens for record in self.records)
+        cached_tokens = sum(record.cached_tokens for record in self.records)
+        return cached_tokens / input_tokens if input_tokens else 0.0
+
+    def models_used(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for record in self.records:
+            counts[record.model] = counts.get(record.model, 0) + 1
+        return counts
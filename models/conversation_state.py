@@ -0,0 +1,108 @@
+from dataclasses import dataclass, field
+import logging
+
+
+@dataclass
+class PromptUsage:
+    requests: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+
+    def record(self, input_tokens: int, cached_tokens: int) -> None:
+        self.requests += 1
+        self.input_tokens += input_tokens
+        self.cached_tokens += cached_tokens
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        return self.cached_tokens / self.input_tokens if self.input_tokens else 0.0
+
+
+@dataclass
+class ConversationState:
+    summary: str = ""
+    summarized_count: int = 0
+    previous_response_id: str | None = None
+    response_count: int = 0
+    chain_tokens: int = 0
+    chain_key: str = ""
+    # Formatted API input cached by AIManager for this session; never persisted.
+    formatted_history: object | None = field(default=None, repr=False, compare=False)
+    # Prompt cache usage of this session's requests; never persisted.
+    usage: PromptUsage = field(default_factory=PromptUsage, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.validate()
+
+    def validate(self) -> bool:
+        if not isinstance(self.summary, str):
+            raise ValueError(
+                f"Invalid summary '{self.summary}' "
+                f"({type(self.summary).__name__}) - "
+                f"must be string"
+            )
+
+        for name in ("summarized_count", "response_count", "chain_tokens"):
+            value = getattr(self, name)
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                raise ValueError(
+                    f"Invalid {name.replace('_', ' ')} '{value}' "
+                    f"({type(value).__name__}) - "
+                    f"must be non-negative int"
+                )
+
+        if self.previous_response_id is not None and not isinstance(
+            self.previous_response_id, str
+        ):
+            raise ValueError(
+                f"Invalid previous response id '{self.previous_response_id}' "
+                f"({type(self.previous_response_id).__name__}) - "
+                f"must be string or None"
+            )
+
+        if not isinstance(self.chain_key, str):
+            raise ValueError(
+                f"Invalid chain key '{self.chain_key}' "
+                f"({type(self.chain_key).__name__}) - "
+                f"must be string"
+            )
+
+        return True
+
+    def reset(self) -> None:
+        self.summary = ""
+        self.summarized_count = 0
+        self.reset_chain()
+
+    def reset_chain(self) -> None:
+        self.previous_response_id = None
+        self.response_count = 0
+        self.chain_tokens = 0
+        self.chain_key = ""
+
+    @staticmethod
+    def from_dict(data: dict | None) -> "ConversationState":
+        if not data:
+            return ConversationState()
+        try:
+            return ConversationState(
+                summary=data.get("summary", ""),
+                summarized_count=data.get("summarized_count", 0),
+                previous_response_id=data.get("previous_response_id"),
+                response_count=data.get("response_count", 0),
+                chain_tokens=data.get("chain_tokens", 0),
+                chain_key=data.get("chain_key", ""),
+            )
+        except (AttributeError, ValueError) as e:
+            logging.warning(f"Invalid conversation state {data}, resetting. Error: {e}")
+            return ConversationState()
+
+    def to_dict(self) -> dict:
+        return {
+            "summary": self.summary,
+            "summarized_count": self.summarized_count,
+            "previous_response_id": self.previous_response_id,
+            "response_count": self.response_count,
+            "chain_tokens": self.chain_tokens,
+            "chain_key": self.chain_key,
+        }
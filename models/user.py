@@ -5,6 +5,8 @@ import logging
 import re
 import uuid
 
+from models.conversation_state import ConversationState
+
 
 @dataclass
 class User:
@@ -13,6 +15,7 @@ class User:
     email: str = None
     hashed_password: bytes = None
     chat_history: list[tuple[str, str]] = field(default_factory=list)
+    conversation_state: ConversationState = field(default_factory=ConversationState)
 
     def __post_init__(self):
         self.validate()
@@ -69,8 +72,22 @@ class User:
                 f"must be (str, str) tuples"
             )
 
+        if not isinstance(self.conversation_state, ConversationState):
+            raise ValueError(
+                f"Invalid conversation state '{self.conversation_state}' "
+                f"({type(self.conversation_state).__name__}) - "
+                f"must be ConversationState"
+            )
+
         return True
 
+    def start_chat_session(self) -> None:
+        # Marks where a new session begins in the saved history.
+        if self.chat_history:
+            self.chat_history.append(("System", "Continuing previous chat session from here..."))
+        else:
+            self.chat_history.append(("System", "Chat session started..."))
+
     @staticmethod
     def is_valid_email(email: str) -> bool:
         if not email:
@@ -145,6 +162,11 @@ class User:
                 logging.warning(f"Invalid item structure in chat_history for user {data.get('id')}, resetting.")
                 loaded_history = []  # Optionaly exit
 
+        conversation_state = ConversationState.from_dict(data.get("conversation_state"))
+        if max(conversation_state.summarized_count, conversation_state.response_count) > len(loaded_history):
+            logging.warning(f"Conversation state ahead of chat_history for user {data.get('id')}, resetting.")
+            conversation_state.reset()
+
         name = data.get("name")
         email = data.get("email")
         try:
@@ -154,6 +176,7 @@ class User:
                 email=email,
                 hashed_password=hashed_bytes,
                 chat_history=loaded_history,
+                conversation_state=conversation_state,
             )
             return user_instance
         
@@ -172,5 +195,6 @@ class User:
             "email": self.email,
             "hashed_password": hashed_str,
             "chat_history": self.chat_history,
+            "conversation_state": self.conversation_state.to_dict(),
         }
         return data
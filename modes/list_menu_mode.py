@@ -1,9 +1,11 @@
 from abc import abstractmethod
+import logging
 import urwid as u
 
 from modes.base_mode import BaseMode
 
 from ui.app_widgets import PlainButton, MenuListBox
+from ui.menu_walker import MenuListWalker, TypeAheadFilter
 from collections.abc import Callable
 
 
@@ -11,11 +13,19 @@ MenuItemData = tuple[str, str, Callable]
 
 
 class ListMenuMode(BaseMode):
+    # Printable keys the list does not handle narrow the items by label.
+    type_ahead = True
 
     def __init__(self, app_manager, header_text: str, footer_text: str):
         self.items_data: list[MenuItemData] = []
+        self.descriptions: dict[str, str] = {}
         self.description_widget: u.Text | None = None
+        self.filter_widget: u.Text | None = None
+        self.walker: MenuListWalker | None = None
         self.listbox: MenuListBox | None = None
+        self.list_pile: u.Pile | None = None
+        self.filter_query = ""
+        self._type_ahead_filter: TypeAheadFilter | None = None
         super().__init__(app_manager, header_text, footer_text)
 
     @abstractmethod
@@ -24,16 +34,18 @@ class ListMenuMode(BaseMode):
 
     def _create_body(self) -> u.Widget:
         self.items_data = self._get_items_data()
+        self.descriptions = self._index_descriptions(self.items_data)
         self.description_widget = u.Text("Select an item.")
-        menu_buttons = self._create_list_buttons(self.items_data)
+        self.filter_widget = u.Text("")
 
-        self.listbox = MenuListBox(
-            u.SimpleFocusListWalker(menu_buttons), self.update_description_text
-        )
-        if menu_buttons:
+        # Rows are built when the list box first shows them.
+        self.walker = MenuListWalker(self.items_data, self._create_list_row)
+        self.listbox = MenuListBox(self.walker, self.update_description_text)
+        if self.items_data:
             self.listbox.set_focus(0)
 
-        col_1 = u.Pile([self.listbox])
+        self.list_pile = u.Pile([self.listbox])
+        col_1 = self.list_pile
         col_2 = u.Padding(self.description_widget, left=2, right=1)
         columns_widget = u.Columns(
             [("weight", 1, col_1), ("weight", 3, col_2)], dividechars=1
@@ -42,12 +54,14 @@ class ListMenuMode(BaseMode):
 
     def on_activate(self) -> None:
         super().on_activate()
-        
+        if self.filter_query:
+            self.set_filter("")
+
         try:
             if self.frame:
-                self.frame.set_focus("body")
-            if self.listbox:
-                self.listbox.set_focus(self.listbox.focus_position or 0)
+                self.frame.focus_position = "body"
+            if self.listbox and len(self.walker):
+                self.listbox.set_focus(self.walker.focus)
         except Exception as e:
             raise ValueError(
                 f"Error setting focus in " f"{self.__class__.__name__}.on_activate: {e}"
@@ -55,47 +69,93 @@ class ListMenuMode(BaseMode):
 
         self.update_description_text()
 
-    def _create_list_buttons(self, items_data: list[MenuItemData]) -> list[u.Widget]:
-        buttons = []
-        for label, _, action in items_data:
-            button = PlainButton(label, on_press=action)
-            buttons.append(
-                u.AttrMap(
-                    u.Padding(
-                        u.Pile([u.Text(""), button, u.Text("")]),
-                        left=1,
-                        right=1,
-                        min_width=15,
-                    ),
-                    "inactive",
-                    "focus",
-                )
+    @staticmethod
+    def _index_descriptions(items_data: list[MenuItemData]) -> dict[str, str]:
+        # The first item wins when labels repeat.
+        descriptions = {}
+        for label, description, _ in items_data:
+            descriptions.setdefault(label.strip(), description)
+        return descriptions
+
+    def _create_list_row(self, index: int) -> u.Widget:
+        label, _, action = self.items_data[index]
+        button = PlainButton(label, on_press=action)
+        return u.AttrMap(
+            u.Padding(
+                u.Pile([u.Text(""), button, u.Text("")]),
+                left=1,
+                right=1,
+                min_width=15,
+            ),
+            "inactive",
+            "focus",
+        )
+
+    def handle_input(self, key: str) -> str | None:
+        if not self.type_ahead or not isinstance(key, str) or self.walker is None:
+            return key
+        if key == "backspace" and self.filter_query:
+            self.set_filter(self.filter_query[:-1])
+            return None
+        if key == "esc" and self.filter_query:
+            self.set_filter("")
+            return None
+        if len(key) == 1 and key.isprintable() and not key.isspace():
+            self.set_filter(self.filter_query + key)
+            return None
+        return key
+
+    def set_filter(self, query: str) -> None:
+        if not isinstance(query, str):
+            raise ValueError(
+                f"Invalid query '{query}' ({type(query).__name__}) - must be a string."
+            )
+        if self._type_ahead_filter is None:
+            self._type_ahead_filter = TypeAheadFilter(
+                [label for label, _, _ in self.items_data]
             )
-        return buttons
+        self.filter_query = query
+        self.walker.set_visible(self._type_ahead_filter.set_query(query))
+        if len(self.walker):
+            self.listbox.set_focus(0)
+        logging.debug(
+            f"{self.__class__.__name__}: filter '{query}' matches {len(self.walker)} items."
+        )
+        self._update_filter_widget()
+        self.update_description_text()
+
+    def _update_filter_widget(self) -> None:
+        contents = self.list_pile.contents
+        shown = len(contents) > 1
+        if self.filter_query:
+            self.filter_widget.set_text(
+                f"Filter: {self.filter_query} ({len(self.walker)}/{len(self.items_data)})"
+            )
+            if not shown:
+                contents.insert(0, (self.filter_widget, self.list_pile.options("pack")))
+                self.list_pile.focus_position = 1
+        elif shown:
+            del contents[0]
 
     def update_description_text(self):
         listbox = getattr(self, "listbox", None)
         description_widget = getattr(self, "description_widget", None)
-        items_data = getattr(self, "items_data", [])
 
         if listbox is None or description_widget is None:
             return
 
-        focus_widget, focus_pos = listbox.get_focus()
-        if focus_widget is None:
-            description_widget.set_text("Item to focus not found.")
+        focus_pos = listbox.get_focus_position()
+        if focus_pos is None:
+            description_widget.set_text(
+                "No items match the filter." if self.filter_query else "Item to focus not found."
+            )
             return
 
         try:
-            button = focus_widget.original_widget.original_widget.contents[1][0]
-            label = button.original_label.strip()
-
-            description = "Description not found."
-            for item_label, item_desc, _ in items_data:
-                if item_label == label:
-                    description = item_desc
-                    break
-            description_widget.set_text(description)
+            label = self.items_data[self.walker.item_index(focus_pos)][0].strip()
+            description_widget.set_text(
+                self.descriptions.get(label, "Description not found.")
+            )
 
         except (AttributeError, IndexError, TypeError) as e:
             if description_widget:
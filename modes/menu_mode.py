@@ -11,7 +11,7 @@ class MenuMode(ListMenuMode):
         super().__init__(
             app_manager,
             "Main Menu",
-            "Use Arrows/Enter to select option | Ctrl+D to logout",
+            "Use Arrows/Enter to select option | Type to filter | Ctrl+D to logout",
         )
 
     def _get_items_data(self) -> list[MenuItemData]:
@@ -37,4 +37,4 @@ class MenuMode(ListMenuMode):
         if key == "ctrl d":
             self.app_manager.logout()
             return None
-        return key
+        return super().handle_input(key)
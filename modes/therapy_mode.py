@@ -4,6 +4,7 @@ import urwid as u
 from modes.base_mode import BaseMode
 
 from ui.app_modes import AppModes
+from ui.chat_walker import ChatListWalker
 
 
 class TherapyFrame(u.Frame):
@@ -22,20 +23,24 @@ class TherapyFrame(u.Frame):
 
 
 class TherapyMode(BaseMode):
-    def __init__(self, app_manager, users_manager, ai_manager):
+    CANCELLED_REPLY_MARKER = "AI reply cancelled by the user."
+
+    def __init__(self, app_manager, users_manager):
         self.app_manager = app_manager
         self.users_manager = users_manager
-        self.ai_manager = ai_manager
 
         self.messages = []
+        self.pending_response = None
 
+        self.chat_walker = None
         self.chat_window = None
         self.edit_box = None
+        self.status_text = None
         self.styled_input_area = None
         super().__init__(
             app_manager,
             "Therapy Session",
-            "Type message and press enter | Ctrl+D to return to main menu",
+            "Type message and press enter | Esc to cancel pending reply | Ctrl+D to return to main menu",
         )
 
         base_frame = self.frame
@@ -47,9 +52,14 @@ class TherapyMode(BaseMode):
             focus_part="footer",
         )
 
+    @property
+    def ai_manager(self):
+        # The app builds the AI manager on first use.
+        return self.app_manager.ai_manager
+
     def _create_body(self) -> u.Widget:
-        initial_widgets = self._build_message_widgets()
-        self.chat_window = u.ListBox(u.SimpleListWalker(initial_widgets))
+        self.chat_walker = ChatListWalker(self.messages, self._build_message_markup)
+        self.chat_window = u.ListBox(self.chat_walker)
         padded_chat = u.Padding(self.chat_window, left=1, right=1)
         line_box = u.LineBox(padded_chat, title="Chat")
         styled_chat = u.AttrMap(line_box, "chat")
@@ -57,9 +67,10 @@ class TherapyMode(BaseMode):
 
     def _create_additional_footer_widgets(self) -> list[u.Widget]:
         self.edit_box = u.Edit("input > ")
+        self.status_text = u.Text("")
         input_area_pile = u.Pile(
             [
-                u.Text(""),
+                u.Padding(self.status_text, left=2, right=2),
                 u.Padding(self.edit_box, left=2, right=2),
                 u.Text(""),
             ]
@@ -69,17 +80,16 @@ class TherapyMode(BaseMode):
 
     def on_activate(self) -> None:
         super().on_activate()
+        if self.is_response_pending():
+            self.pending_response.cancel()
+        self.pending_response = None
 
         user = self.app_manager.active_user
         if user:
-            history_obj = user.chat_history
-            if history_obj:
-                self.messages = history_obj.copy()
-                self.messages.append(
-                    ("System", f"Continuing previous chat session from here...")
-                )
-            else:
-                self.messages = [("System", "Chat session started...")]
+            # The session appends to the user's own history instead of a copy,
+            # so opening the chat does not depend on how long the history is.
+            user.start_chat_session()
+            self.messages = user.chat_history
         else:
             logging.warning(
                 "TherapyMode.on_activate: No active user! Cannot load/save history."
@@ -92,28 +102,11 @@ class TherapyMode(BaseMode):
                     "TherapyMode.on_activate: self.chat_window is None before UI update."
                 )
             else:
-                list_walker = getattr(self.chat_window, "body", None)
-                if isinstance(list_walker, u.SimpleListWalker):
-                    message_widgets = self._build_message_widgets()
-                    list_walker.clear()
-                    list_walker.extend(message_widgets)
-                    if message_widgets:
-                        try:
-                            self.chat_window.set_focus(len(list_walker) - 1)
-                        except IndexError:
-                            pass
-                        except Exception as focus_err:
-                            logging.exception(f"Error setting focus: {focus_err}")
-                    if self.app_manager and self.app_manager.loop:
-                        self.app_manager.loop.draw_screen()
-                elif list_walker is None:
-                    logging.error(
-                        "TherapyMode.on_activate: self.chat_window.body is None."
-                    )
-                else:
-                    logging.error(
-                        f"TherapyMode.on_activate: self.chat_window.body is not SimpleListWalker, type: {type(list_walker)}"
-                    )
+                # Widgets are built by the walker as rows come into view.
+                self.chat_walker.set_messages(self.messages)
+                self.scroll_to_bottom()
+                if self.app_manager:
+                    self.app_manager.request_redraw()
         except Exception as e:
             logging.exception("TherapyMode.on_activate: EXCEPTION during UI update.")
 
@@ -125,35 +118,11 @@ class TherapyMode(BaseMode):
             return True
         return super().mouse_event(size, event, button, col, row, focus)
 
-    def _build_message_widgets(self) -> list[u.Widget]:
-        message_widgets = []
-        num_messages = len(self.messages)
-        if num_messages == 0:
-            return []
-        for i, (sender, body) in enumerate(self.messages):
-            try:
-                is_last = i == num_messages - 1
-                content_style = "chat_last" if is_last else "chat"
-                speaker_part = f"{sender}: "
-
-                body_str = str(body) if body is not None else ""
-                markup = [("chat_speaker", speaker_part), (content_style, body_str)]
-                text_widget = u.Text(markup)
-                message_widgets.append(text_widget)
-
-            except Exception as e:
-                logging.exception(
-                    f"_build_message_widgets: ERROR creating widget for item {i} - Sender: {sender}, Body: {body[:50]}... Error: {e}"
-                )
-        return message_widgets
-
-    def _build_single_message_widget(
-        self, sender: str, body: str, is_last: bool
-    ) -> u.Widget:
+    @staticmethod
+    def _build_message_markup(sender: str, body: str, is_last: bool) -> list:
         content_style = "chat_last" if is_last else "chat"
         speaker_part = f"{sender}: "
-        markup = [("chat_speaker", speaker_part), (content_style, body)]
-        return u.Text(markup)
+        return [("chat_speaker", speaker_part), (content_style, body)]
 
     def focus_input(self):
         if self.frame and self.styled_input_area and self.edit_box:
@@ -162,11 +131,21 @@ class TherapyMode(BaseMode):
                 input_pile_widget = self.styled_input_area.original_widget
                 edit_widget_padding = input_pile_widget.contents[1][0]
                 input_pile_widget.set_focus(edit_widget_padding)
-                if self.app_manager and self.app_manager.loop:
-                    self.app_manager.loop.draw_screen()
+                if self.app_manager:
+                    self.app_manager.request_redraw()
             except (AttributeError, IndexError, KeyError, TypeError):
                 pass
 
+    def handle_paste(self, text: str) -> None:
+        # The whole block goes in at once; pasted newlines stay part of the
+        # message and only a typed Enter sends it.
+        if not self.edit_box:
+            return
+        self.focus_input()
+        self.edit_box.insert_text(text)
+        if self.app_manager:
+            self.app_manager.request_redraw()
+
     def update_chat(self, sender: str | None, body: str | None) -> None:
         if sender is None or body is None:
             return
@@ -177,51 +156,101 @@ class TherapyMode(BaseMode):
             return
 
         try:
-            list_walker = getattr(self.chat_window, "body", None)
-            if not isinstance(list_walker, u.SimpleListWalker):
-                logging.error(
-                    f"Chat window body is not SimpleListWalker in update_chat! Type: {type(list_walker)}"
-                )
-                return
-
-            num_widgets = len(list_walker)
-            if num_widgets > 0:
-                previous_last_index = num_widgets - 1
-
-                if len(self.messages) >= 2:
-                    prev_sender, prev_body = self.messages[-2]
-
-                    try:
-                        widget_to_update = self._build_single_message_widget(
-                            prev_sender, prev_body, is_last=False
-                        )
-                        list_walker[previous_last_index] = widget_to_update
+            # The previous last message loses its highlight, so it is rebuilt.
+            self.chat_walker.refresh(len(self.messages) - 2)
+            self.scroll_to_bottom()
 
-                    except Exception as replace_err:
-                        logging.exception(
-                            f"update_chat: Failed to replace/restyle widget at index {previous_last_index}: {replace_err}"
-                        )
-
-            new_widget = self._build_single_message_widget(sender, body, is_last=True)
-
-            list_walker.append(new_widget)
-
-            new_focus_index = len(list_walker) - 1
-            self.chat_window._invalidate()
-            self.chat_window.set_focus(new_focus_index)
-            self.chat_window.set_focus_valign("bottom")
-
-            if self.app_manager and self.app_manager.loop:
-                self.app_manager.loop.draw_screen()
+            if self.app_manager:
+                self.app_manager.request_redraw()
 
         except Exception as e:
             logging.exception(f"[TherapyMode] Error updating chat window: {e}")
 
+    def scroll_to_bottom(self) -> None:
+        if len(self.chat_walker) == 0:
+            return
+        self.chat_window.set_focus(len(self.chat_walker) - 1)
+        self.chat_window.set_focus_valign("bottom")
+
+    def set_status(self, text: str) -> None:
+        if self.status_text:
+            self.status_text.set_text(text)
+            if self.app_manager:
+                self.app_manager.request_redraw()
+
+    def is_response_pending(self) -> bool:
+        return self.pending_response is not None and not self.pending_response.done()
+
+    def show_partial_reply(self, text: str) -> None:
+        # Streamed text is only displayed; self.messages gets the reply once
+        # it has completed.
+        if self.chat_walker is None:
+            return
+        self.chat_walker.set_partial(text)
+        self.scroll_to_bottom()
+        if self.app_manager:
+            self.app_manager.request_redraw()
+
+    def clear_partial_reply(self) -> None:
+        if self.chat_walker is not None and self.chat_walker.partial_text is not None:
+            self.chat_walker.set_partial(None)
+
+    def cancel_pending_response(self) -> bool:
+        if not self.is_response_pending():
+            return False
+        logging.info("Cancelling pending AI response.")
+        handle = self.pending_response
+        self.pending_response = None
+        handle.cancel()
+        self.clear_partial_reply()
+        self.update_chat("System", self.CANCELLED_REPLY_MARKER)
+        self.set_status("")
+        return True
+
+    def request_ai_response(self) -> None:
+        user = self.app_manager.active_user
+        self.pending_response = self.ai_manager.start_response(
+            self.messages,
+            on_partial=self.show_partial_reply,
+            conversation_state=user.conversation_state if user else None,
+        )
+        self.pending_response.add_done_callback(self.on_ai_response_done)
+        self.set_status("AI is replying... (Esc to cancel)")
+
+    def on_ai_response_done(self, handle) -> None:
+        # Cancelled or superseded replies were already dealt with.
+        if handle is not self.pending_response:
+            return
+        self.pending_response = None
+        self.clear_partial_reply()
+        self.set_status("")
+        if handle.cancelled():
+            self.update_chat("System", self.CANCELLED_REPLY_MARKER)
+            return
+        error = handle.exception()
+        if error is not None:
+            logging.error(
+                "Error fetching response: %s",
+                error,
+                exc_info=(type(error), error, error.__traceback__),
+            )
+            self.update_chat("System", f"error fetching response: {error}")
+            return
+        self.update_chat("AI", handle.result())
+
     def handle_input(self, key: str) -> str | None:
         if key == "ctrl d":
+            self.cancel_pending_response()
             user = self.app_manager.active_user
             if user:
-                user.chat_history = self.messages.copy()
+                usage = user.conversation_state.usage
+                if usage.requests:
+                    logging.info(
+                        "Prompt cache hit ratio this session: %.1f%% of %d input tokens over %d requests.",
+                        usage.cache_hit_ratio * 100,
+                        usage.input_tokens,
+                        usage.requests,
+                    )
                 try:
                     self.users_manager.save_users()
                     logging.info(f"Chat history saved for user {user.email}")
@@ -237,7 +266,14 @@ class TherapyMode(BaseMode):
             self.app_manager.show(AppModes.MENU)
             return None
 
+        elif key == "esc":
+            self.cancel_pending_response()
+            return None
+
         elif key == "enter":
+            if self.is_response_pending():
+                self.set_status("Still waiting for the previous reply... (Esc to cancel)")
+                return None
             if self.edit_box:
                 message_body = self.edit_box.get_edit_text().strip()
                 if message_body:
@@ -245,9 +281,7 @@ class TherapyMode(BaseMode):
                     try:
                         self.update_chat("You", message_body)
                         self.edit_box.set_edit_text("")
-
-                        ai_response = self.ai_manager.get_response(self.messages)
-                        self.update_chat("AI", ai_response)
+                        self.request_ai_response()
 
                     except Exception as e:
                         logging.exception(f"Error fetching response: {e}")
@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+import pytest
+
+from models.user import User
+from modes.therapy_mode import TherapyMode
+from utils.fake_responses_server import FakeResponsesServer
+
+
+@pytest.fixture
+def fake_server():
+    with FakeResponsesServer() as server:
+        yield server
+
+
+@pytest.fixture
+def make_history():
+    # Alternating user and AI turns; padding makes each message longer.
+    def make(count: int, padding: int = 0) -> list[tuple[str, str]]:
+        suffix = " " + "x" * padding if padding else ""
+        return [("You" if i % 2 == 0 else "AI", f"message {i}{suffix}") for i in range(count)]
+
+    return make
+
+
+@pytest.fixture
+def make_therapy_mode():
+    # An opened TherapyMode for a test user, on a stub app manager.
+    def make(chat_history: list[tuple[str, str]] | None = None, ai_manager=None) -> TherapyMode:
+        user = User(
+            name="Ann",
+            email="ann@example.com",
+            hashed_password=b"hash",
+            chat_history=[] if chat_history is None else chat_history,
+        )
+        app_manager = SimpleNamespace(
+            active_user=user,
+            ai_manager=ai_manager,
+            loop=None,
+            request_redraw=lambda: None,
+            show=lambda mode: None,
+        )
+        mode = TherapyMode(app_manager, users_manager=None)
+        mode.on_activate()
+        return mode
+
+    return make
@@ -0,0 +1,492 @@
+import asyncio
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+from openai import AsyncOpenAI
+
+from managers.ai_manager import AIManager
+from managers.context_window import ContextWindow
+from managers.exceptions import AIIncompleteResponseError, AIStreamError, AIUnavailableError
+from managers.model_router import ModelRouter
+from managers.response_cache import ResponseCache
+from managers.response_models import preload_response_models
+from managers.retry_policy import CircuitBreaker
+from models.conversation_state import ConversationState
+from utils.fake_responses_server import FakeResponsesServer
+
+
+class FakeStream:
+    def __init__(self, text):
+        self.events = [
+            SimpleNamespace(type="response.output_text.delta", delta=text),
+            SimpleNamespace(
+                type="response.completed", response=SimpleNamespace(output_text=text)
+            ),
+        ]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def __aiter__(self):
+        for event in self.events:
+            yield event
+
+
+class FakeResponses:
+    def __init__(self, reply=lambda payload: "ok"):
+        self.reply = reply
+        self.payloads = []
+
+    async def create(self, stream=False, **payload):
+        self.payloads.append(payload)
+        return FakeStream(self.reply(payload))
+
+
+class FailedStream(FakeStream):
+    def __init__(self):
+        super().__init__("")
+        self.events = [
+            SimpleNamespace(
+                type="response.failed",
+                response=SimpleNamespace(error=SimpleNamespace(code="server_error")),
+            )
+        ]
+
+
+class FlakyResponses(FakeResponses):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    async def create(self, stream=False, **payload):
+        self.payloads.append(payload)
+        if self.failures:
+            self.failures -= 1
+            return FailedStream()
+        return FakeStream(self.reply(payload))
+
+
+@pytest.fixture
+def ai_manager():
+    return AIManager(
+        client=SimpleNamespace(responses=FakeResponses()),
+        context_window=ContextWindow(max_input_tokens=200, min_recent_messages=2),
+        summary_batch_messages=4,
+    )
+
+
+class IncompleteStream(FakeStream):
+    def __init__(self, text):
+        super().__init__(text)
+        self.events[-1] = SimpleNamespace(
+            type="response.incomplete",
+            response=SimpleNamespace(
+                output_text=text,
+                status="incomplete",
+                incomplete_details=SimpleNamespace(reason="max_output_tokens"),
+            ),
+        )
+
+
+class IncompleteResponses(FakeResponses):
+    async def create(self, stream=False, **payload):
+        self.payloads.append(payload)
+        return IncompleteStream(self.reply(payload))
+
+
+def test_incomplete_reply_is_marked_and_not_cached():
+    responses = IncompleteResponses(lambda payload: "I hear you, and")
+    manager = AIManager(client=SimpleNamespace(responses=responses), cache=ResponseCache())
+
+    for _ in range(2):
+        reply = asyncio.run(manager.get_response([("You", "hello")]))
+        assert reply == "I hear you, and\n\n[This reply was cut short (max_output_tokens).]"
+    assert len(responses.payloads) == 2
+
+
+def test_incomplete_reply_without_text_is_an_error():
+    manager = AIManager(client=SimpleNamespace(responses=IncompleteResponses(lambda payload: "")))
+    state = ConversationState()
+    with pytest.raises(AIIncompleteResponseError):
+        asyncio.run(manager.get_response([("You", "hello")], conversation_state=state))
+    assert state.previous_response_id is None
+
+
+def test_failed_stream_is_retried():
+    responses = FlakyResponses(failures=1)
+    manager = AIManager(client=SimpleNamespace(responses=responses), backoff_base=0.0, max_backoff=0.0)
+    assert asyncio.run(manager.get_response([("You", "hi")])) == "ok"
+    assert len(responses.payloads) == 2
+    assert manager.turn_metrics.retries == 1
+    assert manager.circuit_breaker.consecutive_failures == 0
+
+
+def test_failed_streams_open_circuit_breaker():
+    manager = AIManager(
+        client=SimpleNamespace(responses=FlakyResponses(failures=10)),
+        backoff_base=0.0,
+        max_backoff=0.0,
+        circuit_breaker=CircuitBreaker(failure_threshold=2),
+    )
+    with pytest.raises(AIUnavailableError) as e:
+        asyncio.run(manager.get_response([("You", "hi")]))
+    assert isinstance(e.value.__cause__, AIStreamError)
+    assert manager.circuit_breaker.is_open
+
+
+def test_get_response_sends_instructions_separately(ai_manager):
+    reply = asyncio.run(ai_manager.get_response([("You", "hello")]))
+    payload = ai_manager.client.responses.payloads[0]
+    assert reply == "ok"
+    assert payload["instructions"] == ai_manager.instructions
+    assert payload["input"] == [{"role": "user", "content": "hello"}]
+
+
+def test_full_resend_reuses_formatted_history(ai_manager, make_history):
+    state = ConversationState()
+    history = make_history(7, padding=80)
+
+    asyncio.run(ai_manager.get_response(history, conversation_state=state))
+    formatted = state.formatted_history
+    history += [("AI", "ok"), ("You", "and another thing")]
+    asyncio.run(ai_manager.get_response(history, conversation_state=state))
+
+    assert state.formatted_history is formatted
+    assert formatted.rebuild_count == 0
+    assert formatted.source_count == len(history)
+    assert ai_manager.client.responses.payloads[-1]["input"][-1]["content"] == "and another thing"
+
+
+def test_get_response_rejects_empty_history(ai_manager):
+    with pytest.raises(ValueError):
+        asyncio.run(ai_manager.get_response([]))
+
+
+def test_overflow_is_summarized_in_background(ai_manager, make_history):
+    ai_manager.client.responses.reply = lambda payload: (
+        "summary" if payload["instructions"] == ai_manager.summary_instructions else "ok"
+    )
+    state = ConversationState()
+    history = make_history(20, padding=80)
+
+    async def run():
+        reply = await ai_manager.get_response(history, conversation_state=state)
+        assert state.summary == ""
+        await asyncio.gather(*ai_manager._summary_tasks.values())
+        return reply
+
+    assert asyncio.run(run()) == "ok"
+    assert state.summary == "summary"
+    assert 0 < state.summarized_count <= ai_manager.context_window.last_dropped_messages
+    assert ai_manager.scheduler.stats()["summary"]["started"] == 1
+    assert ai_manager.scheduler.stats()["interactive"]["started"] == 1
+
+    asyncio.run(ai_manager.get_response(history, conversation_state=state))
+    payload = ai_manager.client.responses.payloads[-1]
+    assert payload["input"][0]["content"].endswith("\nsummary")
+
+
+@pytest.fixture
+def server_ai_manager(fake_server):
+    client = AsyncOpenAI(base_url=fake_server.base_url, api_key="test")
+    return AIManager(client=client, max_retries=0)
+
+
+async def send(manager, state, history, message, **kwargs):
+    history.append(("You", message))
+    reply = await manager.get_response(history, conversation_state=state, **kwargs)
+    history.append(("AI", reply))
+    return reply
+
+
+def test_previous_response_id_sends_only_new_messages(server_ai_manager, fake_server):
+    state = ConversationState()
+    history = [("System", "Chat session started...")]
+
+    async def run():
+        for message in ["one", "two", "three"]:
+            await send(server_ai_manager, state, history, message)
+
+    asyncio.run(run())
+    assert history[-1] == ("AI", "Echo: three")
+    first, second, third = fake_server.requests
+    assert "previous_response_id" not in first
+    assert len(first["input"]) == 2
+    assert second["previous_response_id"] == "resp_1"
+    assert second["input"] == [{"role": "user", "content": "two"}]
+    assert third["previous_response_id"] == "resp_2"
+    assert state.previous_response_id == "resp_3"
+    assert state.response_count == len(history)
+
+
+def test_expired_chain_falls_back_to_full_resend(server_ai_manager, fake_server):
+    state = ConversationState()
+    history = [("System", "Chat session started...")]
+
+    async def run():
+        await send(server_ai_manager, state, history, "one")
+        fake_server.expire()
+        return await send(server_ai_manager, state, history, "two")
+
+    assert asyncio.run(run()) == "Echo: two"
+    expired, resent = fake_server.requests[1:]
+    assert expired["previous_response_id"] == "resp_1"
+    assert "previous_response_id" not in resent
+    assert len(resent["input"]) == 4
+    assert state.previous_response_id == "resp_2"
+
+
+def test_chain_reset_when_instructions_change(server_ai_manager, fake_server):
+    state = ConversationState()
+    history = [("System", "Chat session started...")]
+
+    async def run():
+        await send(server_ai_manager, state, history, "one")
+        await send(server_ai_manager, state, history, "two", override_instructions="Be brief.")
+
+    asyncio.run(run())
+    assert "previous_response_id" not in fake_server.requests[-1]
+    assert fake_server.requests[-1]["instructions"] == "Be brief."
+
+
+def test_warm_up_opens_connection(server_ai_manager):
+    assert asyncio.run(server_ai_manager.warm_up()) is True
+    assert server_ai_manager.warmed_up
+    # The reply stream models were built as well.
+    assert preload_response_models() == 0
+
+
+def test_preload_builds_reply_stream_models():
+    # A fresh interpreter, since other tests may have built the models already.
+    code = (
+        "from managers.response_models import preload_response_models; "
+        "print(preload_response_models(), preload_response_models())"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    first, second = map(int, result.stdout.split())
+    assert first > 0
+    assert second == 0
+
+
+def test_app_startup_does_not_import_openai():
+    code = "import sys, ui.app_manager; print('openai' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_client_is_built_on_first_use():
+    manager = AIManager()
+    asyncio.run(manager.close())
+    assert manager._client is None
+
+
+def test_built_client_uses_configured_pool(fake_server):
+    manager = AIManager(
+        base_url=fake_server.base_url,
+        api_key="test",
+        max_connections=3,
+        max_keepalive_connections=2,
+        keepalive_expiry=7.0,
+        connect_timeout=1.5,
+        read_timeout=9.0,
+    )
+
+    async def run():
+        try:
+            return await manager.get_response([("You", "hi")])
+        finally:
+            await manager.close()
+
+    assert asyncio.run(run()) == "Echo: hi"
+    client = manager.client
+    assert client.max_retries == 0
+    assert (client.timeout.connect, client.timeout.read) == (1.5, 9.0)
+    pool = client._client._transport._pool
+    assert (pool._max_connections, pool._max_keepalive_connections, pool._keepalive_expiry) == (3, 2, 7.0)
+
+
+def test_prepare_builds_client_ahead_of_first_request(fake_server):
+    manager = AIManager(base_url=fake_server.base_url, api_key="test")
+    manager.prepare()
+    assert manager.prepared
+    assert manager._client is not None
+
+    async def run():
+        try:
+            return await manager.get_response([("You", "hello")])
+        finally:
+            await manager.close()
+
+    assert asyncio.run(run()) == "Echo: hello"
+
+
+def test_hedged_request_uses_fallback_when_primary_is_slow():
+    with FakeResponsesServer(model_latency={"slow-model": 2.0}) as server:
+        manager = AIManager(
+            client=AsyncOpenAI(base_url=server.base_url, api_key="test"),
+            models=["slow-model", "fast-model"],
+            latency_slo=0.1,
+        )
+        reply = asyncio.run(manager.get_response([("You", "hello")]))
+
+    assert reply == "Echo: hello"
+    assert [request["model"] for request in server.requests] == ["slow-model", "fast-model"]
+    assert manager.turn_metrics.last.model == "fast-model"
+    assert manager.turn_metrics.last.hedged
+    assert manager.turn_metrics.last.latency < 2.0
+
+
+class RecordingAIManager(AIManager):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.stream_events = []
+
+    async def _stream_response(self, payload, first_token, partial=None):
+        try:
+            resp = await super()._stream_response(payload, first_token, partial)
+        except asyncio.CancelledError:
+            self.stream_events.append(("cancelled", payload["model"]))
+            raise
+        self.stream_events.append(("completed", payload["model"]))
+        return resp
+
+
+def test_hedge_loser_is_cancelled_before_winner_completes():
+    with FakeResponsesServer(model_latency={"slow-model": 1.0}, chunk_size=2, chunk_delay=0.05) as server:
+        manager = RecordingAIManager(
+            client=AsyncOpenAI(base_url=server.base_url, api_key="test"),
+            models=["slow-model", "fast-model"],
+            latency_slo=0.1,
+        )
+        reply = asyncio.run(manager.get_response([("You", "hello")]))
+
+    assert reply == "Echo: hello"
+    assert manager.stream_events == [("cancelled", "slow-model"), ("completed", "fast-model")]
+
+
+def test_no_hedge_when_primary_meets_slo(fake_server):
+    manager = AIManager(
+        client=AsyncOpenAI(base_url=fake_server.base_url, api_key="test"),
+        models=["primary", "fallback"],
+        latency_slo=5.0,
+    )
+    asyncio.run(manager.get_response([("You", "hello")]))
+    assert [request["model"] for request in fake_server.requests] == ["primary"]
+    assert manager.turn_metrics.last.model == "primary"
+    assert not manager.turn_metrics.last.hedged
+
+
+def test_router_decision_is_sent(fake_server):
+    manager = AIManager(
+        client=AsyncOpenAI(base_url=fake_server.base_url, api_key="test"),
+        router=ModelRouter(),
+    )
+    asyncio.run(manager.get_response([("You", "x" * 600)]))
+    request = fake_server.requests[-1]
+    assert request["reasoning"] == {"effort": "high"}
+    assert request["max_output_tokens"] == 6000
+
+
+def test_rate_limit_is_retried_after_server_hint(fake_server):
+    fake_server.retry_after = 0.2
+    fake_server.fail_next(429)
+    manager = AIManager(
+        client=AsyncOpenAI(base_url=fake_server.base_url, api_key="test", max_retries=0),
+        backoff_base=0.01,
+    )
+    start = time.perf_counter()
+    assert asyncio.run(manager.get_response([("You", "hello")])) == "Echo: hello"
+    assert time.perf_counter() - start >= 0.2
+    assert fake_server.stats["rate_limited"] == 1
+    assert fake_server.stats["responses"] == 1
+    assert manager.turn_metrics.retries == 1
+
+
+def test_server_errors_open_circuit_breaker(fake_server):
+    fake_server.fail_next(500, count=10)
+    manager = AIManager(
+        client=AsyncOpenAI(base_url=fake_server.base_url, api_key="test", max_retries=0),
+        backoff_base=0.0,
+        max_backoff=0.0,
+        circuit_breaker=CircuitBreaker(failure_threshold=2),
+    )
+
+    async def run():
+        with pytest.raises(AIUnavailableError):
+            await manager.get_response([("You", "hello")])
+        with pytest.raises(AIUnavailableError):
+            await manager.get_response([("You", "hello")])
+
+    asyncio.run(run())
+    assert fake_server.stats["errors"] == 2
+
+
+def test_start_response_streams_partial_text(fake_server):
+    fake_server.chunk_size = 3
+    updates = []
+
+    async def run():
+        manager = AIManager(client=AsyncOpenAI(base_url=fake_server.base_url, api_key="test"))
+        history = [("You", "hello there")]
+        handle = manager.start_response(history, on_partial=updates.append)
+        history.append(("System", "added while the reply streams"))
+        return await handle
+
+    assert asyncio.run(run()) == "Echo: hello there"
+    assert len(updates) > 1
+    assert updates[-1] == "Echo: hello there"
+    assert fake_server.requests[-1]["input"][-1]["content"] == "hello there"
+
+
+def test_cancel_aborts_in_flight_response(fake_server):
+    fake_server.chunk_size = 2
+    fake_server.chunk_delay = 0.05
+    state = ConversationState()
+    history = [("You", "a fairly long message to echo back slowly")]
+
+    async def run():
+        manager = AIManager(client=AsyncOpenAI(base_url=fake_server.base_url, api_key="test"))
+        # The SDK's first stream is slow to set up, keep it out of the timing.
+        await manager.get_response([("You", "warm up")])
+        handle = manager.start_response(history, conversation_state=state)
+        while not handle.partial_text:
+            await asyncio.sleep(0.01)
+        assert handle.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await handle
+        return manager, handle
+
+    manager, handle = asyncio.run(run())
+    assert handle.cancelled()
+    assert handle.partial_text.startswith("Ec")
+    assert state.previous_response_id is None
+    assert history == [("You", "a fairly long message to echo back slowly")]
+    assert manager.scheduler.in_flight == 0
+    assert manager.pacer.pending_requests == 0
+
+
+def test_cached_tokens_are_recorded_per_call_and_session():
+    with FakeResponsesServer(prompt_cache_min_tokens=0) as server:
+        state = ConversationState()
+        history = [("System", "Chat session started...")]
+
+        async def run():
+            manager = AIManager(client=AsyncOpenAI(base_url=server.base_url, api_key="test"))
+            await send(manager, state, history, "first message " * 20)
+            first = manager.turn_metrics.last
+            await send(manager, state, history, "second message")
+            return manager, first
+
+        manager, first = asyncio.run(run())
+
+    assert first.cached_tokens == 0
+    assert 0 < manager.turn_metrics.last.cached_tokens < manager.turn_metrics.last.input_tokens
+    assert state.usage.requests == 2
+    assert state.usage.cached_tokens == manager.turn_metrics.last.cached_tokens
+    assert 0 < state.usage.cache_hit_ratio < 1
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+from ui.app_manager import AppManager
+from ui.bracketed_paste import Paste, PasteCollector, keys_to_text
+
+
+def test_paste_becomes_one_event():
+    collector = PasteCollector()
+    events = collector.feed(["a", "begin paste", "h", "i", "enter", "t", "h", "e", "r", "e", "end paste", "b"])
+
+    assert events == ["a", Paste("hi\nthere", ["h", "i", "enter", "t", "h", "e", "r", "e"]), "b"]
+    assert collector.paste_count == 1
+    assert collector.pasted_chars == 8
+
+
+def test_paste_split_across_input_batches():
+    collector = PasteCollector()
+    assert collector.feed(["begin paste", "x", " "]) == []
+    assert collector.collecting
+    assert collector.feed(["tab", "y"]) == []
+    assert collector.feed(["end paste"]) == [Paste("x \ty", ["x", " ", "tab", "y"])]
+    assert not collector.collecting
+
+
+def test_non_text_keys_are_dropped_from_pasted_text():
+    assert keys_to_text(["a", "esc", ("mouse press", 1, 0, 0), "ctrl x", "é"]) == "aé"
+
+
+def test_therapy_mode_inserts_paste_without_sending(make_therapy_mode):
+    mode = make_therapy_mode()
+    mode.edit_box.set_edit_text("note: ")
+    mode.edit_box.set_edit_pos(6)
+    messages = list(mode.messages)
+
+    mode.handle_paste("line one\nline two")
+
+    assert mode.edit_box.get_edit_text() == "note: line one\nline two"
+    assert mode.messages == messages
+
+
+def test_app_delivers_paste_after_preceding_keys(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    app = AppManager()
+    order = []
+    app.loop = SimpleNamespace(process_input=lambda keys: order.append(("keys", list(keys))))
+    app.active_mode = SimpleNamespace(handle_paste=lambda text: order.append(("paste", text)))
+
+    remaining = app._filter_input(["a", "begin paste", "b", "enter", "c", "end paste", "d"], [])
+
+    assert order == [("keys", ["a"]), ("paste", "b\nc")]
+    assert remaining == ["d"]
+    assert app.redraw.keystrokes == 3
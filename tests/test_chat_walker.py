@@ -0,0 +1,170 @@
+import pytest
+import urwid as u
+
+from ui.chat_walker import ChatListWalker, RenderCache
+
+SIZE = (60, 20)
+
+
+def make_markup(sender, body, is_last):
+    return f"{sender}: {body}{' *' if is_last else ''}"
+
+
+def visible_text(listbox):
+    return [line.decode().rstrip() for line in listbox.render(SIZE, focus=True).text]
+
+
+def test_only_rows_near_the_focus_are_built(make_history):
+    walker = ChatListWalker(make_history(10_000), make_markup, cache_size=50, margin=5)
+    listbox = u.ListBox(walker)
+    listbox.set_focus(len(walker) - 1)
+    listbox.set_focus_valign("bottom")
+
+    lines = visible_text(listbox)
+    assert lines[-1] == "AI: message 9999 *"
+    assert walker.build_count < 40
+    assert walker.cached_count <= 50
+
+
+def test_scrolling_back_reuses_cached_widgets(make_history):
+    walker = ChatListWalker(make_history(1_000), make_markup, cache_size=100, margin=5)
+    listbox = u.ListBox(walker)
+    listbox.set_focus(len(walker) - 1)
+    visible_text(listbox)
+    listbox.keypress(SIZE, "page up")
+    visible_text(listbox)
+    built = walker.build_count
+
+    listbox.keypress(SIZE, "page down")
+    visible_text(listbox)
+    assert walker.build_count == built
+
+
+def test_refresh_restyles_previous_last_message(make_history):
+    messages = make_history(3)
+    walker = ChatListWalker(messages, make_markup)
+    assert walker[2].text == "You: message 2 *"
+
+    messages.append(("AI", "reply"))
+    walker.refresh(len(messages) - 2)
+    assert walker[2].text == "You: message 2"
+    assert walker[3].text == "AI: reply *"
+
+
+def test_resizing_back_reuses_rendered_messages(make_history):
+    walker = ChatListWalker(make_history(500), make_markup)
+    listbox = u.ListBox(walker)
+    listbox.set_focus(len(walker) - 1)
+    for width in (60, 40):
+        listbox.render((width, 20), focus=True)
+    misses = walker.render_cache.misses
+
+    assert [line.decode().rstrip() for line in listbox.render((60, 20), focus=True).text] == (
+        visible_text(listbox)
+    )
+    assert walker.render_cache.misses == misses
+    assert walker.render_cache.hits > 0
+
+
+def test_rebuilt_widgets_share_rendered_canvas(make_history):
+    walker = ChatListWalker(make_history(3), make_markup, cache_size=1)
+    walker[0].render((30,))
+    walker[1]
+    hits = walker.render_cache.hits
+    walker[0].render((30,))
+    assert walker.build_count == 3
+    assert walker.render_cache.hits == hits + 1
+
+
+def test_new_message_invalidates_only_the_two_affected_entries(make_history):
+    messages = make_history(20)
+    walker = ChatListWalker(messages, make_markup)
+    for position in range(20):
+        walker[position].render((30,))
+    assert len(walker.render_cache) == 20
+
+    messages.append(("AI", "reply"))
+    walker.refresh(len(messages) - 2)
+    assert len(walker.render_cache) == 19
+    assert walker[19].render((30,)).text[0].decode().rstrip() == "AI: message 19"
+
+
+def test_reopened_history_keeps_rendered_messages(make_history):
+    messages = make_history(5)
+    walker = ChatListWalker(messages, make_markup)
+    for position in range(5):
+        walker[position].render((30,))
+
+    messages.append(("System", "Continuing previous chat session from here..."))
+    walker.set_messages(messages)
+    assert sorted(key[0] for key in walker.render_cache.entries) == [0, 1, 2, 3]
+
+    walker.set_messages(make_history(3))
+    assert len(walker.render_cache) == 0
+
+
+def test_opens_with_last_page_only(make_history):
+    walker = ChatListWalker(make_history(10_000), make_markup, page_size=50)
+    assert walker.first_loaded == 9_950
+    assert list(walker.positions())[0] == 9_950
+    with pytest.raises(IndexError):
+        walker[9_949]
+
+
+def test_scrolling_to_the_top_pages_in_older_messages(make_history):
+    walker = ChatListWalker(make_history(1_000), make_markup, page_size=30)
+    listbox = u.ListBox(walker)
+    listbox.set_focus(len(walker) - 1)
+    visible_text(listbox)
+    for _ in range(60):
+        listbox.keypress(SIZE, "up")
+        visible_text(listbox)
+
+    assert walker.pages_loaded > 2
+    assert walker.first_loaded < 1_000 - 60
+    assert listbox.focus_position < 1_000 - 30
+
+
+def test_loading_older_page_keeps_scroll_position(make_history):
+    walker = ChatListWalker(make_history(500), make_markup, page_size=20)
+    listbox = u.ListBox(walker)
+    listbox.set_focus(490)
+    before = visible_text(listbox)
+
+    assert walker.load_older()
+    assert visible_text(listbox) == before
+    assert listbox.focus_position == 490
+
+
+def test_partial_reply_is_an_extra_row(make_history):
+    messages = make_history(2)
+    walker = ChatListWalker(messages, make_markup)
+    walker.set_partial("Hel")
+    assert len(walker) == 3
+    assert walker[2].text == "AI: Hel... *"
+
+    walker.set_partial(None)
+    assert len(walker) == 2
+    with pytest.raises(IndexError):
+        walker[2]
+
+
+def test_therapy_mode_opens_long_history_without_building_every_widget(make_therapy_mode, make_history):
+    history = make_history(10_000)
+    mode = make_therapy_mode(history)
+    mode.chat_window.render(SIZE, focus=False)
+
+    assert mode.messages is history
+    assert len(mode.chat_walker) == 10_001
+    assert mode.chat_walker.build_count < 60
+
+    mode.update_chat("You", "hello")
+    assert mode.chat_walker[len(mode.messages) - 1].text == "You: hello"
+
+
+@pytest.mark.parametrize("cache_size", [0, -1, 2.5])
+def test_invalid_cache_size(cache_size):
+    with pytest.raises(ValueError):
+        ChatListWalker([], make_markup, cache_size=cache_size)
+    with pytest.raises(ValueError):
+        RenderCache(max_entries=cache_size)
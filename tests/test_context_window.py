@@ -0,0 +1,72 @@
+import pytest
+
+from managers.context_window import ContextWindow, estimate_tokens
+from managers.formatted_history import format_message
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def get_window(window: ContextWindow, history: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    token_totals = [0]
+    for sender, content in history:
+        token_totals.append(token_totals[-1] + window.count_message(format_message(sender, content)))
+    return history[window.get_window_start("instructions", token_totals) :]
+
+
+def test_window_keeps_everything_within_budget(make_history):
+    window = ContextWindow(max_input_tokens=10_000)
+    history = make_history(10, padding=40)
+    assert get_window(window, history) == history
+    assert window.last_dropped_messages == 0
+
+
+def test_window_trims_oldest_messages(make_history):
+    window = ContextWindow(max_input_tokens=100, min_recent_messages=1)
+    history = make_history(20, padding=40)
+    selected = get_window(window, history)
+    assert 0 < len(selected) < len(history)
+    assert selected == history[-len(selected) :]
+    assert window.last_dropped_messages == len(history) - len(selected)
+    assert window.last_input_tokens <= window.max_input_tokens
+
+
+def test_window_always_keeps_recent_messages(make_history):
+    window = ContextWindow(max_input_tokens=1, min_recent_messages=3)
+    history = make_history(10, padding=40)
+    assert get_window(window, history) == history[-3:]
+
+
+@pytest.mark.parametrize(
+    "max_input_tokens, min_recent_messages", [(0, 1), (100, 0)]
+)
+def test_invalid_configuration(max_input_tokens, min_recent_messages):
+    with pytest.raises(ValueError):
+        ContextWindow(max_input_tokens, min_recent_messages)
+
+
+@pytest.mark.parametrize("trim_slack", [-0.1, 1.0])
+def test_invalid_trim_slack(trim_slack):
+    with pytest.raises(ValueError):
+        ContextWindow(trim_slack=trim_slack)
+
+
+def test_window_start_stays_put_until_it_must_move():
+    window = ContextWindow(max_input_tokens=400, min_recent_messages=1, trim_slack=0.25)
+    token_totals = [0]
+    starts = []
+    start = 0
+    for _ in range(40):
+        token_totals.append(token_totals[-1] + 20)
+        start = window.get_window_start("instructions", token_totals, start)
+        starts.append(start)
+        assert window.last_input_tokens <= 400
+
+    moves = [i for i in range(1, len(starts)) if starts[i] != starts[i - 1]]
+    assert starts[-1] > 0
+    # The window jumps ahead in steps instead of sliding every turn.
+    assert len(moves) <= len(starts) // 4
+    assert all(b >= a for a, b in zip(starts, starts[1:]))
@@ -0,0 +1,69 @@
+import pytest
+
+from managers.context_window import ContextWindow
+from managers.formatted_history import FormattedHistory, HistorySnapshot
+
+
+def test_sync_formats_only_new_messages(make_history):
+    formatted = FormattedHistory(ContextWindow())
+    history = make_history(4)
+    first = formatted.sync(history)
+    assert first == [
+        {"role": "user", "content": "message 0"},
+        {"role": "assistant", "content": "message 1"},
+        {"role": "user", "content": "message 2"},
+        {"role": "assistant", "content": "message 3"},
+    ]
+    kept = list(first)
+
+    history.append(("System", "note"))
+    history.append(("Unknown", "skipped"))
+    history.append(("You", "message 6"))
+    messages = formatted.sync(history)
+    assert all(old is new for old, new in zip(kept, messages))
+    assert messages[4:] == [
+        {"role": "system", "content": "note"},
+        {"role": "user", "content": "message 6"},
+    ]
+    assert formatted.source_count == 7
+    assert formatted.rebuild_count == 0
+
+
+def test_token_totals_track_messages(make_history):
+    window = ContextWindow()
+    formatted = FormattedHistory(window)
+    messages = formatted.sync(make_history(5))
+    assert len(formatted.token_totals) == len(messages) + 1
+    assert formatted.token_totals[-1] == sum(window.count_message(m) for m in messages)
+
+
+def test_replaced_history_is_rebuilt(make_history):
+    formatted = FormattedHistory(ContextWindow())
+    formatted.sync(make_history(6))
+    other = [("You", "another conversation")]
+    assert formatted.sync(other) == [{"role": "user", "content": "another conversation"}]
+    assert formatted.rebuild_count == 1
+
+    formatted.sync(make_history(3))
+    assert formatted.rebuild_count == 2
+    assert len(formatted.messages) == 3
+
+
+def test_snapshot_hides_later_messages(make_history):
+    history = make_history(4)
+    snapshot = HistorySnapshot(history)
+    history.append(("You", "message 4"))
+
+    assert len(snapshot) == 4
+    assert list(snapshot) == history[:4]
+    assert snapshot[-1] == ("AI", "message 3")
+    assert snapshot[2:] == history[2:4]
+    assert snapshot[::-2] == [history[3], history[1]]
+    assert list(reversed(snapshot)) == history[3::-1]
+    with pytest.raises(IndexError):
+        snapshot[4]
+
+    formatted = FormattedHistory(ContextWindow())
+    assert len(formatted.sync(snapshot)) == 4
+    assert len(formatted.sync(history)) == 5
+    assert formatted.rebuild_count == 0
@@ -0,0 +1,182 @@
+import asyncio
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+from openai import AsyncOpenAI
+
+from headless import Conversation, HeadlessRunner, main_async, parse_jsonl
+from managers.ai_manager import AIManager
+from managers.context_window import ContextWindow
+from managers.model_router import ModelRouter, RouteDecision
+from managers.users_manager import UsersManager
+from utils.fake_responses_server import FakeResponsesServer
+
+EMAILS = ["ann@example.com", "bob@example.com", "cid@example.com"]
+
+
+@pytest.fixture
+def users_file(tmp_path):
+    file_path = str(tmp_path / "users.json")
+    users_manager = UsersManager(file_path)
+    for email in EMAILS:
+        users_manager.add_user(email.split("@")[0].title(), email, "secret", "1234")
+    return file_path
+
+
+def run_headless(server, users_file, conversations, manager_kwargs=None, **kwargs):
+    output = io.StringIO()
+
+    async def run():
+        manager = AIManager(
+            client=AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0),
+            **(manager_kwargs or {}),
+        )
+        manager.prepare()
+        await manager.warm_up()
+        runner = HeadlessRunner(
+            UsersManager(users_file), manager, output=output, password="secret", passcode="1234", **kwargs
+        )
+        return await runner.run(conversations)
+
+    return asyncio.run(run()), output.getvalue()
+
+
+def test_parse_jsonl_groups_messages_by_user():
+    lines = [
+        '{"email": "ann@example.com", "message": "hi", "password": "p", "passcode": "1"}',
+        "",
+        '{"message": "hello"}',
+        '{"email": "ann@example.com", "message": "again"}',
+    ]
+    conversations = parse_jsonl(lines, default_email="bob@example.com")
+
+    assert [(c.email, c.messages) for c in conversations] == [
+        ("ann@example.com", ["hi", "again"]),
+        ("bob@example.com", ["hello"]),
+    ]
+    assert (conversations[0].password, conversations[0].passcode) == ("p", "1")
+
+
+@pytest.mark.parametrize("line", ["not json", "[1]", '{"message": "no user"}', '{"email": "a@b.cd", "message": " "}'])
+def test_parse_jsonl_rejects_bad_lines(line):
+    with pytest.raises(ValueError, match="line 1"):
+        parse_jsonl([line])
+
+
+def test_conversations_run_concurrently_and_persist_history(users_file):
+    with FakeResponsesServer(latency=0.4) as server:
+        conversations = [Conversation(email, [f"{email} one", f"{email} two"]) for email in EMAILS]
+        report, output = run_headless(server, users_file, conversations)
+
+    events = [json.loads(line) for line in output.splitlines()]
+    replies = [event for event in events if event["event"] == "reply"]
+    assert len(replies) == 6
+    for email in EMAILS:
+        deltas = "".join(e["text"] for e in events if e["email"] == email and e["turn"] == 2 and e["event"] == "delta")
+        assert deltas == f"Echo: {email} two"
+
+    assert report.turns == 6 and report.error_count == 0
+    # Three users at two 0.4 s turns each finish well before a serial run would.
+    assert report.duration < 6 * 0.4
+
+    user = UsersManager(users_file).get_user_by_email(EMAILS[0])
+    assert user.chat_history == [
+        ("System", "Chat session started..."),
+        ("You", f"{EMAILS[0]} one"),
+        ("AI", f"Echo: {EMAILS[0]} one"),
+        ("You", f"{EMAILS[0]} two"),
+        ("AI", f"Echo: {EMAILS[0]} two"),
+    ]
+    # The server-side chain is saved with the history, as in the app.
+    assert user.conversation_state.previous_response_id
+    assert user.conversation_state.response_count == len(user.chat_history)
+
+
+def test_summary_started_on_the_last_turn_is_saved(users_file):
+    users_manager = UsersManager(users_file)
+    users_manager.get_user_by_email(EMAILS[0]).chat_history = [
+        ("You" if i % 2 == 0 else "AI", f"message {i} " + "x" * 80) for i in range(20)
+    ]
+    users_manager.save_users()
+    summary_route = RouteDecision("slow-summary-model")
+    manager_kwargs = {
+        "context_window": ContextWindow(max_input_tokens=200, min_recent_messages=2),
+        "summary_batch_messages": 4,
+        "router": ModelRouter(
+            presets={ModelRouter.SUMMARY: {ModelRouter.STANDARD: summary_route, ModelRouter.DEEP: summary_route}}
+        ),
+    }
+    # The summary is still being written when the reply has been sent.
+    with FakeResponsesServer(model_latency={"slow-summary-model": 0.5}) as server:
+        report, _ = run_headless(
+            server, users_file, [Conversation(EMAILS[0], ["one more thing"])], manager_kwargs=manager_kwargs
+        )
+
+    assert report.error_count == 0
+    state = UsersManager(users_file).get_user_by_email(EMAILS[0]).conversation_state
+    assert state.summary
+    assert state.summarized_count > 0
+
+
+def test_failed_login_is_reported_and_skipped(users_file):
+    with FakeResponsesServer() as server:
+        conversations = [
+            Conversation(EMAILS[0], ["hi"], password="wrong"),
+            Conversation("nobody@example.com", ["hi"]),
+        ]
+        report, output = run_headless(server, users_file, conversations)
+
+    assert report.auth_failures == 2
+    assert report.turns == 0
+    assert [json.loads(line)["event"] for line in output.splitlines()] == ["error", "error"]
+    assert server.requests == []
+    assert UsersManager(users_file).get_user_by_email(EMAILS[0]).chat_history == []
+
+
+def test_text_output_streams_messages_as_they_arrive(users_file):
+    async def messages():
+        for text in ["first", "second"]:
+            await asyncio.sleep(0)
+            yield text
+
+    with FakeResponsesServer(chunk_size=4) as server:
+        report, output = run_headless(
+            server, users_file, [Conversation(EMAILS[1], messages())], output_format="text"
+        )
+
+    assert output == "Echo: first\nEcho: second\n"
+    assert report.turns == 2
+
+
+def test_no_stream_writes_only_whole_replies(users_file):
+    with FakeResponsesServer(chunk_size=2) as server:
+        _, output = run_headless(server, users_file, [Conversation(EMAILS[2], ["hello"])], stream=False)
+
+    assert [json.loads(line) for line in output.splitlines()] == [
+        {"email": EMAILS[2], "turn": 1, "event": "reply", "text": "Echo: hello"}
+    ]
+
+
+def test_one_conversation_per_user(users_file):
+    with FakeResponsesServer() as server, pytest.raises(ValueError):
+        run_headless(server, users_file, [Conversation(EMAILS[0]), Conversation(EMAILS[0])])
+
+
+def test_text_output_takes_a_single_conversation(users_file):
+    conversations = [Conversation(EMAILS[0], ["hi"]), Conversation(EMAILS[1], ["hi"])]
+    with FakeResponsesServer() as server, pytest.raises(ValueError, match="must be jsonl"):
+        run_headless(server, users_file, conversations, output_format="text")
+    assert server.requests == []
+
+
+def test_piped_messages_need_passwords_from_the_environment(monkeypatch):
+    monkeypatch.delenv("HEADLESS_PASSWORD", raising=False)
+    monkeypatch.setenv("HEADLESS_PASSCODE", "1234")
+    monkeypatch.setattr("sys.stdin", io.StringIO("hello\n"))
+    monkeypatch.setattr("getpass.getpass", lambda *args, **kwargs: pytest.fail("prompted for a password"))
+    args = SimpleNamespace(jsonl=None, email=EMAILS[0])
+
+    with pytest.raises(ValueError, match="HEADLESS_PASSWORD"):
+        asyncio.run(main_async(args))
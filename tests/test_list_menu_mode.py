@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+
+import pytest
+
+from modes.list_menu_mode import ListMenuMode
+from modes.menu_mode import MenuMode
+from ui.menu_walker import MenuListWalker, TypeAheadFilter
+
+SIZE = (120, 40)
+
+
+class BigMenu(ListMenuMode):
+    def __init__(self, count: int):
+        self.count = count
+        self.pressed = []
+        super().__init__(SimpleNamespace(active_user=None), "Big", "Footer")
+
+    def _get_items_data(self):
+        return [
+            (f"Item {i:06d}", f"Description {i}", lambda _button, i=i: self.pressed.append(i))
+            for i in range(self.count)
+        ]
+
+
+def make_menu(count: int = 100_000) -> BigMenu:
+    menu = BigMenu(count)
+    menu.on_activate()
+    return menu
+
+
+def type_keys(menu, keys):
+    for key in keys:
+        assert menu.handle_input(key) is None
+
+
+def test_rows_are_built_on_demand():
+    menu = make_menu()
+    menu.frame.render(SIZE, focus=True)
+
+    assert menu.walker.build_count < 20
+    assert menu.description_widget.text == "Description 0"
+
+
+def test_descriptions_are_indexed_by_label():
+    items = [(" A ", "first", None), ("B", "second", None), ("A", "duplicate", None)]
+    assert ListMenuMode._index_descriptions(items) == {"A": "first", "B": "second"}
+
+
+def test_type_ahead_narrows_items():
+    menu = make_menu()
+    type_keys(menu, "99999")
+
+    assert [menu.walker.item_index(p) for p in menu.walker.positions()] == [99999]
+    assert menu.description_widget.text == "Description 99999"
+    assert menu.filter_widget.text == "Filter: 99999 (1/100000)"
+
+    menu.frame.keypress(SIZE, "enter")
+    assert menu.pressed == [99999]
+
+
+def test_backspace_and_escape_widen_the_filter():
+    menu = make_menu()
+    type_keys(menu, "12345")
+    assert len(menu.walker) == 1
+
+    type_keys(menu, ["backspace"])
+    assert menu.filter_query == "1234"
+    assert len(menu.walker) == 20
+
+    type_keys(menu, ["esc"])
+    assert menu.filter_query == ""
+    assert len(menu.walker) == 100_000
+    assert len(menu.list_pile.contents) == 1
+
+
+def test_no_matches_leaves_an_empty_list():
+    menu = make_menu(10)
+    type_keys(menu, "zz")
+    menu.frame.render(SIZE, focus=True)
+    menu.frame.keypress(SIZE, "down")
+
+    assert len(menu.walker) == 0
+    assert menu.description_widget.text == "No items match the filter."
+
+
+def test_filter_reuses_previous_matches():
+    type_ahead = TypeAheadFilter(["Alpha", "alps", "Beta", "ALPHABET"])
+    assert list(type_ahead.set_query("AL")) == [0, 1, 3]
+    assert list(type_ahead.set_query("alph")) == [0, 3]
+    assert list(type_ahead.set_query("alpha")) == [0, 3]
+    assert list(type_ahead.set_query("alp")) == [0, 1, 3]
+    assert list(type_ahead.set_query("be")) == [2, 3]
+    assert type_ahead.query == "be"
+
+
+def test_walker_keeps_a_bounded_row_cache():
+    built = []
+    walker = MenuListWalker(range(1000), lambda index: built.append(index) or index, cache_size=5)
+    for position in range(10):
+        walker[position]
+    walker[9]
+
+    assert built == list(range(10))
+    assert len(walker._rows) == 5
+    with pytest.raises(IndexError):
+        walker[1000]
+
+
+def test_menu_mode_keeps_logout_shortcut():
+    logouts = []
+    app_manager = SimpleNamespace(active_user=None, logout=lambda: logouts.append(True))
+    menu = MenuMode(app_manager)
+    menu.on_activate()
+
+    type_keys(menu, "pro")
+    assert menu.description_widget.text.startswith("Edit user profile.")
+    assert menu.handle_input("ctrl d") is None
+    assert logouts == [True]
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from openai import AsyncOpenAI
+
+from benchmarks.load_replay import LoadReport, get_replay_turns, make_conversation, run_load
+from managers.ai_manager import AIManager
+from utils.fake_responses_server import FakeResponsesServer
+
+
+def test_replay_turns_end_on_user_messages():
+    history = make_conversation(3, 0)
+    turns = get_replay_turns(history)
+    assert len(turns) == 3
+    assert all(turn[-1][0] == "You" for turn in turns)
+    assert turns[1] == history[:4]
+    assert len(get_replay_turns(history, max_turns=2)) == 2
+
+
+def test_report_percentiles():
+    report = LoadReport(1, latencies=[0.1 * i for i in range(1, 101)], duration=2.0)
+    assert report.percentile(50) == pytest.approx(5.0)
+    assert report.percentile(99) == pytest.approx(9.9)
+    assert report.throughput == 50
+
+
+def test_run_load_replays_sessions_concurrently():
+    with FakeResponsesServer(latency=0.05) as server:
+        async def run():
+            manager = AIManager(
+                client=AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0),
+                backoff_base=0.01,
+            )
+            # The SDK builds its streaming event models on first use.
+            await manager.get_response([("You", "warm up")])
+            server.requests.clear()
+            server.fail_next(429)
+            conversations = [make_conversation(3, i) for i in range(4)]
+            return await run_load(manager, conversations, virtual_users=4)
+
+        report = asyncio.run(run())
+
+    assert report.sessions == 4
+    assert report.turns == 12
+    assert len(report.latencies) == 12
+    assert report.retries == 1
+    assert report.error_count == 0
+    # Four users at 50 ms per turn finish well before a serial replay would.
+    assert report.duration < 12 * 0.05
+    # Later turns of each session are chained server-side.
+    assert sum(1 for request in server.requests if request.get("previous_response_id")) == 8
@@ -0,0 +1,75 @@
+import pytest
+
+from ui.app_modes import AppModes
+from ui.mode_registry import ModeRegistry
+
+
+class FakeMode:
+    def __init__(self, name):
+        self.name = name
+
+
+def make_registry(built, **kwargs):
+    registry = ModeRegistry(**kwargs)
+
+    def factory(name):
+        def build():
+            built.append(name)
+            return FakeMode(name)
+
+        return build
+
+    registry.register(AppModes.LOGIN, factory("login"))
+    registry.register(AppModes.MENU, factory("menu"))
+    registry.register(AppModes.REGISTER, factory("register"), evictable=True)
+    registry.register(AppModes.PROFILE, factory("profile"), evictable=True)
+    return registry
+
+
+def test_modes_are_built_on_first_get_and_cached():
+    built = []
+    registry = make_registry(built)
+    assert built == []
+    assert not registry.is_built(AppModes.LOGIN)
+
+    login = registry.get(AppModes.LOGIN)
+    assert registry.get(AppModes.LOGIN) is login
+    assert built == ["login"]
+    assert registry.build_counts == {AppModes.LOGIN: 1}
+
+
+def test_unknown_mode_returns_none():
+    registry = ModeRegistry()
+    assert registry.get(AppModes.THERAPY) is None
+    assert AppModes.THERAPY not in registry
+
+
+def test_idle_evictable_modes_are_dropped_least_recent_first():
+    built = []
+    registry = make_registry(built, max_idle_evictable=0)
+    registry.get(AppModes.REGISTER)
+    registry.get(AppModes.LOGIN)
+    assert not registry.is_built(AppModes.REGISTER)
+
+    registry.get(AppModes.PROFILE)
+    registry.get(AppModes.MENU)
+    registry.get(AppModes.PROFILE)
+    assert registry.is_built(AppModes.LOGIN)
+    assert registry.is_built(AppModes.MENU)
+    assert built == ["register", "login", "profile", "menu", "profile"]
+
+
+def test_idle_limit_keeps_recent_evictable_modes():
+    built = []
+    registry = make_registry(built, max_idle_evictable=1)
+    registry.get(AppModes.REGISTER)
+    registry.get(AppModes.PROFILE)
+    registry.get(AppModes.MENU)
+    assert not registry.is_built(AppModes.REGISTER)
+    assert registry.peek(AppModes.PROFILE) is not None
+
+
+@pytest.mark.parametrize("max_idle_evictable", [-1, 1.5, None])
+def test_invalid_max_idle_evictable(max_idle_evictable):
+    with pytest.raises(ValueError):
+        ModeRegistry(max_idle_evictable=max_idle_evictable)
@@ -0,0 +1,81 @@
+import pytest
+
+from managers.model_router import ModelRouter, RouteDecision
+
+
+HISTORY = [
+    ("System", "Chat session started..."),
+    ("You", "I have been feeling anxious about work lately."),
+    ("AI", "That sounds hard. What is worrying you most?"),
+    ("You", "Mostly the deadlines."),
+    ("AI", "Deadlines can be a lot. How do you usually cope?"),
+]
+
+
+class LatestOnly:
+    # A history that fails the test when read further back than `limit`.
+    def __init__(self, history, limit):
+        self.history = history
+        self.limit = limit
+
+    def __reversed__(self):
+        for count, item in enumerate(reversed(self.history)):
+            assert count < self.limit, "read too far back"
+            yield item
+
+
+@pytest.mark.parametrize(
+    "message, tier",
+    [
+        ("thanks, bye", ModelRouter.LIGHT),
+        ("ok", ModelRouter.STANDARD),
+        ("I want to die.", ModelRouter.STANDARD),
+        ("Thanks, but I keep thinking about ending it all...", ModelRouter.STANDARD),
+        ("I keep thinking about how my manager reacted during the review.", ModelRouter.STANDARD),
+        ("x" * 600, ModelRouter.DEEP),
+    ],
+)
+def test_chat_tiers(message, tier):
+    router = ModelRouter()
+    assert router.get_tier([*HISTORY, ("You", message)], ModelRouter.CHAT) == tier
+
+
+def test_opening_turns_are_not_light():
+    router = ModelRouter()
+    assert router.get_phase([("You", "hi")]) == "opening"
+    opening = [("System", "Chat session started..."), ("You", "Thanks")]
+    assert router.get_phase(opening) == "opening"
+    assert router.get_tier(opening, ModelRouter.CHAT) == ModelRouter.STANDARD
+
+
+def test_phase_only_reads_the_latest_turns():
+    history = [("You", "x")] * 1000 + [("AI", "ok"), ("You", "bye")]
+    assert ModelRouter().get_phase(LatestOnly(history, limit=10)) == "closing"
+
+
+def test_closing_phase():
+    assert ModelRouter().get_phase([*HISTORY, ("You", "Thank you, see you next week")]) == "closing"
+    assert ModelRouter().get_phase([*HISTORY, ("You", "Thanks for nothing")]) == "ongoing"
+
+
+def test_custom_presets_override_defaults():
+    light = RouteDecision("gpt-4.1-nano", None, 200)
+    router = ModelRouter(presets={ModelRouter.CHAT: {ModelRouter.LIGHT: light}})
+    assert router.route([*HISTORY, ("You", "bye")]) == light
+    assert router.route([*HISTORY, ("You", "x" * 600)]).reasoning_effort == "high"
+
+
+def test_summary_mode_uses_summary_presets():
+    router = ModelRouter()
+    assert router.route(HISTORY, ModelRouter.SUMMARY) == ModelRouter.DEFAULT_PRESETS[
+        ModelRouter.SUMMARY
+    ][ModelRouter.STANDARD]
+
+
+def test_route_decision_payload():
+    assert RouteDecision("o4-mini").to_payload() == {"model": "o4-mini"}
+    assert RouteDecision("o4-mini", "low", 100).to_payload() == {
+        "model": "o4-mini",
+        "reasoning": {"effort": "low"},
+        "max_output_tokens": 100,
+    }
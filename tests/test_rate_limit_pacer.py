@@ -0,0 +1,157 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+from openai import AsyncOpenAI
+
+from managers.ai_manager import AIManager
+from managers.exceptions import AIUnavailableError
+from managers.retry_policy import CircuitBreaker
+from managers.rate_limit_pacer import RateLimitPacer, parse_rate_limit_headers, parse_reset_duration
+from utils.fake_responses_server import FakeResponsesServer, format_reset_duration
+
+
+class FakeClock:
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_headers(limit, remaining, reset, kind="requests"):
+    return {
+        f"x-ratelimit-limit-{kind}": str(limit),
+        f"x-ratelimit-remaining-{kind}": str(remaining),
+        f"x-ratelimit-reset-{kind}": reset,
+    }
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("1s", 1.0),
+        ("6m0s", 360.0),
+        ("20ms", 0.02),
+        ("1h2m3.5s", 3723.5),
+        ("2.5", 2.5),
+        (None, None),
+        ("soon", None),
+    ],
+)
+def test_parse_reset_duration(value, expected):
+    result = parse_reset_duration(value)
+    assert result == (pytest.approx(expected) if expected is not None else None)
+
+
+@pytest.mark.parametrize("seconds", [0.02, 0.5, 1.0, 17.25, 360.0])
+def test_fake_server_reset_format_round_trips(seconds):
+    assert parse_reset_duration(format_reset_duration(seconds)) == pytest.approx(seconds, rel=0.01)
+
+
+def test_parse_rate_limit_headers():
+    assert parse_rate_limit_headers(make_headers(60, 10, "50s"), "requests") == (60, 10, 50)
+    assert parse_rate_limit_headers(make_headers(60, 10, "50s"), "tokens") is None
+    assert parse_rate_limit_headers({"x-ratelimit-limit-requests": "x"}, "requests") is None
+
+
+def test_pacer_waits_for_refill():
+    clock = FakeClock()
+    pacer = RateLimitPacer(headroom=0, clock=clock)
+    assert pacer.get_wait(100) == 0
+
+    pacer.update(make_headers(10, 0, "6s"))
+    assert pacer.get_wait(100) == pytest.approx(0.6)
+    clock.now += 0.6
+    assert pacer.get_wait(100) == pytest.approx(0)
+
+
+def test_pacer_reservations_space_out_concurrent_requests():
+    clock = FakeClock()
+    pacer = RateLimitPacer(headroom=0, clock=clock)
+    pacer.update({**make_headers(60, 1, "59s"), **make_headers(1000, 1000, "0s", "tokens")})
+
+    async def run():
+        await pacer.acquire(10)
+        assert pacer.get_wait(10) == pytest.approx(1.0)
+        assert pacer.pending_requests == 1
+        pacer.release(10, make_headers(60, 0, "60s"))
+        return pacer.get_wait(10)
+
+    assert asyncio.run(run()) == pytest.approx(1.0)
+    assert pacer.pending_requests == 0
+
+
+def test_cancelled_pacing_releases_pending_counts():
+    clock = FakeClock()
+    pacer = RateLimitPacer(headroom=0, clock=clock)
+    pacer.update(make_headers(60, 0, "60s"))
+
+    async def run():
+        task = asyncio.create_task(pacer.acquire(10))
+        await asyncio.sleep(0)
+        assert pacer.pending_requests == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert (pacer.pending_requests, pacer.pending_tokens) == (0, 0)
+    pacer.update(make_headers(60, 30, "30s"))
+    assert pacer.buckets["requests"].remaining == 30
+
+
+def test_pacer_holds_back_headroom():
+    pacer = RateLimitPacer(headroom=0.1, clock=FakeClock())
+    pacer.update(make_headers(100, 11, "89s"))
+    assert pacer.get_wait(1) == 0
+    pacer.update(make_headers(100, 10, "90s"))
+    assert pacer.get_wait(1) == pytest.approx(1.0)
+
+
+def test_pacer_refuses_waits_over_limit():
+    pacer = RateLimitPacer(max_wait=5, clock=FakeClock())
+    pacer.update(make_headers(1000, 0, "0s", "tokens"))
+    with pytest.raises(AIUnavailableError):
+        asyncio.run(pacer.acquire(500))
+    assert pacer.pending_tokens == 0
+
+
+def test_refused_pacing_releases_breaker_trial(caplog):
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.now += 30
+    pacer = RateLimitPacer(max_wait=5, clock=clock)
+    pacer.update(make_headers(10, 0, "60s"))
+    manager = AIManager(client=SimpleNamespace(), circuit_breaker=breaker, pacer=pacer)
+    caplog.clear()
+
+    with caplog.at_level(logging.ERROR), pytest.raises(AIUnavailableError):
+        asyncio.run(manager.get_response([("You", "hello")]))
+    assert not caplog.records
+    # The trial never reached the provider, so the next request may probe.
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_request()
+
+
+def test_manager_paces_instead_of_hitting_rate_limit():
+    with FakeResponsesServer(requests_per_minute=5, quota_window=1.0) as server:
+        async def run():
+            manager = AIManager(
+                client=AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0),
+                max_retries=0,
+                pacer=RateLimitPacer(headroom=0.3),
+            )
+            await manager.get_response([("You", "first")])
+            replies = await asyncio.gather(
+                *(manager.get_response([("You", f"hello {i}")]) for i in range(8))
+            )
+            return manager, replies
+
+        manager, replies = asyncio.run(run())
+
+    assert replies == [f"Echo: hello {i}" for i in range(8)]
+    assert server.stats["rate_limited"] == 0
+    assert manager.pacer.paced_count > 0
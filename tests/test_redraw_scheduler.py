@@ -0,0 +1,114 @@
+from types import SimpleNamespace
+
+import pytest
+
+from ui.redraw_scheduler import RedrawScheduler
+
+
+class FakeClock:
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeMainLoop:
+    def __init__(self):
+        self.alarms = []
+        self.idle_callbacks = []
+        self.screen = SimpleNamespace(started=True)
+        self.event_loop = SimpleNamespace(enter_idle=self.idle_callbacks.append)
+
+    def set_alarm_in(self, delay, callback):
+        alarm = [delay, callback]
+        self.alarms.append(alarm)
+        return alarm
+
+    def remove_alarm(self, alarm):
+        self.alarms.remove(alarm)
+
+    def fire_alarm(self):
+        _, callback = self.alarms.pop(0)
+        callback(self, None)
+        self.go_idle()
+
+    def go_idle(self):
+        for callback in self.idle_callbacks:
+            callback()
+
+
+def make_scheduler(**kwargs):
+    clock = FakeClock()
+    scheduler = RedrawScheduler(clock=clock, **kwargs)
+    loop = FakeMainLoop()
+    scheduler.attach(loop)
+    return scheduler, loop, clock
+
+
+def test_requests_within_a_frame_share_one_draw():
+    scheduler, loop, _ = make_scheduler()
+    for _ in range(5):
+        scheduler.request()
+    assert len(loop.alarms) == 1
+
+    loop.fire_alarm()
+    assert scheduler.draws == 1
+    assert scheduler.coalesced == 4
+    assert not scheduler.pending
+
+
+def test_draws_are_spaced_by_the_frame_interval():
+    scheduler, loop, clock = make_scheduler(max_fps=20)
+    scheduler.request()
+    loop.fire_alarm()
+
+    clock.now += 0.01
+    scheduler.request()
+    assert loop.alarms[0][0] == pytest.approx(0.04)
+    loop.fire_alarm()
+    clock.now += 0.2
+    scheduler.request()
+    assert loop.alarms[0][0] == 0
+
+
+def test_idle_draw_after_input_covers_pending_request():
+    scheduler, loop, _ = make_scheduler()
+    scheduler.on_input(["enter"])
+    scheduler.request()
+    scheduler.request()
+    loop.go_idle()
+
+    assert loop.alarms == []
+    assert scheduler.stats()["max_draws_per_keystroke"] == 1
+
+
+def test_draws_are_counted_per_keystroke():
+    scheduler, loop, clock = make_scheduler()
+    scheduler.on_input(["a"])
+    loop.go_idle()
+    scheduler.on_input(["enter"])
+    loop.go_idle()
+    for _ in range(3):
+        clock.now += 1
+        scheduler.request()
+        loop.fire_alarm()
+
+    stats = scheduler.stats()
+    assert stats["keystrokes"] == 2
+    assert stats["draws"] == 5
+    assert stats["mean_draws_per_keystroke"] == 2.5
+    assert stats["max_draws_per_keystroke"] == 4
+
+
+def test_requests_before_the_loop_starts_are_ignored():
+    scheduler = RedrawScheduler()
+    scheduler.request()
+    assert scheduler.requests == 1
+    assert not scheduler.pending
+
+
+@pytest.mark.parametrize("max_fps", [0, -30, "30"])
+def test_invalid_max_fps(max_fps):
+    with pytest.raises(ValueError):
+        RedrawScheduler(max_fps=max_fps)
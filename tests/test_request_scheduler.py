@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from managers.request_scheduler import RequestScheduler
+
+
+class FakeClock:
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def start(scheduler, priority, order, name):
+    await scheduler.acquire(priority)
+    order.append(name)
+
+
+def test_queued_requests_start_by_priority():
+    async def run():
+        scheduler = RequestScheduler(max_in_flight=1)
+        order = []
+        await scheduler.acquire(RequestScheduler.INTERACTIVE)
+        tasks = [
+            asyncio.create_task(start(scheduler, RequestScheduler.BACKGROUND, order, "background")),
+            asyncio.create_task(start(scheduler, RequestScheduler.SUMMARY, order, "summary")),
+            asyncio.create_task(start(scheduler, RequestScheduler.INTERACTIVE, order, "first")),
+            asyncio.create_task(start(scheduler, RequestScheduler.INTERACTIVE, order, "second")),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["background"]["queued"] == 1
+
+        for priority in (
+            RequestScheduler.INTERACTIVE,
+            RequestScheduler.INTERACTIVE,
+            RequestScheduler.INTERACTIVE,
+            RequestScheduler.SUMMARY,
+        ):
+            scheduler.release(priority)
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == ["first", "second", "summary", "background"]
+
+
+def test_class_limit_does_not_block_other_classes():
+    async def run():
+        scheduler = RequestScheduler(max_in_flight=3, class_limits={RequestScheduler.BACKGROUND: 1})
+        order = []
+        await scheduler.acquire(RequestScheduler.BACKGROUND)
+        waiting = asyncio.create_task(start(scheduler, RequestScheduler.BACKGROUND, order, "background"))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(scheduler.acquire(RequestScheduler.INTERACTIVE), 1)
+        assert order == []
+
+        scheduler.release(RequestScheduler.BACKGROUND)
+        await waiting
+        return scheduler.stats()
+
+    stats = asyncio.run(run())
+    assert stats["background"]["in_flight"] == 1
+    assert stats["interactive"]["in_flight"] == 1
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        scheduler = RequestScheduler(max_in_flight=1)
+        order = []
+        await scheduler.acquire()
+        cancelled = asyncio.create_task(start(scheduler, RequestScheduler.INTERACTIVE, order, "cancelled"))
+        waiting = asyncio.create_task(start(scheduler, RequestScheduler.SUMMARY, order, "summary"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        scheduler.release()
+        await waiting
+        return scheduler, order
+
+    scheduler, order = asyncio.run(run())
+    assert order == ["summary"]
+    assert scheduler.in_flight == 1
+    assert scheduler.stats()["interactive"]["queued"] == 0
+
+
+def test_wait_times_are_recorded():
+    clock = FakeClock()
+
+    async def run():
+        scheduler = RequestScheduler(max_in_flight=1, clock=clock)
+        async with scheduler.slot():
+            waiting = asyncio.create_task(scheduler.acquire(RequestScheduler.SUMMARY))
+            await asyncio.sleep(0)
+            clock.now += 2.5
+        await waiting
+        return scheduler.stats()
+
+    stats = asyncio.run(run())
+    assert stats["summary"]["max_wait"] == 2.5
+    assert stats["summary"]["mean_wait"] == 2.5
+    assert stats["interactive"]["mean_wait"] == 0
+
+
+@pytest.mark.parametrize("max_in_flight", [0, -1, 1.5])
+def test_invalid_max_in_flight(max_in_flight):
+    with pytest.raises(ValueError):
+        RequestScheduler(max_in_flight=max_in_flight)
@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import pytest
+
+from managers.response_cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+HISTORY = [
+    {"role": "system", "content": "Chat session started..."},
+    {"role": "user", "content": "hello"},
+]
+
+
+def test_make_key_is_stable():
+    key_1 = ResponseCache.make_key("o4-mini", "be kind", HISTORY)
+    key_2 = ResponseCache.make_key("o4-mini", "be kind", [dict(m) for m in HISTORY])
+    assert key_1 == key_2
+    assert len(key_1) == 64
+
+
+@pytest.mark.parametrize(
+    "model, instructions, history",
+    [
+        ("gpt-4.1", "be kind", HISTORY),
+        ("o4-mini", "be brief", HISTORY),
+        ("o4-mini", "be kind", HISTORY[:1]),
+    ],
+)
+def test_make_key_changes_with_content(model, instructions, history):
+    assert ResponseCache.make_key("o4-mini", "be kind", HISTORY) != ResponseCache.make_key(
+        model, instructions, history
+    )
+
+
+def test_get_put_and_metrics():
+    cache = ResponseCache()
+    assert cache.get("a") is None
+    cache.put("a", "answer")
+    assert cache.get("a") == "answer"
+    metrics = cache.metrics()
+    assert metrics["hits"] == 1
+    assert metrics["misses"] == 1
+    assert metrics["hit_ratio"] == 0.5
+
+
+def test_lru_eviction():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.metrics()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = ResponseCache(ttl_seconds=10, clock=clock)
+    cache.put("a", "1")
+    clock.now += 9
+    assert cache.get("a") == "1"
+    clock.now += 2
+    assert cache.get("a") is None
+    assert cache.metrics()["expirations"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    file_path = tmp_path / "data" / "response_cache.json"
+    clock = FakeClock()
+    ResponseCache(file_path=str(file_path), clock=clock).put("a", "1")
+
+    cache = ResponseCache(file_path=str(file_path), clock=clock)
+    assert cache.get("a") == "1"
+    assert cache.metrics()["disk_hits"] == 1
+
+    clock.now += 2 * cache.ttl_seconds
+    assert ResponseCache(file_path=str(file_path), clock=clock).get("a") is None
+
+
+def test_disk_writes_are_batched_off_the_event_loop(tmp_path):
+    file_path = tmp_path / "response_cache.json"
+    cache = ResponseCache(file_path=str(file_path), save_delay=0.05)
+
+    async def run():
+        for index in range(100):
+            cache.put(f"key {index}", "text")
+        assert not file_path.exists()
+        await asyncio.sleep(0.2)
+
+    asyncio.run(run())
+    assert cache.save_count == 1
+    assert len(json.loads(file_path.read_text())) == 100
+
+
+def test_close_writes_pending_entries(tmp_path):
+    file_path = tmp_path / "response_cache.json"
+    cache = ResponseCache(file_path=str(file_path), save_delay=60)
+
+    async def run():
+        cache.put("a", "1")
+        await cache.close()
+
+    asyncio.run(run())
+    assert not cache.dirty
+    assert ResponseCache(file_path=str(file_path)).get("a") == "1"
+
+
+def test_invalid_max_entries():
+    with pytest.raises(ValueError) as e:
+        ResponseCache(max_entries=0)
+    assert "Invalid max_entries" in str(e.value)
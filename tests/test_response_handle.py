@@ -0,0 +1,23 @@
+from managers.response_handle import PartialReply
+
+
+def test_partial_reply_follows_first_stream_only():
+    updates = []
+    partial = PartialReply(updates.append)
+    primary, hedge = object(), object()
+    partial.append(primary, "Hel")
+    partial.append(hedge, "Other")
+    partial.append(primary, "lo")
+    assert partial.text == "Hello"
+    assert updates == ["Hel", "Hello"]
+
+
+def test_partial_reply_reset_clears_text_for_retry():
+    updates = []
+    partial = PartialReply(updates.append)
+    first_attempt, second_attempt = object(), object()
+    partial.append(first_attempt, "half a rep")
+    partial.reset()
+    partial.append(second_attempt, "Full")
+    assert partial.text == "Full"
+    assert updates == ["half a rep", "", "Full"]
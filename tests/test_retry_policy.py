@@ -0,0 +1,95 @@
+import pytest
+
+from managers.exceptions import AIUnavailableError
+from managers.retry_policy import (
+    CircuitBreaker,
+    RetryBudget,
+    decorrelated_jitter,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize("previous", [0.0, 0.5, 3.0, 100.0])
+def test_decorrelated_jitter_bounds(previous):
+    for _ in range(100):
+        wait = decorrelated_jitter(0.5, 20.0, previous)
+        assert 0.5 <= wait <= 20.0
+        assert wait <= max(0.5, previous) * 3
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        (None, None),
+        ({}, None),
+        ({"retry-after": "7"}, 7.0),
+        ({"retry-after": "1.5"}, 1.5),
+        ({"retry-after-ms": "250", "retry-after": "7"}, 0.25),
+        ({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0.0),
+        ({"retry-after": "soon"}, None),
+    ],
+)
+def test_parse_retry_after(headers, expected):
+    assert parse_retry_after(headers) == expected
+
+
+def test_retry_budget_limits_retries():
+    clock = FakeClock()
+    budget = RetryBudget(retry_ratio=0.5, min_retries_per_second=0, max_balance=2, clock=clock)
+    assert budget.try_spend()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    budget.record_request()
+    budget.record_request()
+    assert budget.try_spend()
+    assert budget.exhausted_count == 1
+
+
+def test_retry_budget_refills_over_time():
+    clock = FakeClock()
+    budget = RetryBudget(min_retries_per_second=0.5, max_balance=1, clock=clock)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    clock.now += 2
+    assert budget.try_spend()
+
+
+def test_circuit_breaker_opens_and_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    breaker.before_request()
+    breaker.record_failure()
+    assert not breaker.is_open
+    breaker.record_failure()
+    assert breaker.is_open
+
+    with pytest.raises(AIUnavailableError) as e:
+        breaker.before_request()
+    assert "AI temporarily unavailable" in str(e.value)
+
+    clock.now += 30
+    breaker.before_request()
+    with pytest.raises(AIUnavailableError):
+        breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_request()
+
+
+def test_circuit_breaker_reopens_on_failed_trial():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now += 10
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.is_open
+    assert breaker.retry_in() == 10
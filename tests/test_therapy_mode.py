@@ -0,0 +1,138 @@
+import asyncio
+
+from openai import AsyncOpenAI
+
+from managers.ai_manager import AIManager
+from modes.therapy_mode import TherapyMode
+
+
+def make_ai_manager(server, **kwargs) -> AIManager:
+    return AIManager(
+        client=AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0), **kwargs
+    )
+
+
+def send(mode: TherapyMode, text: str) -> None:
+    mode.edit_box.set_edit_text(text)
+    assert mode.handle_input("enter") is None
+
+
+async def finish(handle) -> None:
+    try:
+        await handle
+    except asyncio.CancelledError:
+        pass
+    # Done callbacks run on the next pass of the loop.
+    await asyncio.sleep(0)
+
+
+def test_enter_sends_message_and_shows_reply(fake_server, make_therapy_mode):
+    async def run():
+        mode = make_therapy_mode(ai_manager=make_ai_manager(fake_server))
+        send(mode, "hello there")
+        assert mode.messages[-1] == ("You", "hello there")
+        assert mode.edit_box.get_edit_text() == ""
+        assert mode.is_response_pending()
+        await finish(mode.pending_response)
+        return mode
+
+    mode = asyncio.run(run())
+    assert mode.messages[-2:] == [("You", "hello there"), ("AI", "Echo: hello there")]
+    assert mode.pending_response is None
+    assert mode.status_text.text == ""
+
+
+def test_retry_backoff_does_not_block_the_loop(fake_server, make_therapy_mode):
+    fake_server.retry_after = 0.3
+    fake_server.fail_next(429)
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    async def run():
+        mode = make_therapy_mode(ai_manager=make_ai_manager(fake_server, backoff_base=0.01))
+        ticker = asyncio.create_task(tick())
+        send(mode, "hello")
+        # Typing goes on while the reply waits out the backoff.
+        mode.edit_box.insert_text("next")
+        await finish(mode.pending_response)
+        ticker.cancel()
+        return mode
+
+    mode = asyncio.run(run())
+    assert ticks >= 10
+    assert mode.edit_box.get_edit_text() == "next"
+    assert mode.messages[-1] == ("AI", "Echo: hello")
+    assert fake_server.stats["rate_limited"] == 1
+
+
+def test_enter_while_reply_is_pending_does_not_send(fake_server, make_therapy_mode):
+    fake_server.chunk_size = 2
+    fake_server.chunk_delay = 0.02
+
+    async def run():
+        mode = make_therapy_mode(ai_manager=make_ai_manager(fake_server))
+        send(mode, "first")
+        handle = mode.pending_response
+        send(mode, "second")
+        assert mode.pending_response is handle
+        assert mode.status_text.text.startswith("Still waiting")
+        assert mode.edit_box.get_edit_text() == "second"
+        await finish(handle)
+        return mode
+
+    mode = asyncio.run(run())
+    assert [body for sender, body in mode.messages if sender == "You"] == ["first"]
+    assert mode.messages[-1] == ("AI", "Echo: first")
+    assert len(fake_server.requests) == 1
+
+
+def test_esc_cancels_pending_reply(fake_server, make_therapy_mode):
+    fake_server.chunk_size = 2
+    fake_server.chunk_delay = 0.05
+
+    async def run():
+        mode = make_therapy_mode(ai_manager=make_ai_manager(fake_server))
+        send(mode, "a fairly long message to echo back slowly")
+        handle = mode.pending_response
+        while not handle.partial_text:
+            await asyncio.sleep(0.01)
+        assert mode.chat_walker.partial_text
+        assert mode.handle_input("esc") is None
+        await finish(handle)
+        return mode, handle
+
+    mode, handle = asyncio.run(run())
+    assert handle.cancelled()
+    assert mode.pending_response is None
+    assert mode.chat_walker.partial_text is None
+    # The done callback of the cancelled reply must not add a second marker.
+    assert mode.messages[-2:] == [
+        ("You", "a fairly long message to echo back slowly"),
+        ("System", TherapyMode.CANCELLED_REPLY_MARKER),
+    ]
+    # With nothing pending Esc does nothing.
+    assert mode.handle_input("esc") is None
+    assert mode.messages.count(("System", TherapyMode.CANCELLED_REPLY_MARKER)) == 1
+
+
+def test_superseded_reply_is_ignored(fake_server, make_therapy_mode):
+    async def run():
+        mode = make_therapy_mode(ai_manager=make_ai_manager(fake_server))
+        send(mode, "first")
+        old_handle = mode.pending_response
+        await finish(old_handle)
+        send(mode, "second")
+        messages = list(mode.messages)
+        mode.on_ai_response_done(old_handle)
+        assert mode.messages == messages
+        assert mode.is_response_pending()
+        await finish(mode.pending_response)
+        return mode
+
+    mode = asyncio.run(run())
+    assert [body for sender, body in mode.messages if sender == "AI"] == ["Echo: first", "Echo: second"]
@@ -2,6 +2,7 @@ import bcrypt
 import pytest
 import uuid
 
+from models.conversation_state import ConversationState
 from models.user import User
 
 
@@ -196,3 +197,33 @@ def test_is_valid_password_false(password, passcode, wrong):
     assert User.is_valid_password(wrong, passcode, hashed_password) is False
     assert User.is_valid_password(password, wrong, hashed_password) is False
     assert User.is_valid_password(wrong, wrong, hashed_password) is False
+
+
+def test_conversation_state_round_trip():
+    user = User(
+        name="abcd",
+        email="email@example.com",
+        hashed_password=User.hash_password("password", "passcode"),
+        chat_history=[("You", "hello"), ("AI", "hi")],
+        conversation_state=ConversationState(summary="greeted", summarized_count=2),
+    )
+    loaded = User.from_dict(user.to_dict())
+    assert loaded.conversation_state == ConversationState("greeted", 2)
+
+
+@pytest.mark.parametrize(
+    "conversation_state",
+    [
+        None,
+        {"summary": 1, "summarized_count": 0},
+        {"summary": "too far", "summarized_count": 5},
+    ],
+)
+def test_conversation_state_reset_when_invalid(conversation_state):
+    data = User(
+        name="abcd",
+        email="email@example.com",
+        hashed_password=User.hash_password("password", "passcode"),
+    ).to_dict()
+    data["conversation_state"] = conversation_state
+    assert User.from_dict(data).conversation_state == ConversationState()
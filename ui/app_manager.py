@@ -1,8 +1,12 @@
+import asyncio
 import logging
 import urwid as u
+from urwid.display import escape
 
 from managers.users_manager import UsersManager
 from managers.ai_manager import AIManager
+from managers.model_router import ModelRouter
+from managers.response_cache import create_response_cache
 
 from models.user import User
 
@@ -13,20 +17,19 @@ from modes.therapy_mode import TherapyMode
 from modes.profile_mode import ProfileMode
 
 from ui.app_modes import AppModes
+from ui.bracketed_paste import BEGIN_PASTE, Paste, PasteCollector
+from ui.mode_registry import ModeRegistry
+from ui.redraw_scheduler import RedrawScheduler
 
 
 class AppManager:
     def __init__(self):
         self.users_manager = UsersManager()
-        self.ai_manager = AIManager()
+        # Built on first use, see the ai_manager property.
+        self._ai_manager: AIManager | None = None
+        self._ai_warm_up_task: asyncio.Task | None = None
         self._active_user: User | None = None
 
-        self.login_mode = LoginMode(self, self.users_manager)
-        self.register_mode = RegisterMode(self, self.users_manager)
-        self.menu_mode = MenuMode(self)
-        self.therapy_mode = TherapyMode(self, self.users_manager, self.ai_manager)
-        self.profile_mode = ProfileMode(self, self.users_manager)
-
         self.palette = [
             ("inactive", "dark gray", "default"),
             ("focus", "white", "dark red", "standout"),
@@ -41,17 +44,33 @@ class AppManager:
             ("label", "light gray", "default"),
             ("button", "white", "dark blue", "standout"),
         ]
-        self.modes = {
-            AppModes.LOGIN: self.login_mode,
-            AppModes.REGISTER: self.register_mode,
-            AppModes.MENU: self.menu_mode,
-            AppModes.THERAPY: self.therapy_mode,
-            AppModes.PROFILE: self.profile_mode,
-        }
+        # Modes are built on their first show(); registration only stores how.
+        self.modes = ModeRegistry()
+        self.modes.register(AppModes.LOGIN, lambda: LoginMode(self, self.users_manager))
+        self.modes.register(
+            AppModes.REGISTER, lambda: RegisterMode(self, self.users_manager), evictable=True
+        )
+        self.modes.register(AppModes.MENU, lambda: MenuMode(self))
+        self.modes.register(AppModes.THERAPY, lambda: TherapyMode(self, self.users_manager))
+        self.modes.register(
+            AppModes.PROFILE, lambda: ProfileMode(self, self.users_manager), evictable=True
+        )
         self.loop = None
+        # Modes ask for redraws here instead of drawing the screen themselves.
+        self.redraw = RedrawScheduler()
+        self.paste_collector = PasteCollector()
+        self.asyncio_loop = None
         self.active_frame = None
         self.active_mode = None
 
+    @property
+    def ai_manager(self) -> AIManager:
+        if self._ai_manager is None:
+            self._ai_manager = AIManager(
+                cache=create_response_cache(), router=ModelRouter()
+            )
+        return self._ai_manager
+
     @property
     def active_user(self) -> User | None:
         return self._active_user
@@ -59,6 +78,24 @@ class AppManager:
     @active_user.setter
     def active_user(self, user: User | None) -> None:
         self._active_user = user
+        if user:
+            self.warm_up_ai_manager()
+
+    def warm_up_ai_manager(self) -> None:
+        # Once someone has logged in, import the SDK and build the client in a
+        # worker thread so the UI stays responsive, then open the connection.
+        if self.asyncio_loop is None or self._ai_warm_up_task is not None:
+            return
+        prepared = self.asyncio_loop.run_in_executor(None, self.ai_manager.prepare)
+        self._ai_warm_up_task = self.run_async(self._warm_up_ai_manager(prepared))
+
+    async def _warm_up_ai_manager(self, prepared: asyncio.Future) -> None:
+        try:
+            await prepared
+        except Exception:
+            logging.exception("Failed to prepare the AI client.")
+            return
+        await self.ai_manager.warm_up()
 
     def logout(self, button=None) -> None:
         logging.info(
@@ -75,7 +112,10 @@ class AppManager:
         self.active_frame = new_frame_widget
         if self.loop:
             self.loop.widget = self.active_frame
-            self.loop.draw_screen()
+            self.request_redraw()
+
+    def request_redraw(self) -> None:
+        self.redraw.request()
 
     def show(self, mode_enum: AppModes) -> None:
         mode = self.modes.get(mode_enum)
@@ -107,14 +147,85 @@ class AppManager:
 
         return processed_key
 
+    def _filter_input(self, keys: list, raw: list) -> list:
+        if not self.paste_collector.collecting and BEGIN_PASTE not in keys:
+            self.redraw.on_input(keys)
+            return keys
+
+        events = self.paste_collector.feed(keys)
+        self.redraw.on_input(events)
+        pending = []
+        for event in events:
+            if isinstance(event, Paste):
+                # Keys typed before the paste go first, to keep their order.
+                if pending:
+                    self.loop.process_input(pending)
+                    pending = []
+                self._handle_paste(event)
+            else:
+                pending.append(event)
+        return pending
+
+    def _handle_paste(self, paste: Paste) -> None:
+        logging.debug(f"Pasted {len(paste.text)} characters.")
+        if self.active_mode and hasattr(self.active_mode, "handle_paste"):
+            self.active_mode.handle_paste(paste.text)
+        elif paste.keys:
+            self.loop.process_input(paste.keys)
+
+    def _set_bracketed_paste(self, enabled: bool) -> None:
+        # urwid parses the paste markers but leaves the terminal mode alone.
+        screen = self.loop.screen if self.loop else None
+        if not hasattr(screen, "write"):
+            return
+        screen.write(
+            escape.ENABLE_BRACKETED_PASTE_MODE if enabled else escape.DISABLE_BRACKETED_PASTE_MODE
+        )
+        screen.flush()
+
+    def run_async(self, coro) -> asyncio.Task:
+        if self.asyncio_loop is None:
+            raise RuntimeError("Event loop is not running, cannot schedule task.")
+        return self.asyncio_loop.create_task(coro)
+
     def start(self) -> None:
         self.show(AppModes.LOGIN)
         if not self.active_frame:
             logging.critical("No active frame set after initial show(). Cannot start.")
             return
+        self.asyncio_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.asyncio_loop)
         self.loop = u.MainLoop(
-            self.active_frame, self.palette, unhandled_input=self.handle_input
+            self.active_frame,
+            self.palette,
+            unhandled_input=self.handle_input,
+            input_filter=self._filter_input,
+            event_loop=u.AsyncioEventLoop(loop=self.asyncio_loop),
         )
         self.loop.screen.set_terminal_properties(colors=256)
-        self.loop.run()
+        self.redraw.attach(self.loop)
+        # Runs once the screen has started.
+        self.loop.set_alarm_in(0, lambda *_: self._set_bracketed_paste(True))
+        try:
+            self.loop.run()
+        finally:
+            self._set_bracketed_paste(False)
+            self.redraw.log_stats()
+            self._shutdown_asyncio_loop()
+
+    def _shutdown_asyncio_loop(self) -> None:
+        pending = asyncio.all_tasks(self.asyncio_loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.asyncio_loop.run_until_complete(
+                asyncio.gather(*pending, return_exceptions=True)
+            )
+        if self._ai_manager is not None:
+            try:
+                self.asyncio_loop.run_until_complete(self._ai_manager.close())
+            except Exception:
+                logging.exception("Failed to close AI client.")
+        self.asyncio_loop.close()
+        self.asyncio_loop = None
 
@@ -40,9 +40,13 @@ class MenuListBox(u.ListBox):
         super().__init__(body)
         self.update_callback = update_callback
 
+    def get_focus_position(self):
+        # None when the list is empty
+        return self.focus_position if len(self.body) else None
+
     def keypress(self, size, key):
         # Store focus position before keypress
-        old_focus_pos = self.focus_position
+        old_focus_pos = self.get_focus_position()
         # Let the parent ListBox handle the keypress first (moves focus)
         result = super().keypress(size, key)
 
@@ -53,21 +57,21 @@ class MenuListBox(u.ListBox):
             and self.update_callback
         ):
             # Check if focus actually changed to avoid redundant calls
-            if self.focus_position != old_focus_pos:
+            if self.get_focus_position() != old_focus_pos:
                 self.update_callback()  # Call directly
 
         return result
 
     def mouse_event(self, size, event, button, col, row, focus):
         # Store focus position before mouse event
-        old_focus_pos = self.focus_position
+        old_focus_pos = self.get_focus_position()
         # Let the parent ListBox handle the mouse event first
         result = super().mouse_event(size, event, button, col, row, focus)
 
         # If it was a click that potentially changed focus, call the callback.
         if event == "mouse press" and button == 1 and self.update_callback:
             # Check if focus actually changed
-            if self.focus_position != old_focus_pos:
+            if self.get_focus_position() != old_focus_pos:
                 self.update_callback()  # Call directly
 
         return result
@@ -0,0 +1,58 @@
+from dataclasses import dataclass, field
+
+BEGIN_PASTE = "begin paste"
+END_PASTE = "end paste"
+# Keys urwid produces for characters that belong to the pasted text.
+TEXT_KEYS = {"enter": "\n", "tab": "\t"}
+
+
+@dataclass
+class Paste:
+    text: str
+    # The original keypresses, for modes that do not take pastes as a block.
+    keys: list = field(default_factory=list)
+
+
+def keys_to_text(keys: list) -> str:
+    return "".join(
+        TEXT_KEYS.get(key, key if isinstance(key, str) and len(key) == 1 else "")
+        for key in keys
+    )
+
+
+# With bracketed paste mode on, the terminal wraps pasted text in
+# "begin paste" / "end paste" keys. The collector takes the keys in between
+# out of the input, so a paste becomes one Paste event instead of hundreds of
+# keypresses, and its newlines no longer act as Enter. A paste may be split
+# across several input batches.
+class PasteCollector:
+    def __init__(self) -> None:
+        self._keys: list | None = None
+        self.paste_count = 0
+        self.pasted_chars = 0
+
+    @property
+    def collecting(self) -> bool:
+        return self._keys is not None
+
+    def feed(self, keys: list) -> list:
+        events = []
+        for key in keys:
+            if key == BEGIN_PASTE:
+                if self._keys is None:
+                    self._keys = []
+            elif key == END_PASTE:
+                if self._keys is not None:
+                    events.append(self._finish())
+            elif self._keys is not None:
+                self._keys.append(key)
+            else:
+                events.append(key)
+        return events
+
+    def _finish(self) -> Paste:
+        keys, self._keys = self._keys, None
+        paste = Paste(keys_to_text(keys), keys)
+        self.paste_count += 1
+        self.pasted_chars += len(paste.text)
+        return paste
@@ -0,0 +1,227 @@
+import logging
+from collections import OrderedDict
+from collections.abc import Callable
+
+import urwid as u
+
+PARTIAL_SENDER = "AI"
+
+
+# Rendered message canvases keyed by (message id, style, width). Wrapping
+# long answers is the expensive part of drawing the chat; with this cache a
+# rebuilt widget, a scroll back or a resize to an earlier width reuses the
+# layout instead of wrapping the markup again.
+class RenderCache:
+    def __init__(self, max_entries: int = 1000) -> None:
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError(
+                f"Invalid max_entries '{max_entries}' ({type(max_entries).__name__}) - must be a positive integer."
+            )
+        self.max_entries = max_entries
+        self.entries: OrderedDict[tuple, u.Canvas] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: tuple) -> u.Canvas | None:
+        canvas = self.entries.get(key)
+        if canvas is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return canvas
+
+    def put(self, key: tuple, canvas: u.Canvas) -> None:
+        self.entries[key] = canvas
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, message_ids) -> None:
+        message_ids = set(message_ids)
+        for key in [key for key in self.entries if key[0] in message_ids]:
+            del self.entries[key]
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+class ChatMessage(u.Text):
+    def __init__(self, markup, cache: RenderCache, message_id: int, style: str) -> None:
+        super().__init__(markup)
+        self.cache = cache
+        self.cache_key = (message_id, style)
+
+    def rows(self, size, focus: bool = False) -> int:
+        canvas = self.cache.get((*self.cache_key, size[0]))
+        return canvas.rows() if canvas is not None else super().rows(size, focus)
+
+    def render(self, size, focus: bool = False) -> u.Canvas:
+        key = (*self.cache_key, size[0])
+        canvas = self.cache.get(key)
+        if canvas is None:
+            canvas = super().render(size, focus)
+            self.cache.put(key, canvas)
+        return canvas
+
+
+# ListWalker that reads straight from the chat message list. ListBox asks
+# for widgets only around the focus while rendering, so widgets are built
+# for the visible rows (plus a margin kept warm for scrolling) and held in a
+# small LRU instead of one widget per message for the whole history.
+# Positions are indexes into the message list. Only the last page_size
+# messages are loaded at first; scrolling above the oldest loaded message
+# pages in older ones, which leaves the positions on screen unchanged.
+class ChatListWalker(u.ListWalker):
+    def __init__(
+        self,
+        messages: list[tuple[str, str]],
+        markup_factory: Callable[[str, str, bool], object],
+        cache_size: int = 200,
+        margin: int = 10,
+        render_cache: RenderCache | None = None,
+        page_size: int = 100,
+    ) -> None:
+        if not isinstance(cache_size, int) or cache_size < 1:
+            raise ValueError(
+                f"Invalid cache_size '{cache_size}' ({type(cache_size).__name__}) - must be a positive integer."
+            )
+        if not isinstance(margin, int) or margin < 0:
+            raise ValueError(
+                f"Invalid margin '{margin}' ({type(margin).__name__}) - must be a non-negative integer."
+            )
+        if not isinstance(page_size, int) or page_size < 1:
+            raise ValueError(
+                f"Invalid page_size '{page_size}' ({type(page_size).__name__}) - must be a positive integer."
+            )
+        self.messages = messages
+        self.page_size = page_size
+        self.first_loaded = max(0, len(messages) - page_size)
+        self.pages_loaded = 1
+        self._synced_length = len(messages)
+        self._synced_last = messages[-1] if messages else None
+        self.markup_factory = markup_factory
+        self.render_cache = render_cache or RenderCache()
+        self.cache_size = cache_size
+        self.margin = margin
+        self.partial_text: str | None = None
+        self.focus = max(self.first_loaded, len(self) - 1)
+        self._widgets: OrderedDict[int, u.Widget] = OrderedDict()
+        self.build_count = 0
+
+    def __len__(self) -> int:
+        return len(self.messages) + (self.partial_text is not None)
+
+    def __getitem__(self, position: int) -> u.Widget:
+        if not isinstance(position, int) or not self.first_loaded <= position < len(self):
+            raise IndexError(position)
+        widget = self._widgets.get(position)
+        if widget is None:
+            widget = self._build(position)
+            self._widgets[position] = widget
+            if len(self._widgets) > self.cache_size:
+                self._widgets.popitem(last=False)
+        else:
+            self._widgets.move_to_end(position)
+        return widget
+
+    def _build(self, position: int) -> u.Widget:
+        self.build_count += 1
+        if position == len(self.messages):
+            # Changes with every streamed delta, so it bypasses the render cache.
+            return u.Text(self.markup_factory(PARTIAL_SENDER, f"{self.partial_text}...", True))
+        sender, body = self.messages[position]
+        is_last = position == len(self.messages) - 1
+        try:
+            markup = self.markup_factory(sender, str(body) if body is not None else "", is_last)
+            return ChatMessage(markup, self.render_cache, position, "last" if is_last else "chat")
+        except Exception as e:
+            logging.exception(f"ChatListWalker: failed to build widget for message {position}: {e}")
+            return u.Text("")
+
+    def next_position(self, position: int) -> int:
+        if position + 1 >= len(self):
+            raise IndexError(position)
+        return position + 1
+
+    def prev_position(self, position: int) -> int:
+        if position <= self.first_loaded and not self.load_older():
+            raise IndexError(position)
+        return position - 1
+
+    def load_older(self) -> bool:
+        if self.first_loaded == 0:
+            return False
+        self.first_loaded = max(0, self.first_loaded - self.page_size)
+        self.pages_loaded += 1
+        logging.debug(f"ChatListWalker: loaded older messages from {self.first_loaded}.")
+        return True
+
+    def positions(self, reverse: bool = False):
+        if reverse:
+            return range(len(self) - 1, self.first_loaded - 1, -1)
+        return range(self.first_loaded, len(self))
+
+    def set_focus(self, position: int) -> None:
+        if not self.first_loaded <= position < len(self):
+            raise IndexError(position)
+        self.focus = position
+        self._prefetch(position)
+        self._modified()
+
+    def _prefetch(self, position: int) -> None:
+        # Build the margin around the focus ahead of a scroll; the LRU keeps it.
+        for nearby in range(
+            max(self.first_loaded, position - self.margin), min(len(self), position + self.margin + 1)
+        ):
+            if nearby not in self._widgets:
+                self[nearby]
+
+    @property
+    def cached_count(self) -> int:
+        return len(self._widgets)
+
+    def set_messages(self, messages: list[tuple[str, str]]) -> None:
+        # The chat history only grows, so when the new list continues the one
+        # rendered before (the same list or a copy of it) the canvases of the
+        # earlier messages stay valid.
+        length = self._synced_length
+        if length and len(messages) >= length and messages[length - 1] is self._synced_last:
+            self.render_cache.invalidate(
+                message_id for message_id, *_ in list(self.render_cache.entries) if message_id >= length - 1
+            )
+        else:
+            self.render_cache.clear()
+        self.messages = messages
+        self.partial_text = None
+        self._widgets.clear()
+        self.first_loaded = max(0, len(messages) - self.page_size)
+        self.pages_loaded = 1
+        self._mark_synced()
+        self.focus = max(self.first_loaded, len(self) - 1)
+        self._modified()
+
+    def _mark_synced(self) -> None:
+        self._synced_length = len(self.messages)
+        self._synced_last = self.messages[-1] if self.messages else None
+
+    def refresh(self, start: int = 0) -> None:
+        # Call after messages from `start` on were added or changed. The
+        # previous last message loses its "last" style, so it is rebuilt too.
+        start = max(0, min(start, len(self.messages) - 1))
+        for position in [position for position in self._widgets if position >= start]:
+            del self._widgets[position]
+        self.render_cache.invalidate(range(start, len(self.messages)))
+        self._mark_synced()
+        self.focus = min(self.focus, max(self.first_loaded, len(self) - 1))
+        self._modified()
+
+    def set_partial(self, text: str | None) -> None:
+        # The streamed reply is shown as an extra row after the last message.
+        self.partial_text = text
+        self._widgets.pop(len(self.messages), None)
+        self.focus = min(self.focus, max(self.first_loaded, len(self) - 1))
+        self._modified()
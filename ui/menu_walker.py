@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+
+import urwid as u
+
+
+# Case-insensitive substring filter over item labels. Typing one more
+# character can only narrow the matches, so each query is checked against the
+# previous query's matches instead of every item; the results are kept as a
+# stack, which makes backspace a pop.
+class TypeAheadFilter:
+    def __init__(self, labels: Sequence[str]) -> None:
+        self.keys = [label.casefold() for label in labels]
+        self._stack: list[tuple[str, Sequence[int]]] = [("", range(len(self.keys)))]
+
+    @property
+    def query(self) -> str:
+        return self._stack[-1][0]
+
+    @property
+    def matches(self) -> Sequence[int]:
+        return self._stack[-1][1]
+
+    def set_query(self, query: str) -> Sequence[int]:
+        query = query.casefold()
+        while len(self._stack) > 1 and not query.startswith(self._stack[-1][0]):
+            self._stack.pop()
+        base_query, base = self._stack[-1]
+        if query != base_query:
+            keys = self.keys
+            self._stack.append((query, [index for index in base if query in keys[index]]))
+        return self.matches
+
+
+# ListWalker over menu items that builds a row only when ListBox asks for it
+# and keeps recently used rows in a small LRU. Positions index the visible
+# (filtered) items; rows are cached by item index so they survive filtering.
+class MenuListWalker(u.ListWalker):
+    def __init__(
+        self,
+        items: Sequence,
+        row_factory: Callable[[int], u.Widget],
+        cache_size: int = 200,
+    ) -> None:
+        if not isinstance(cache_size, int) or cache_size < 1:
+            raise ValueError(
+                f"Invalid cache_size '{cache_size}' ({type(cache_size).__name__}) - must be a positive integer."
+            )
+        self.items = items
+        self.row_factory = row_factory
+        self.cache_size = cache_size
+        self.visible: Sequence[int] = range(len(items))
+        self.focus = 0
+        self._rows: OrderedDict[int, u.Widget] = OrderedDict()
+        self.build_count = 0
+
+    def __len__(self) -> int:
+        return len(self.visible)
+
+    def item_index(self, position: int) -> int:
+        return self.visible[position]
+
+    def __getitem__(self, position: int) -> u.Widget:
+        if not isinstance(position, int) or not 0 <= position < len(self.visible):
+            raise IndexError(position)
+        index = self.visible[position]
+        row = self._rows.get(index)
+        if row is None:
+            row = self.row_factory(index)
+            self.build_count += 1
+            self._rows[index] = row
+            if len(self._rows) > self.cache_size:
+                self._rows.popitem(last=False)
+        else:
+            self._rows.move_to_end(index)
+        return row
+
+    def next_position(self, position: int) -> int:
+        if position + 1 >= len(self.visible):
+            raise IndexError(position)
+        return position + 1
+
+    def prev_position(self, position: int) -> int:
+        if position <= 0:
+            raise IndexError(position)
+        return position - 1
+
+    def positions(self, reverse: bool = False):
+        return range(len(self.visible) - 1, -1, -1) if reverse else range(len(self.visible))
+
+    def set_focus(self, position: int) -> None:
+        if not 0 <= position < len(self.visible):
+            raise IndexError(position)
+        self.focus = position
+        self._modified()
+
+    def set_visible(self, visible: Sequence[int]) -> None:
+        self.visible = visible
+        self.focus = 0
+        self._modified()
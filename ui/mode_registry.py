@@ -0,0 +1,80 @@
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from ui.app_modes import AppModes
+
+
+@dataclass
+class ModeSpec:
+    factory: Callable[[], object]
+    # Rarely used modes may be dropped while inactive and rebuilt on demand.
+    evictable: bool = False
+
+
+# Builds each mode the first time it is shown and caches it afterwards, so
+# startup cost does not grow with the number of modes.
+class ModeRegistry:
+    def __init__(self, max_idle_evictable: int = 1) -> None:
+        if not isinstance(max_idle_evictable, int) or max_idle_evictable < 0:
+            raise ValueError(
+                f"Invalid max_idle_evictable '{max_idle_evictable}' ({type(max_idle_evictable).__name__}) - must be a non-negative integer."
+            )
+        self.max_idle_evictable = max_idle_evictable
+        self.specs: dict[AppModes, ModeSpec] = {}
+        # Least recently shown first.
+        self.instances: OrderedDict[AppModes, object] = OrderedDict()
+        self.build_counts: dict[AppModes, int] = {}
+        self.build_time = 0.0
+
+    def register(self, mode_enum: AppModes, factory: Callable[[], object], evictable: bool = False) -> None:
+        self.specs[mode_enum] = ModeSpec(factory, evictable)
+        self.instances.pop(mode_enum, None)
+
+    def __contains__(self, mode_enum: AppModes) -> bool:
+        return mode_enum in self.specs
+
+    def is_built(self, mode_enum: AppModes) -> bool:
+        return mode_enum in self.instances
+
+    def peek(self, mode_enum: AppModes) -> object | None:
+        # The cached instance, without building it.
+        return self.instances.get(mode_enum)
+
+    def get(self, mode_enum: AppModes) -> object | None:
+        spec = self.specs.get(mode_enum)
+        if spec is None:
+            return None
+        mode = self.instances.get(mode_enum)
+        if mode is None:
+            mode = self._build(mode_enum, spec)
+        self.instances.move_to_end(mode_enum)
+        self._evict_idle(keep=mode_enum)
+        return mode
+
+    def evict(self, mode_enum: AppModes) -> bool:
+        if self.instances.pop(mode_enum, None) is None:
+            return False
+        logging.info(f"Evicted idle mode {mode_enum.value}.")
+        return True
+
+    def _build(self, mode_enum: AppModes, spec: ModeSpec) -> object:
+        start = time.perf_counter()
+        mode = spec.factory()
+        elapsed = time.perf_counter() - start
+        self.instances[mode_enum] = mode
+        self.build_counts[mode_enum] = self.build_counts.get(mode_enum, 0) + 1
+        self.build_time += elapsed
+        logging.info("Built mode %s in %.1f ms.", mode_enum.value, elapsed * 1000)
+        return mode
+
+    def _evict_idle(self, keep: AppModes) -> None:
+        idle = [
+            mode_enum
+            for mode_enum in self.instances
+            if mode_enum != keep and self.specs[mode_enum].evictable
+        ]
+        for mode_enum in idle[: max(0, len(idle) - self.max_idle_evictable)]:
+            self.evict(mode_enum)
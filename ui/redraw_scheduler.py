@@ -0,0 +1,96 @@
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+
+
+# Coalesces redraw requests into at most one screen draw per frame. urwid's
+# MainLoop already redraws the whole screen whenever its event loop goes idle
+# after an input or alarm callback, so a request only has to make sure such a
+# pass happens: it sets an empty alarm at the next free frame slot, and an
+# idle pass caused by anything else (a keystroke, say) covers it as well.
+class RedrawScheduler:
+    def __init__(self, max_fps: float = 30.0, clock: Callable[[], float] = time.monotonic) -> None:
+        if not isinstance(max_fps, (int, float)) or max_fps <= 0:
+            raise ValueError(
+                f"Invalid max_fps '{max_fps}' ({type(max_fps).__name__}) - must be a positive number."
+            )
+        self.frame_interval = 1.0 / max_fps
+        self.clock = clock
+        self.loop = None
+        self.last_draw: float | None = None
+        self._alarm = None
+        self.requests = 0
+        self.coalesced = 0
+        self.draws = 0
+        self.keystrokes = 0
+        self._draws_since_input = 0
+        self.draws_per_keystroke: deque[int] = deque(maxlen=1000)
+
+    def attach(self, loop) -> None:
+        self.loop = loop
+        loop.event_loop.enter_idle(self._on_idle)
+
+    @property
+    def pending(self) -> bool:
+        return self._alarm is not None
+
+    def request(self) -> None:
+        self.requests += 1
+        if self.loop is None:
+            return
+        if self._alarm is not None:
+            self.coalesced += 1
+            return
+        delay = 0.0
+        if self.last_draw is not None:
+            delay = max(0.0, self.last_draw + self.frame_interval - self.clock())
+        self._alarm = self.loop.set_alarm_in(delay, self._on_alarm)
+
+    def _on_alarm(self, loop, user_data=None) -> None:
+        # Nothing to do here: the idle pass that follows draws the screen.
+        self._alarm = None
+
+    def _on_idle(self) -> None:
+        if self._alarm is not None:
+            self.loop.remove_alarm(self._alarm)
+            self._alarm = None
+        if not self.loop.screen.started:
+            return
+        self.draws += 1
+        self._draws_since_input += 1
+        self.last_draw = self.clock()
+
+    def on_input(self, keys: list) -> None:
+        # Draws are attributed to the input that preceded them, including
+        # the ones caused by the AI reply it started.
+        if not keys:
+            return
+        if self.keystrokes:
+            self.draws_per_keystroke.append(self._draws_since_input)
+        self.keystrokes += len(keys)
+        self._draws_since_input = 0
+
+    def stats(self) -> dict:
+        samples = list(self.draws_per_keystroke)
+        if self.keystrokes:
+            samples.append(self._draws_since_input)
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "draws": self.draws,
+            "keystrokes": self.keystrokes,
+            "mean_draws_per_keystroke": sum(samples) / len(samples) if samples else 0.0,
+            "max_draws_per_keystroke": max(samples, default=0),
+        }
+
+    def log_stats(self) -> None:
+        stats = self.stats()
+        logging.info(
+            "Screen redraws: %d draws for %d requests (%d coalesced), %.2f per keystroke on average, at most %d.",
+            stats["draws"],
+            stats["requests"],
+            stats["coalesced"],
+            stats["mean_draws_per_keystroke"],
+            stats["max_draws_per_keystroke"],
+        )
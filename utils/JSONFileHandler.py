@@ -23,6 +23,6 @@ class JSONFileHandler:
                 return []
             return json.loads(content)
 
-    def write_json(self, value: list | dict) -> None:
+    def write_json(self, value: list | dict, indent: int | None = 4) -> None:
         with open(self.file_path, mode="w", encoding="utf-8") as file:
-            json.dump(value, file, indent=4)
\ No newline at end of file
+            json.dump(value, file, indent=indent)
\ No newline at end of file
@@ -0,0 +1,440 @@
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def echo_reply(input_items: list[dict]) -> str:
+    for item in reversed(input_items):
+        if item.get("role") == "user":
+            return f"Echo: {item.get('content', '')}"
+    return "Echo: (no user message)"
+
+
+def format_reset_duration(seconds: float) -> str:
+    if seconds < 1:
+        return f"{round(seconds * 1000)}ms"
+    minutes, seconds = divmod(seconds, 60)
+    return f"{int(minutes)}m{seconds:.3g}s" if minutes else f"{seconds:.3g}s"
+
+
+# Per-minute quota refilling continuously, like the provider's RPM/TPM limits.
+class FakeQuota:
+    def __init__(self, limit: int, window: float) -> None:
+        self.limit = limit
+        self.refill_rate = limit / window
+        self.level = float(limit)
+        self.updated_at = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.limit, self.level + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def headers(self, kind: str) -> dict[str, str]:
+        return {
+            f"x-ratelimit-limit-{kind}": str(self.limit),
+            f"x-ratelimit-remaining-{kind}": str(max(0, int(self.level))),
+            f"x-ratelimit-reset-{kind}": format_reset_duration(
+                (self.limit - self.level) / self.refill_rate
+            ),
+        }
+
+
+# Local stand-in for the OpenAI Responses API, speaking just enough of it for
+# AIManager. Point a client at `base_url` (e.g. AsyncOpenAI(base_url=...)).
+class FakeResponsesServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        reply: Callable[[list[dict]], str] = echo_reply,
+        latency: float = 0.0,
+        model_latency: dict[str, float] | None = None,
+        chunk_size: int = 16,
+        chunk_delay: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float | None = None,
+        seed: int | None = None,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        quota_window: float = 60.0,
+        prompt_cache_min_tokens: int = 1024,
+    ) -> None:
+        self.reply = reply
+        self.latency = latency
+        self.model_latency = model_latency or {}
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._scripted_errors: deque[int] = deque()
+        self.quotas = {
+            kind: FakeQuota(limit, quota_window)
+            for kind, limit in (("requests", requests_per_minute), ("tokens", tokens_per_minute))
+            if limit
+        }
+        self.stats = {"requests": 0, "responses": 0, "rate_limited": 0, "errors": 0}
+        self.requests: list[dict] = []
+        self.prompt_cache_min_tokens = prompt_cache_min_tokens
+        self._cached_prefixes: set[bytes] = set()
+        self.conversations: dict[str, list[dict]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeResponsesServer":
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="fake-responses-server", daemon=True
+        )
+        self._thread.start()
+        logging.info(f"Fake Responses server listening on {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeResponsesServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def expire(self, response_id: str | None = None) -> None:
+        with self._lock:
+            if response_id is None:
+                self.conversations.clear()
+            else:
+                self.conversations.pop(response_id, None)
+
+    def fail_next(self, status: int = 429, count: int = 1) -> None:
+        with self._lock:
+            self._scripted_errors.extend([status] * count)
+
+    def _record_request(self, body: dict) -> None:
+        with self._lock:
+            self.requests.append(body)
+            self.stats["requests"] += 1
+
+    def _pick_error(self) -> int | None:
+        with self._lock:
+            if self._scripted_errors:
+                status = self._scripted_errors.popleft()
+            elif self._random.random() < self.rate_limit_rate:
+                status = 429
+            elif self._random.random() < self.error_rate:
+                status = 500
+            else:
+                return None
+            self.stats["rate_limited" if status == 429 else "errors"] += 1
+            return status
+
+    @staticmethod
+    def _estimate_tokens(body: dict) -> int:
+        input_items = body.get("input", [])
+        if isinstance(input_items, str):
+            input_items = [{"content": input_items}]
+        input_tokens = sum(len(str(item.get("content", ""))) // 4 for item in input_items)
+        return input_tokens + (body.get("max_output_tokens") or 0)
+
+    def _take_quota(self, body: dict) -> tuple[bool, dict[str, str]]:
+        # Returns whether the request fits the quota, plus the x-ratelimit headers.
+        if not self.quotas:
+            return True, {}
+        amounts = {"requests": 1, "tokens": self._estimate_tokens(body)}
+        with self._lock:
+            for quota in self.quotas.values():
+                quota.refill()
+            allowed = all(
+                quota.level >= min(amounts[kind], quota.limit)
+                for kind, quota in self.quotas.items()
+            )
+            if allowed:
+                for kind, quota in self.quotas.items():
+                    quota.level -= min(amounts[kind], quota.limit)
+            else:
+                self.stats["rate_limited"] += 1
+            headers = {}
+            for kind, quota in self.quotas.items():
+                headers.update(quota.headers(kind))
+            return allowed, headers
+
+    def _error_response(self, status: int) -> tuple[dict, dict[str, str]]:
+        headers = {}
+        if status == 429:
+            body = self._error("Rate limit reached for requests (fake).")
+            body["error"]["type"] = "requests"
+            body["error"]["code"] = "rate_limit_exceeded"
+            if self.retry_after is not None:
+                headers["retry-after"] = f"{self.retry_after:g}"
+        else:
+            body = self._error("The server had an error processing your request (fake).")
+            body["error"]["type"] = "server_error"
+        return body, headers
+
+    def _get_cached_tokens(self, prompt_items: list[dict]) -> int:
+        # Like the provider's prompt cache: the longest prefix of whole items
+        # seen in an earlier request counts as cached, once it is long enough.
+        digest = hashlib.sha256()
+        tokens = cached_tokens = 0
+        for item in prompt_items:
+            digest.update(json.dumps(item, sort_keys=True).encode("utf-8"))
+            tokens += len(str(item.get("content", ""))) // 4
+            prefix = digest.digest()
+            if prefix in self._cached_prefixes:
+                cached_tokens = tokens
+            self._cached_prefixes.add(prefix)
+        return cached_tokens if cached_tokens >= self.prompt_cache_min_tokens else 0
+
+    def get_latency(self, model: str) -> float:
+        return self.model_latency.get(model, self.latency)
+
+    def _create_response(self, body: dict) -> tuple[int, dict]:
+        input_items = body.get("input", [])
+        if isinstance(input_items, str):
+            input_items = [{"role": "user", "content": input_items}]
+
+        with self._lock:
+            conversation = []
+            if previous_id := body.get("previous_response_id"):
+                if previous_id not in self.conversations:
+                    return 404, self._error(
+                        f"Previous response with id '{previous_id}' not found.",
+                        "previous_response_id",
+                    )
+                conversation = list(self.conversations[previous_id])
+            conversation.extend(input_items)
+            prompt_items = [{"role": "system", "content": body.get("instructions") or ""}, *conversation]
+            input_tokens = sum(len(str(item.get("content", ""))) // 4 for item in prompt_items)
+            cached_tokens = self._get_cached_tokens(prompt_items)
+            text = self.reply(conversation)
+            number = next(self._ids)
+            response_id = f"resp_{number}"
+            conversation.append({"role": "assistant", "content": text})
+            self.conversations[response_id] = conversation
+
+        output_tokens = len(text) // 4
+        return 200, {
+            "id": response_id,
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": body.get("model", ""),
+            "status": "completed",
+            "output": [
+                {
+                    "type": "message",
+                    "id": f"msg_{number}",
+                    "status": "completed",
+                    "role": "assistant",
+                    "content": [{"type": "output_text", "text": text, "annotations": []}],
+                }
+            ],
+            "parallel_tool_calls": True,
+            "tool_choice": "auto",
+            "tools": [],
+            "previous_response_id": body.get("previous_response_id"),
+            "usage": {
+                "input_tokens": input_tokens,
+                "input_tokens_details": {"cached_tokens": cached_tokens},
+                "output_tokens": output_tokens,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": input_tokens + output_tokens,
+            },
+        }
+
+    def _stream_events(self, response: dict):
+        message = response["output"][0]
+        text = message["content"][0]["text"]
+        in_progress = dict(response, status="in_progress", output=[])
+        yield {"type": "response.created", "response": in_progress}
+        yield {"type": "response.in_progress", "response": in_progress}
+        for start in range(0, len(text), self.chunk_size):
+            yield {
+                "type": "response.output_text.delta",
+                "item_id": message["id"],
+                "output_index": 0,
+                "content_index": 0,
+                "delta": text[start : start + self.chunk_size],
+                "logprobs": [],
+            }
+        yield {
+            "type": "response.output_text.done",
+            "item_id": message["id"],
+            "output_index": 0,
+            "content_index": 0,
+            "text": text,
+            "logprobs": [],
+        }
+        yield {"type": "response.completed", "response": response}
+
+    @staticmethod
+    def _error(message: str, param: str | None = None) -> dict:
+        return {
+            "error": {
+                "message": message,
+                "type": "invalid_request_error",
+                "param": param,
+                "code": None,
+            }
+        }
+
+    def _make_handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Chunked SSE writes are small; without TCP_NODELAY each one waits
+            # on delayed ACKs and adds tens of milliseconds per call.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(
+                        200,
+                        {
+                            "object": "list",
+                            "data": [
+                                {
+                                    "id": "fake-model",
+                                    "object": "model",
+                                    "created": 0,
+                                    "owned_by": "fake",
+                                }
+                            ],
+                        },
+                    )
+                    return
+                self._send_json(404, server._error(f"Unknown path {self.path}"))
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/responses"):
+                    self._send_json(404, server._error(f"Unknown path {self.path}"))
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except (ValueError, json.JSONDecodeError):
+                    self._send_json(400, server._error("Invalid JSON body."))
+                    return
+                server._record_request(body)
+                if latency := server.get_latency(body.get("model", "")):
+                    time.sleep(latency)
+                if error_status := server._pick_error():
+                    payload, headers = server._error_response(error_status)
+                    self._send_json(error_status, payload, headers)
+                    return
+                allowed, quota_headers = server._take_quota(body)
+                if not allowed:
+                    payload, headers = server._error_response(429)
+                    self._send_json(429, payload, {**headers, **quota_headers})
+                    return
+                status, payload = server._create_response(body)
+                if status == 200:
+                    with server._lock:
+                        server.stats["responses"] += 1
+                if status == 200 and body.get("stream"):
+                    self._send_stream(payload, quota_headers)
+                else:
+                    self._send_json(status, payload, quota_headers)
+
+            def _send_stream(self, response: dict, headers: dict[str, str] | None = None) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                try:
+                    for index, event in enumerate(server._stream_events(response)):
+                        if index > 1 and server.chunk_delay:
+                            time.sleep(server.chunk_delay)
+                        event["sequence_number"] = index
+                        data = (
+                            f"event: {event['type']}\n"
+                            f"data: {json.dumps(event)}\n\n"
+                        ).encode("utf-8")
+                        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                        self.wfile.flush()
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client cancelled the request mid-stream.
+                    self.close_connection = True
+
+            def _send_json(
+                self, status: int, payload: dict, headers: dict[str, str] | None = None
+            ) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logging.debug("FakeResponsesServer: " + format, *args)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake OpenAI Responses API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before the first byte")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests failing with 429")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--rpm", type=int, default=None, help="requests per minute before 429s")
+    parser.add_argument("--tpm", type=int, default=None, help="tokens per minute before 429s")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    server = FakeResponsesServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        chunk_delay=args.chunk_delay,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+    )
+    print(f"Fake Responses API on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        logging.info(f"Fake Responses server stats: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()